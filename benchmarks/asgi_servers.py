@@ -0,0 +1,208 @@
+"""
+Compare serving interactions with aiohttp and with ASGI servers.
+
+The same :class:`~clyde.http.server.HTTPServer` is served by aiohttp with
+:data:`~clyde.http.profile.PERFORMANCE_PROFILE`, and through
+:meth:`~clyde.http.server.HTTPServer.asgi` by each installed ASGI server:
+uvicorn (with httptools and uvloop when installed) and hypercorn. Each
+server runs in its own process, and a client keeps the given number of
+signed PING interactions in flight over keep-alive connections. Reported
+are the achieved throughput and the median and 99th percentile latency.
+
+Usage::
+
+    python -m benchmarks.asgi_servers --concurrency 16 64
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import multiprocessing
+import socket
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import aiohttp
+from nacl.signing import SigningKey
+
+from clyde.http.profile import PERFORMANCE_PROFILE
+from clyde.http.server import HTTPServer
+
+_SIGNING_KEY = SigningKey(b'\x05' * 32)
+_TIMESTAMP = '1664323200'
+_HOST = '127.0.0.1'
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((_HOST, 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def _create_server(port: int) -> HTTPServer:
+    return HTTPServer(
+        host=_HOST,
+        port=port,
+        public_key=bytes(_SIGNING_KEY.verify_key),
+        trusted_parsing=True,
+        profile=PERFORMANCE_PROFILE,
+    )
+
+
+def _serve_aiohttp(port: int) -> None:
+    _create_server(port).run()
+
+
+def _serve_uvicorn(port: int) -> None:
+    import uvicorn
+
+    uvicorn.run(
+        _create_server(port).asgi(),
+        host=_HOST,
+        port=port,
+        log_level='warning',
+        access_log=False,
+        lifespan='off',
+    )
+
+
+def _serve_hypercorn(port: int) -> None:
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [f'{_HOST}:{port}']
+    config.loglevel = 'WARNING'
+
+    asyncio.run(serve(_create_server(port).asgi(), config))
+
+
+_SERVERS: Dict[str, Callable[[int], None]] = {
+    'aiohttp': _serve_aiohttp,
+    'uvicorn': _serve_uvicorn,
+    'hypercorn': _serve_hypercorn,
+}
+
+
+def _wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            with socket.create_connection((_HOST, port), timeout=0.1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+
+            time.sleep(0.05)
+
+
+async def _load(port: int, concurrency: int, duration: float) -> Dict:
+    body = json.dumps({
+        'id': '1024545645465489418',
+        'application_id': '881397058114826261',
+        'type': 1,
+        'token': 'EXAMPLE_TOKEN',
+        'version': 1,
+    }).encode()
+    headers = {
+        'Content-Type': 'application/json',
+        'X-Signature-Ed25519': _SIGNING_KEY.sign(
+            _TIMESTAMP.encode() + body).signature.hex(),
+        'X-Signature-Timestamp': _TIMESTAMP,
+    }
+    url = f'http://{_HOST}:{port}/'
+    latencies: List[float] = []
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        loop = asyncio.get_running_loop()
+        end = loop.time() + duration
+
+        async def _client() -> None:
+            while loop.time() < end:
+                sent = loop.time()
+
+                async with session.post(url, data=body, headers=headers) as r:
+                    await r.read()
+                    assert r.status == 200, r.status
+
+                latencies.append(loop.time() - sent)
+
+        start = loop.time()
+        await asyncio.gather(*(_client() for _ in range(concurrency)))
+        elapsed = loop.time() - start
+
+    return {
+        'throughput': len(latencies) / elapsed,
+        'latency_p50': statistics.median(latencies),
+        'latency_p99': _percentile(latencies, 99),
+    }
+
+
+def _bench(
+    serve: Callable[[int], None],
+    concurrency: int,
+    duration: float,
+) -> Dict:
+    port = _free_port()
+    process = multiprocessing.Process(target=serve, args=(port,), daemon=True)
+    process.start()
+
+    try:
+        _wait_for_port(port)
+        return asyncio.run(_load(port, concurrency, duration))
+    finally:
+        process.terminate()
+        process.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument(
+        '--servers', nargs='+', choices=list(_SERVERS), default=list(_SERVERS))
+    args = parser.parse_args()
+
+    servers = []
+
+    for name in args.servers:
+        if name == 'aiohttp' or importlib.util.find_spec(name) is not None:
+            servers.append(name)
+        else:
+            print(f'{name} is not installed, skipping it')
+
+    header = (
+        f'{"server":<10} {"conc":>5} {"req/s":>8} '
+        f'{"lat p50":>9} {"lat p99":>9}'
+    )
+    print(header)
+    print('-' * len(header))
+
+    for concurrency in args.concurrency:
+        for name in servers:
+            r = _bench(_SERVERS[name], concurrency, args.duration)
+            print(
+                f'{name:<10} {concurrency:>5} {r["throughput"]:>8.0f} '
+                f'{r["latency_p50"] * 1e3:>7.2f}ms '
+                f'{r["latency_p99"] * 1e3:>7.2f}ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Measure syncing guild commands to many guilds against a mock API.
+
+A mock of Discord's bulk-overwrite endpoints runs in its own process,
+answering each request after the given latency. With ``--global-limit``,
+it also enforces a global rate limit in requests per second, answering
+429 like Discord when it is exceeded. For each concurrency, the commands
+are synced to every guild with an empty cache, then synced again
+unchanged, then synced again after the commands of a tenth of the guilds
+changed. Reported are the time taken and the requests the mock answered.
+
+The client keeps to the mock's global rate limit, or to Discord's 50
+requests per second without one, so cold syncs of many guilds take at
+least a second per 50 guilds at any concurrency.
+
+Usage::
+
+    python -m benchmarks.guild_sync --guilds 1000 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import socket
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from clyde.models.snowflake import Snowflake
+from clyde.ratelimit import GLOBAL_LIMIT, RateLimiter
+from clyde.sync import CommandSync, Scope, SyncCache
+
+_HOST = '127.0.0.1'
+_APPLICATION_ID = Snowflake('881397058114826261')
+_FIRST_GUILD = 881207955029110855
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((_HOST, 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def _serve_mock(port: int, latency: float, global_limit: float) -> None:
+    ids = itertools.count(1000)
+    stats = {'requests': 0, 'rate_limited': 0}
+    window: List[float] = []
+
+    async def _put(request: web.Request) -> web.Response:
+        stats['requests'] += 1
+        now = time.monotonic()
+
+        if global_limit:
+            while window and window[0] <= now - 1.0:
+                window.pop(0)
+
+            if len(window) >= global_limit:
+                stats['rate_limited'] += 1
+                retry_after = f'{window[0] + 1.0 - now:.3f}'
+                return web.json_response(
+                    {'global': True, 'retry_after': float(retry_after)},
+                    status=429,
+                    headers={
+                        'Retry-After': retry_after,
+                        'X-RateLimit-Global': 'true',
+                    },
+                )
+
+            window.append(now)
+
+        commands = await request.json()
+        await asyncio.sleep(latency)
+
+        return web.json_response(
+            [
+                dict(
+                    command,
+                    id=str(next(ids)),
+                    application_id=request.match_info['application'],
+                    guild_id=request.match_info.get('guild'),
+                    version='1',
+                )
+                for command in commands
+            ],
+            headers={
+                'X-RateLimit-Limit': '2',
+                'X-RateLimit-Remaining': '1',
+                'X-RateLimit-Reset-After': '20.000',
+            },
+        )
+
+    async def _stats(request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    async def _reset(request: web.Request) -> web.Response:
+        # Each run starts with a new client, which knows of no requests
+        stats.update(requests=0, rate_limited=0)
+        window.clear()
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_put(
+        '/api/v9/applications/{application}/commands', _put)
+    app.router.add_put(
+        '/api/v9/applications/{application}/guilds/{guild}/commands', _put)
+    app.router.add_get('/stats', _stats)
+    app.router.add_post('/stats', _reset)
+
+    web.run_app(app, host=_HOST, port=port, print=None)  # type: ignore
+
+
+def _wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            with socket.create_connection((_HOST, port), timeout=0.1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+
+            time.sleep(0.05)
+
+
+def _manifest(guilds: int, changed: int = 0) -> Dict[Scope, List[Any]]:
+    manifest: Dict[Scope, List[Any]] = {}
+
+    for i in range(guilds):
+        description = 'Changed' if i < changed else 'Administer the guild'
+        manifest[Snowflake(_FIRST_GUILD + i)] = [{
+            'name': 'admin',
+            'description': description,
+            'options': [],
+            'type': 1,
+        }]
+
+    return manifest
+
+
+async def _sync(
+    port: int,
+    cache: SyncCache,
+    manifest: Dict[Scope, List[Any]],
+    concurrency: int,
+    global_limit: Optional[int],
+) -> Dict:
+    async with aiohttp.ClientSession(
+        base_url=f'http://{_HOST}:{port}',
+        connector=aiohttp.TCPConnector(limit=concurrency),
+        raise_for_status=True,
+    ) as session:
+        await session.post('/stats')
+
+        sync = CommandSync(
+            session,
+            _APPLICATION_ID,
+            cache,
+            concurrency=concurrency,
+            limiter=RateLimiter(global_limit=global_limit),
+        )
+        start = time.perf_counter()
+        await sync.sync(manifest)
+        elapsed = time.perf_counter() - start
+
+        async with session.get('/stats') as response:
+            stats: Dict = await response.json()
+
+    stats['elapsed'] = elapsed
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--guilds', type=int, default=1000)
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument(
+        '--global-limit', type=float, default=0.0,
+        help='requests per second, or 0 for no global rate limit')
+    args = parser.parse_args()
+
+    # Rate limits are expected with --global-limit, so don't log them
+    logging.basicConfig(level=logging.ERROR)
+
+    # Stay within the mock's limit, like within Discord's
+    client_limit = int(args.global_limit) or GLOBAL_LIMIT
+    port = _free_port()
+    process = multiprocessing.Process(
+        target=_serve_mock,
+        args=(port, args.latency, args.global_limit),
+        daemon=True,
+    )
+    process.start()
+
+    header = (
+        f'{"run":<10} {"conc":>5} {"time":>9} {"requests":>9} {"429s":>6}')
+    print(header)
+    print('-' * len(header))
+
+    try:
+        _wait_for_port(port)
+
+        for concurrency in args.concurrency:
+            with tempfile.TemporaryDirectory() as directory:
+                path = Path(directory, 'commands.json')
+                runs = [
+                    ('cold', _manifest(args.guilds)),
+                    ('unchanged', _manifest(args.guilds)),
+                    ('10% diff', _manifest(args.guilds, args.guilds // 10)),
+                ]
+
+                for name, manifest in runs:
+                    # Each run starts like a new process, from the file
+                    r = asyncio.run(_sync(
+                        port, SyncCache(path), manifest, concurrency,
+                        client_limit))
+                    print(
+                        f'{name:<10} {concurrency:>5} '
+                        f'{r["elapsed"]:>8.2f}s {r["requests"]:>9} '
+                        f'{r["rate_limited"]:>6}'
+                    )
+    finally:
+        process.terminate()
+        process.join()
+
+
+if __name__ == '__main__':
+    main()
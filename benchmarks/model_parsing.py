@@ -0,0 +1,67 @@
+"""
+Compare the cost of parsing interactions strictly, lazily and trusted.
+
+Every fixture in ``tests/models/data`` that is an interaction is parsed
+with each mode. The "+access" rows also touch the fields a typical
+handler reads, which forces the lazy models to build them.
+
+Usage::
+
+    python -m benchmarks.model_parsing --number 2000
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from clyde.models.interactions import Interaction
+from clyde.models.trusted import construct_trusted
+
+DATA_DIR = Path(__file__).parent.parent / 'tests' / 'models' / 'data'
+
+
+def _access(i: Interaction) -> None:
+    _ = i.data and getattr(i.data, 'options', None)
+    _ = (i.member.user if i.member else i.user).id  # type: ignore
+
+
+MODES: Dict[str, Callable[[Any], Any]] = {
+    'strict': Interaction.parse_obj,
+    'lazy': Interaction.parse_lazy,
+    'lazy+access': lambda o: _access(Interaction.parse_lazy(o)),
+    'trusted': lambda o: construct_trusted(Interaction, o),
+    'trusted lazy': lambda o: Interaction.parse_lazy(o, trusted=True),
+    'trusted lazy+access':
+        lambda o: _access(Interaction.parse_lazy(o, trusted=True)),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    fixtures = {}
+
+    for path in sorted(DATA_DIR.glob('*.json')):
+        obj = json.loads(path.read_text(encoding='utf-8'))
+
+        if 'token' in obj:  # Only interactions
+            fixtures[path.stem] = obj
+
+    print(f'{"fixture":<32} ' + ' '.join(f'{m:>20}' for m in MODES))
+
+    for name, obj in fixtures.items():
+        timings = []
+
+        for func in MODES.values():
+            t = timeit.timeit(lambda: func(obj), number=args.number)
+            timings.append(t / args.number * 1e6)
+
+        print(f'{name:<32} ' + ' '.join(f'{t:>18.1f}us' for t in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare building a response per request with rendering a template.
+
+The "model" row builds the same message response as models on every
+call and serializes it, while the "template" row renders a
+:class:`clyde.models.templates.ResponseTemplate` declared once.
+
+Usage::
+
+    python -m benchmarks.response_templates --number 20000
+"""
+
+import argparse
+import timeit
+
+from clyde.http.response import encode_response
+from clyde.models.interactions import (
+    InteractionCallbackData,
+    InteractionCallbackType,
+    InteractionResponse,
+)
+from clyde.models.messages import MessageFlags
+from clyde.models.templates import ResponseTemplate, slot
+
+
+def _build(name: str, score: str) -> InteractionCallbackData:
+    return InteractionCallbackData(
+        content=f'Hello, {name}!',
+        embeds=[{
+            'title': 'Leaderboard',
+            'description': f'Your score is {score}',
+            'color': 0x5865F2,
+            'fields': [
+                {'name': 'Rank', 'value': '#1', 'inline': True},
+                {'name': 'Streak', 'value': '7 days', 'inline': True},
+            ],
+        }],
+        flags=MessageFlags.EPHEMERAL,
+    )
+
+
+TEMPLATE = ResponseTemplate(_build(slot('name'), slot('score')))
+
+
+def model(name: str, score: str) -> bytes:
+    return encode_response(InteractionResponse(
+        type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+        data=_build(name, score),
+    ))
+
+
+def template(name: str, score: str) -> bytes:
+    return TEMPLATE.render(name=name, score=score)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    for func in (model, template):
+        t = timeit.timeit(lambda: func('Clyde', '1337'), number=args.number)
+        print(f'{func.__name__:<10} {t / args.number * 1e6:>8.2f}us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Compare request throughput and latency of each event loop and server
+settings combination.
+
+For each combination, an :class:`~clyde.http.server.HTTPServer` is started
+in its own process with logging enabled as in a deployment, and a client
+keeps the given number of signed PING interactions in flight over
+keep-alive connections for the given duration. Reported are the achieved
+throughput and the median and 99th percentile latency.
+
+Usage::
+
+    python -m benchmarks.server_profiles --concurrency 16 64
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import statistics
+import time
+from typing import Dict, List
+
+import aiohttp
+from nacl.signing import SigningKey
+
+from clyde.http import profile
+from clyde.http.profile import (
+    DEFAULT_PROFILE,
+    PERFORMANCE_PROFILE,
+    ServerProfile,
+)
+from clyde.http.server import HTTPServer
+
+_SIGNING_KEY = SigningKey(b'\x05' * 32)
+_TIMESTAMP = '1664323200'
+_HOST = '127.0.0.1'
+
+_SETTINGS = {
+    'default': dataclasses.replace(DEFAULT_PROFILE, uvloop=False),
+    'tuned': dataclasses.replace(PERFORMANCE_PROFILE, uvloop=False),
+}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((_HOST, 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def _serve(server_profile: ServerProfile, port: int) -> None:
+    # Access logging only costs anything once logging is configured
+    logging.basicConfig(level=logging.INFO, stream=open(os.devnull, 'w'))
+
+    HTTPServer(
+        host=_HOST,
+        port=port,
+        public_key=bytes(_SIGNING_KEY.verify_key),
+        trusted_parsing=True,
+        profile=server_profile,
+    ).run()
+
+
+def _wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            with socket.create_connection((_HOST, port), timeout=0.1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+
+            time.sleep(0.05)
+
+
+async def _load(port: int, concurrency: int, duration: float) -> Dict:
+    body = json.dumps({
+        'id': '1024545645465489418',
+        'application_id': '881397058114826261',
+        'type': 1,
+        'token': 'EXAMPLE_TOKEN',
+        'version': 1,
+    }).encode()
+    headers = {
+        'Content-Type': 'application/json',
+        'X-Signature-Ed25519': _SIGNING_KEY.sign(
+            _TIMESTAMP.encode() + body).signature.hex(),
+        'X-Signature-Timestamp': _TIMESTAMP,
+    }
+    url = f'http://{_HOST}:{port}/'
+    latencies: List[float] = []
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        loop = asyncio.get_running_loop()
+        end = loop.time() + duration
+
+        async def _client() -> None:
+            while loop.time() < end:
+                sent = loop.time()
+
+                async with session.post(url, data=body, headers=headers) as r:
+                    await r.read()
+                    assert r.status == 200, r.status
+
+                latencies.append(loop.time() - sent)
+
+        start = loop.time()
+        await asyncio.gather(*(_client() for _ in range(concurrency)))
+        elapsed = loop.time() - start
+
+    return {
+        'throughput': len(latencies) / elapsed,
+        'latency_p50': statistics.median(latencies),
+        'latency_p99': _percentile(latencies, 99),
+    }
+
+
+def _bench(
+    server_profile: ServerProfile,
+    concurrency: int,
+    duration: float,
+) -> Dict:
+    port = _free_port()
+    process = multiprocessing.Process(
+        target=_serve, args=(server_profile, port), daemon=True)
+    process.start()
+
+    try:
+        _wait_for_port(port)
+        return asyncio.run(_load(port, concurrency, duration))
+    finally:
+        process.terminate()
+        process.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--concurrency', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--duration', type=float, default=3.0)
+    args = parser.parse_args()
+
+    loops = ['asyncio']
+
+    if profile.uvloop is not None:
+        loops.append('uvloop')
+    else:
+        print('uvloop is not installed, only benchmarking asyncio\n')
+
+    header = (
+        f'{"loop":<8} {"settings":<9} {"conc":>5} {"req/s":>8} '
+        f'{"lat p50":>9} {"lat p99":>9}'
+    )
+    print(header)
+    print('-' * len(header))
+
+    for concurrency in args.concurrency:
+        for loop in loops:
+            for name, settings in _SETTINGS.items():
+                server_profile = dataclasses.replace(
+                    settings, uvloop=loop == 'uvloop')
+                r = _bench(server_profile, concurrency, args.duration)
+                print(
+                    f'{loop:<8} {name:<9} {concurrency:>5} '
+                    f'{r["throughput"]:>8.0f} '
+                    f'{r["latency_p50"] * 1e3:>7.2f}ms '
+                    f'{r["latency_p99"] * 1e3:>7.2f}ms'
+                )
+
+
+if __name__ == '__main__':
+    main()
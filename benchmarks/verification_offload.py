@@ -0,0 +1,139 @@
+"""
+Compare inline and offloaded Ed25519 verification under an open-loop load.
+
+For each target rate, requests arrive on a fixed schedule for the given
+duration while a heartbeat task measures how late the event loop wakes it
+up. Reported are the achieved throughput, the verification latency and the
+event loop lag (the delay every other connection would see).
+
+Usage::
+
+    python -m benchmarks.verification_offload --rates 1000 5000 10000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List
+
+from nacl.signing import SigningKey
+
+from clyde.http.verifier import BatchVerifier, create_verifier
+
+_HEARTBEAT_INTERVAL = 0.001
+
+VerifyFunc = Callable[[bytes, bytes], Awaitable[bool]]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def _heartbeat(lags: List[float], stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+
+    while not stop.is_set():
+        expected = loop.time() + _HEARTBEAT_INTERVAL
+        await asyncio.sleep(_HEARTBEAT_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _run(
+    verify: VerifyFunc,
+    message: bytes,
+    signature: bytes,
+    rate: int,
+    duration: float,
+) -> dict:
+    loop = asyncio.get_running_loop()
+    lags: List[float] = []
+    latencies: List[float] = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(lags, stop))
+
+    async def _request(sent: float) -> None:
+        assert await verify(message, signature)
+        latencies.append(loop.time() - sent)
+
+    total = int(rate * duration)
+    start = loop.time()
+    tasks = []
+
+    for i in range(total):
+        delay = start + i / rate - loop.time()
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        tasks.append(asyncio.create_task(_request(loop.time())))
+
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    stop.set()
+    await heartbeat
+
+    return {
+        'throughput': total / elapsed,
+        'latency_p50': statistics.median(latencies),
+        'latency_p99': _percentile(latencies, 99),
+        'lag_p50': statistics.median(lags) if lags else 0.0,
+        'lag_p99': _percentile(lags, 99),
+    }
+
+
+async def _bench(mode: str, rate: int, duration: float, workers: int) -> dict:
+    signing_key = SigningKey.generate()
+    verifier = create_verifier(bytes(signing_key.verify_key))
+    message = b'1664323200' + os.urandom(1024)
+    signature = signing_key.sign(message).signature
+
+    verify: VerifyFunc
+
+    if mode == 'inline':
+        async def _verify_inline(m: bytes, s: bytes) -> bool:
+            return verifier.verify(m, s)
+
+        verify = _verify_inline
+        return await _run(verify, message, signature, rate, duration)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        verify = BatchVerifier(verifier, executor=executor).verify
+        return await _run(verify, message, signature, rate, duration)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--rates', type=int, nargs='+', default=[1000, 2500, 5000, 10000])
+    parser.add_argument('--duration', type=float, default=2.0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    header = (
+        f'{"mode":<10} {"rate":>6} {"req/s":>8} {"lat p50":>9} '
+        f'{"lat p99":>9} {"lag p50":>9} {"lag p99":>9}'
+    )
+    print(header)
+    print('-' * len(header))
+
+    for rate in args.rates:
+        for mode in ('inline', 'offloaded'):
+            r = asyncio.run(_bench(mode, rate, args.duration, args.workers))
+            print(
+                f'{mode:<10} {rate:>6} {r["throughput"]:>8.0f} '
+                f'{r["latency_p50"] * 1e3:>7.2f}ms '
+                f'{r["latency_p99"] * 1e3:>7.2f}ms '
+                f'{r["lag_p50"] * 1e3:>7.2f}ms '
+                f'{r["lag_p99"] * 1e3:>7.2f}ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
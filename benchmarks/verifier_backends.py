@@ -0,0 +1,81 @@
+"""
+Measure signature verifications per second for each installed backend.
+
+Bodies are the interaction fixtures in ``tests/models/data``, minified the
+way Discord sends them and signed with a throwaway key.
+
+Usage::
+
+    python -m benchmarks.verifier_backends --seconds 1
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from nacl.signing import SigningKey
+
+from clyde.http.verifier import available_backends, fastest_backend
+
+DATA_DIR = Path(__file__).parent.parent / 'tests' / 'models' / 'data'
+TIMESTAMP = b'1664323200'
+
+
+def _load_bodies() -> List[Tuple[str, bytes]]:
+    bodies = []
+
+    for path in sorted(DATA_DIR.glob('*.json')):
+        obj = json.loads(path.read_text(encoding='utf-8'))
+        body = json.dumps(obj, separators=(',', ':')).encode('utf-8')
+        bodies.append((path.stem, body))
+
+    return bodies
+
+
+def _rate(verify, message: bytes, signature: bytes, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+
+    while True:
+        for _ in range(100):
+            verify(message, signature)
+
+        count += 100
+        now = time.perf_counter()
+
+        if now >= deadline:
+            return count / (now - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--seconds', type=float, default=1.0)
+    args = parser.parse_args()
+
+    signing_key = SigningKey.generate()
+    public_key = bytes(signing_key.verify_key)
+    backends = available_backends()
+    bodies = _load_bodies()
+
+    print(f'fastest backend: {fastest_backend().name}\n')
+    print(f'{"body":<32} {"bytes":>6} ' + ' '.join(
+        f'{b.name + " ver/s":>18}' for b in backends))
+
+    for name, body in bodies:
+        message = TIMESTAMP + body
+        signature = signing_key.sign(message).signature
+
+        rates = [
+            _rate(b(public_key).verify, message, signature, args.seconds)
+            for b in backends
+        ]
+
+        print(f'{name:<32} {len(body):>6} ' + ' '.join(
+            f'{r:>18,.0f}' for r in rates))
+
+
+if __name__ == '__main__':
+    main()
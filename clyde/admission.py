@@ -0,0 +1,210 @@
+"""
+Admission control for interaction handlers.
+
+When interactions arrive faster than they can be handled, work piles up
+and every interaction ends up late. :class:`AdmissionController` sheds
+interactions that are already past Discord's deadline, and bounds how
+many handlers run at once and how many more may queue for a slot.
+Commands may get their own limits, so one slow command can't starve
+the others.
+"""
+
+import asyncio
+import collections
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Counter, Deque, Dict, Optional
+
+from .deadline import remaining_budget
+from .models.interactions import Interaction
+
+DISCORD_DEADLINE = 3.0
+""" Seconds after its creation that Discord waits for a response. """
+
+SHED_EXPIRED = 'expired'
+""" The interaction was past its deadline. """
+
+SHED_QUEUE_FULL = 'queue_full'
+""" Too many interactions were already waiting for a handler slot. """
+
+
+class InteractionShed(Exception):
+    """ An interaction was dropped instead of being handled. """
+
+    def __init__(self, interaction: Interaction, reason: str) -> None:
+        super().__init__(f'Shed interaction {interaction.id}: {reason}')
+        self.interaction = interaction
+        self.reason = reason
+
+
+class _Pool:
+    __slots__ = ('max_concurrency', 'max_queue', 'running', '_waiters')
+
+    def __init__(self, max_concurrency: int, max_queue: int) -> None:
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+
+        if max_queue < 0:
+            raise ValueError('max_queue must not be negative')
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.running = 0
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        if self.running < self.max_concurrency and not self._waiters:
+            self.running += 1
+            return True
+
+        if len(self._waiters) >= self.max_queue:
+            return False
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # The slot was handed over as we left
+            else:
+                self._waiters.remove(waiter)
+
+            raise
+
+        return True
+
+    def release(self) -> None:
+        # Hand the slot straight to the next waiter, if there is one
+        while self._waiters:
+            waiter = self._waiters.popleft()
+
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self.running -= 1
+
+
+class AdmissionController:
+    """ Limits and sheds interactions before their handlers run. """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 64,
+        max_queue: int = 256,
+        deadline: float = DISCORD_DEADLINE,
+    ) -> None:
+        """
+        :param max_concurrency: The most handlers to run at once
+        :type max_concurrency: int
+        :param max_queue: The most interactions to keep waiting
+            for a handler slot, beyond which they are shed
+        :type max_queue: int
+        :param deadline: Seconds after its creation after which an
+            interaction is shed instead of handled
+        :type deadline: float
+        """
+        self.deadline = deadline
+
+        self.shed: Counter[str] = collections.Counter()
+        """ How many interactions were shed, by reason. """
+
+        self._default = _Pool(max_concurrency, max_queue)
+        self._pools: Dict[str, _Pool] = {}
+
+    def limit(
+        self,
+        command: str,
+        *,
+        max_concurrency: int,
+        max_queue: int = 0,
+    ) -> None:
+        """
+        Give ``command`` its own limits, separate from the shared ones.
+
+        :param command: The name of the command
+        :type command: str
+        :param max_concurrency: The most handlers of the command to run
+        :type max_concurrency: int
+        :param max_queue: The most interactions of the command to keep
+            waiting for a handler slot
+        :type max_queue: int
+        """
+        self._pools[command] = _Pool(max_concurrency, max_queue)
+
+    @property
+    def backlog(self) -> int:
+        """ How many interactions are waiting for a handler slot. """
+        return self._default.queued + sum(
+            p.queued for p in self._pools.values())
+
+    @property
+    def in_flight(self) -> int:
+        """ How many handlers are running. """
+        return self._default.running + sum(
+            p.running for p in self._pools.values())
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the running and queued counts of each set of limits,
+        keyed by command name, with ``''`` for the shared limits.
+        """
+        pools = {'': self._default, **self._pools}
+
+        return {
+            key: {'running': pool.running, 'queued': pool.queued}
+            for key, pool in pools.items()
+        }
+
+    def check(self, interaction: Interaction) -> None:
+        """
+        Shed ``interaction`` if it's already past the deadline.
+
+        :raises InteractionShed: If the interaction was shed
+        """
+        if remaining_budget(interaction.id, self.deadline) <= 0:
+            self._shed(interaction, SHED_EXPIRED)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        interaction: Interaction,
+        command: Optional[str] = None,
+        *,
+        shed_expired: bool = True,
+    ) -> AsyncIterator[None]:
+        """
+        Wait for a slot to run the handler of ``interaction`` in.
+
+        :param command: The name of the command being run, if any
+        :type command: str, optional
+        :param shed_expired: Whether to shed the interaction if it
+            passed the deadline while waiting, such as when nothing
+            else would answer it in time
+        :type shed_expired: bool
+        :raises InteractionShed: If the queue is full, or the
+            interaction expired while waiting
+        """
+        pool = self._pools.get(command, self._default) if command \
+            else self._default
+
+        if not await pool.acquire():
+            self._shed(interaction, SHED_QUEUE_FULL)
+
+        try:
+            if shed_expired:
+                self.check(interaction)
+
+            yield
+        finally:
+            pool.release()
+
+    def _shed(self, interaction: Interaction, reason: str) -> None:
+        self.shed[reason] += 1
+        raise InteractionShed(interaction, reason)
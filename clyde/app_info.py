@@ -0,0 +1,114 @@
+"""
+Application info for fast cold starts.
+
+Serving interactions takes the application's public key, which comes
+with its info from ``GET /oauth2/applications/@me``. Instead of waiting
+for that request on every start, :class:`~clyde.application.ClydeApp`
+can:
+
+- Be given the public key and application ID, to start serving without
+  making any requests. The info is then fetched in the background.
+- Keep the last info fetched in an :class:`ApplicationCache` file, if
+  given one such as :data:`DEFAULT_CACHE_PATH`. Info younger than
+  :attr:`ApplicationCache.ttl` is used right away and revalidated in the
+  background. Older info is fetched again before serving, and only used
+  if fetching it fails.
+
+A configured public key is always the one signatures are verified with.
+Otherwise, if revalidated info has a different public key, signatures
+are verified with the new key from then on.
+"""
+
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .internal.cache import cache_dir, load_cache, save_cache
+from .models.application import Application
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = cache_dir() / 'application.json'
+""" The conventional place to cache application info in. """
+
+DEFAULT_TTL = 24 * 60 * 60.0
+""" Seconds that cached application info is used for without fetching. """
+
+_CACHE_VERSION = 1
+
+
+class ApplicationCache:
+    """ The application info last fetched with each bot token. """
+
+    def __init__(
+        self,
+        path: Union[str, 'os.PathLike[str]'],
+        *,
+        ttl: float = DEFAULT_TTL,
+    ) -> None:
+        """
+        :param path: The cache file, which is created if it doesn't exist
+        :type path: str or os.PathLike
+        :param ttl: Seconds after fetching that info is fresh
+        :type ttl: float
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+
+    def get(self, token: str, *, stale: bool = False) -> Optional[Application]:
+        """
+        Get the application info last fetched with ``token``.
+
+        :param stale: Whether to also get info older than :attr:`ttl`
+        :type stale: bool
+        :return: The application info, or ``None`` if there is none
+            or it is malformed
+        """
+        entry = self._load().get(_token_key(token))
+
+        if entry is None:
+            return None
+
+        try:
+            age = time.time() - entry['fetched_at']
+
+            if not stale and not (0 <= age < self.ttl):
+                return None
+
+            return Application.parse_obj(entry['application'])
+        except (KeyError, TypeError, ValueError):
+            logger.warning('Ignoring invalid cached application info')
+            return None
+
+    def put(self, token: str, data: Dict[str, Any]) -> None:
+        """
+        Record the application info fetched with ``token`` just now.
+
+        Failing to write the cache file is logged, since starting only
+        gets slower.
+
+        :param data: The info, as returned by Discord
+        :type data: Dict[str, Any]
+        """
+        entries = self._load()
+        entries[_token_key(token)] = {
+            'fetched_at': time.time(),
+            'application': data,
+        }
+        save_cache(
+            self.path, _CACHE_VERSION, 'applications', entries,
+            description='application cache')
+
+    def _load(self) -> Dict[str, Any]:
+        # Read every time, since another process may have revalidated
+        return load_cache(
+            self.path, _CACHE_VERSION, 'applications',
+            description='application cache')
+
+
+def _token_key(token: str) -> str:
+    # Never write the token itself to disk
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
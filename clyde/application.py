@@ -1,98 +1,455 @@
 import asyncio
+import functools
+import gc
 import inspect
 import logging
-import sys
-from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+import os
+import signal
+import socket
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    AsyncContextManager,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import aiohttp
 from aiohttp import web
 from aiohttp.hdrs import AUTHORIZATION, USER_AGENT
-from aiohttp.web_exceptions import HTTPBadRequest
+from aiohttp.web_exceptions import HTTPBadRequest, HTTPServiceUnavailable
 
 from ._constants import CLYDE_USER_AGENT, DISCORD_BASE_URL
+from .admission import (
+    SHED_EXPIRED,
+    SHED_QUEUE_FULL,
+    AdmissionController,
+    InteractionShed,
+)
+from .app_info import ApplicationCache
+from .autocomplete import AutocompleteEngine
+from .binding import Binder
+from .command_spec import CommandSpec
+from .components import ComponentRouter
 from .context import Context
-from .http.middleware import validate_signature
+from .deadline import DEFAULT_BUDGET, AutoDeferrer
+from .dispatch import CommandRegistry
+from .execution import ExecutionMode, HandlerExecutor, check_handler
+from .http.asgi import ASGIApplication
+from .http.lifecycle import (
+    InFlight,
+    drain,
+    finish_followups,
+    finish_handover,
+    wait_for_stop,
+)
+from .http.listeners import (
+    Listener,
+    create_sites,
+    open_listeners,
+    resolve_listeners,
+)
+from .http.middleware import (
+    PAYLOAD_KEY,
+    PayloadReader,
+    create_payload_reader,
+    payload_middleware,
+)
 from .http.payload import JsonPayload
+from .http.profile import DEFAULT_PROFILE, ServerProfile
+from .http.response import (
+    PONG,
+    ResponseBody,
+    callback_data,
+    json_response,
+    to_response,
+)
+from .http.verifier import create_verifier
+from .http.workers import Worker, WorkerSupervisor, worker_listeners
 from .internal.json import dumps_str, loads
 from .models.application import Application
-from .models.command import ApplicationCommand
+from .models.command import ApplicationCommandOptionType
 from .models.interactions import (
     ApplicationCommandData,
     ApplicationCommandType,
+    ComponentData,
     Interaction,
+    InteractionType,
 )
 from .models.locale import Locale, LocaleLike
 from .models.snowflake import Snowflake, SnowflakeLike
+from .ratelimit import Priority, RateLimiter
+from .sync import CommandSync, PendingCommands, Scope, SyncCache, SyncState
 
 logger = logging.getLogger(__name__)
 
 _TFunc = TypeVar('_TFunc', bound=Callable)
+_EDIT_RETRY_DELAYS = (0.25, 0.5, 1.0)
+_AUTOCOMPLETE_TYPES = frozenset({
+    ApplicationCommandOptionType.STRING,
+    ApplicationCommandOptionType.INTEGER,
+    ApplicationCommandOptionType.NUMBER,
+})
 LocalizationDict = Dict[LocaleLike, str]
+_PathLike = Union[str, os.PathLike]
+
+# A command's data, the guilds it is limited to, and its handler
+_Registration = Tuple[dict, Optional[Tuple[Snowflake, ...]], CommandSpec]
 
 
 class ClydeApp:
-    def __init__(self, token: str) -> None:
+    def __init__(
+        self,
+        token: str,
+        *,
+        verifier_backend: Optional[str] = None,
+        offload_verification: bool = False,
+        verification_executor: Optional[Executor] = None,
+        trusted_parsing: bool = False,
+        defer_after: Optional[float] = DEFAULT_BUDGET,
+        admission: Optional[AdmissionController] = None,
+        handler_executor: Optional[HandlerExecutor] = None,
+        profile: ServerProfile = DEFAULT_PROFILE,
+        command_cache: Optional[_PathLike] = None,
+        pending_commands: Union[PendingCommands, str] = 'dispatch',
+        public_key: Optional[Union[bytes, str]] = None,
+        application_id: Optional[SnowflakeLike] = None,
+        application_cache: Optional[_PathLike] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        """
+        :param token: The bot token to authenticate with
+        :type token: str
+        :param verifier_backend: The signature verifier backend to use,
+            defaults to the fastest installed backend
+        :type verifier_backend: str, optional
+        :param offload_verification: Whether to verify request signatures
+            in ``verification_executor`` instead of on the event loop
+        :type offload_verification: bool
+        :param verification_executor: The executor to verify signatures in,
+            defaults to the event loop's default executor
+        :type verification_executor: Executor, optional
+        :param trusted_parsing: Whether to skip full validation of
+            interactions that passed signature verification
+            (see :mod:`clyde.models.trusted`)
+        :type trusted_parsing: bool
+        :param defer_after: Seconds after an interaction's creation to
+            wait for its handler before deferring it and delivering the
+            result as an edit of the original response, or ``None`` to
+            always wait (see :mod:`clyde.deadline`)
+        :type defer_after: float, optional
+        :param admission: The limits on running handlers, defaults to an
+            :class:`~clyde.admission.AdmissionController` with its
+            default limits
+        :type admission: AdmissionController, optional
+        :param handler_executor: Runs handlers in their execution mode,
+            defaults to a :class:`~clyde.execution.HandlerExecutor` with
+            default pool sizes
+        :type handler_executor: HandlerExecutor, optional
+        :param profile: The event loop and web server settings, such as
+            :data:`~clyde.http.profile.PERFORMANCE_PROFILE`
+        :type profile: ServerProfile
+        :param command_cache: The file to remember synced commands in,
+            such as :data:`~clyde.sync.DEFAULT_CACHE_PATH`, so that
+            unchanged commands aren't sent again, or ``None`` to send them
+            on every start. Commands edited outside of this application
+            go unnoticed while the cache is used (see :mod:`clyde.sync`).
+        :type command_cache: str or os.PathLike, optional
+        :param pending_commands: What to do with commands invoked before
+            they are synced: ``'dispatch'``, ``'wait'`` or ``'reject'``
+            (see :class:`~clyde.sync.PendingCommands`)
+        :type pending_commands: PendingCommands or str
+        :param public_key: The application's public key, as bytes or hex,
+            to serve without fetching application info first
+            (see :mod:`clyde.app_info`)
+        :type public_key: bytes or str, optional
+        :param application_id: The application's ID, to sync commands
+            without fetching application info first
+        :type application_id: SnowflakeLike, optional
+        :param application_cache: The file to remember application info
+            in between runs, such as
+            :data:`~clyde.app_info.DEFAULT_CACHE_PATH`, or ``None`` to
+            fetch it on every start
+        :type application_cache: str or os.PathLike, optional
+        :param rate_limiter: Follows Discord's rate limits for every
+            request, defaults to a :class:`~clyde.ratelimit.RateLimiter`
+            with the default global limit
+        :type rate_limiter: RateLimiter, optional
+        """
         self.token = token
+        self.verifier_backend = verifier_backend
+        self.offload_verification = offload_verification
+        self.verification_executor = verification_executor
+        self.trusted_parsing = trusted_parsing
+        self.defer_after = defer_after
+        self.profile = profile
+
+        self.command_cache = None if command_cache is None \
+            else SyncCache(command_cache)
+        """ Where synced commands are remembered, if anywhere. """
+
+        self.pending_commands = PendingCommands(pending_commands)
+        """ What to do with commands invoked before they are synced. """
+
+        self.application_cache = None if application_cache is None \
+            else ApplicationCache(application_cache)
+        """ Where application info is remembered, if anywhere. """
+
+        if rate_limiter is None:
+            rate_limiter = RateLimiter()
 
-        self._pending_registrations: List[dict] = []
+        self.rate_limiter = rate_limiter
+        """
+        Queues requests to Discord by rate limit bucket, putting followups
+        first. How long they waited is in its ``stats()``.
+        """
+
+        self.sync_state = SyncState()
+        """
+        Whether commands are synced yet, which happens in the background
+        once serving. Readiness can be awaited with its ``wait()``.
+        """
+
+        self._background: List[asyncio.Task] = []
+        self._revalidate = False
+
+        if isinstance(public_key, str):
+            public_key = bytes.fromhex(public_key)
+
+        self._public_key: Optional[bytes] = public_key
+        self._configured_public_key = public_key
+        self._application_id = None if application_id is None \
+            else Snowflake(application_id)
+        self._application: Optional[Application] = None
+        self._payload_reader: Optional[PayloadReader] = None
+
+        self._pending_registrations: List[_Registration] = []
+        self._commands = CommandRegistry()
+
+        self.components = ComponentRouter()
+        """ The router for message component interactions. """
+
+        self.autocompleter = AutocompleteEngine()
+        """ The handler of autocomplete interactions. """
+
+        if admission is None:
+            admission = AdmissionController()
+
+        self.admission = admission
+        """ Sheds late interactions and limits running handlers. """
+
+        if handler_executor is None:
+            handler_executor = HandlerExecutor()
+
+        self.handler_executor = handler_executor
+        """ Runs handlers inline, in a thread pool or in a process pool. """
+
+        # The deferrer goes unused without a budget, but a budget of
+        # zero defers every interaction straight away
+        self._deferrer = AutoDeferrer(
+            self._edit_original,
+            budget=DEFAULT_BUDGET if defer_after is None else defer_after,
+        )
+
+        self.supervisor: Optional[WorkerSupervisor] = None
+        """
+        The supervisor of the worker processes when running with more
+        than one worker, whose metrics are those of every worker.
+        """
+
+        self._requests = 0
+        self._in_flight = InFlight()
+        self._runner: Optional[web.AppRunner] = None
 
         # Initialized by __aenter__
         self._session: aiohttp.ClientSession
-        self._application: Application
-        self._runner: web.AppRunner
 
     async def __aenter__(self) -> 'ClydeApp':
-        self._session = aiohttp.ClientSession(
-            base_url=DISCORD_BASE_URL,
-            headers={
-                AUTHORIZATION: 'Bot ' + self.token,
-                USER_AGENT: CLYDE_USER_AGENT
-            },
-            raise_for_status=True,
-            json_serialize=dumps_str,
-        )
+        self._session = self._create_session()
+        self.handler_executor.start(
+            spec.mode for _, _, spec in self._pending_registrations)
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
+        background, self._background = self._background, []
+
+        for task in background:
+            task.cancel()
+
+        if background:
+            await asyncio.wait(background)
+
+        await self.handler_executor.shutdown()
+
         if self._session is not None:
             await self._session.close()
 
         if self._runner is not None:
             await self._runner.cleanup()
+            self._runner = None
 
     @property
     def application(self) -> Application:
+        """
+        This application's info, which is only fetched in the background
+        when ``public_key`` and ``application_id`` are given.
+        """
+        if self._application is None:
+            raise RuntimeError('Application info is not fetched yet')
+
         return self._application
 
     @property
     def id(self) -> Snowflake:
-        return self._application.id
+        if self._application_id is None:
+            raise RuntimeError('Application ID is not known yet')
+
+        return self._application_id
 
     def run(
         self,
         *,
         host: Optional[str] = None,
         port: Optional[int] = None,
+        listeners: Optional[Sequence[Listener]] = None,
+        workers: int = 1,
+        reuse_port: Optional[bool] = None,
     ) -> None:
         """
-        Run the Discord application.
+        Run the Discord application until interrupted, then shut down
+        gracefully, finishing pending followups
+        (see :mod:`clyde.http.lifecycle`).
+
+        Serving starts as soon as application info is fetched, and
+        commands are synced in the background (see :mod:`clyde.sync`).
+
+        With more than one worker, application info is fetched once, then
+        worker processes are forked that share that state and the port
+        (see :mod:`clyde.http.workers`), and commands are synced by
+        another process meanwhile.
 
         :param host: The network host to listen on
         :type host: str, optional
         :param port: The TCP port to listen on
         :type port: int, optional
+        :param listeners: The sockets to listen on instead of ``host`` and
+            ``port``, such as Unix sockets (see :mod:`clyde.http.listeners`)
+        :type listeners: Sequence[Listener], optional
+        :param workers: The number of worker processes to serve with
+        :type workers: int
+        :param reuse_port: Whether workers each bind the port with
+            ``SO_REUSEPORT`` instead of sharing one inherited socket,
+            defaults to whether the platform balances connections that way
+        :type reuse_port: bool, optional
         """
-        async def _main() -> None:
+        if workers > 1:
+            listeners = worker_listeners(
+                host, port, listeners=listeners, reuse_port=reuse_port)
+
+            return self._run_workers(
+                host=host, port=port, listeners=listeners, workers=workers)
+
+        async def _main(sockets: List[socket.socket]) -> None:
             async with self:
-                await self._fetch_application_info()
+                await self._prepare()
+                await self._run_web_server(sockets=sockets)
+                self._start_background()
 
-                for reg in self._pending_registrations:
-                    await self._register_command(reg)
+                try:
+                    finish_handover()
+                    await wait_for_stop(sockets=sockets)
+                finally:
+                    await self._drain()
 
-                await self._run_web_server(host=host, port=port)
-                await self._sleep_forever()
+        with open_listeners(
+            resolve_listeners(listeners, host, port),
+            backlog=self.profile.backlog,
+        ) as sockets:
+            return self.profile.run(_main(sockets))
 
-        return asyncio.run(_main())
+    def asgi(self, *, sync: bool = True) -> ASGIApplication:
+        """
+        Get an ASGI application that runs the Discord application under
+        an ASGI server instead of :meth:`run` (see :mod:`clyde.http.asgi`).
+
+        Application info is fetched when the ASGI server starts up, in
+        each of its worker processes. Unlike with :meth:`run`, those
+        processes are not forked from one that could sync commands for
+        all of them, so by default each one syncs commands and
+        revalidates application info in the background itself. With
+        several workers, pass ``sync=False`` and sync once with
+        :meth:`sync_commands` before starting the server instead, such
+        as in a deploy step.
+
+        :param sync: Whether this process syncs commands. Otherwise,
+            commands are routed by name right away.
+        :type sync: bool
+        """
+        adapter = ASGIApplication(
+            self._handle_payload,
+            client_max_size=self.profile.client_max_size,
+        )
+
+        async def _startup() -> None:
+            await self.__aenter__()
+            await self._prepare()
+            self.components.compile()
+            adapter.reader = self._read_payload
+
+            if sync:
+                self._start_background()
+            else:
+                self.sync_state.state = SyncState.SKIPPED
+
+        async def _shutdown() -> None:
+            await finish_followups(
+                self._deferrer.pending,
+                timeout=self.profile.shutdown_timeout)
+            await self.__aexit__(None, None, None)
+
+        adapter.on_startup = _startup
+        adapter.on_shutdown = _shutdown
+        return adapter
+
+    def sync_commands(self) -> None:
+        """
+        Sync the declared commands with Discord once, without serving,
+        for ASGI servers that don't sync them (see :meth:`asgi`).
+
+        :raises aiohttp.ClientError: If syncing fails
+        """
+        async def _main() -> None:
+            async with self._create_session() as self._session:
+                await self._load_application_info()
+                await self._sync_commands()
+
+        self.profile.run(_main())
+        self.sync_state.state = SyncState.SYNCED
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Get the request, handler, shedding and rate limit counts of this
+        process.
+        """
+        rate_limits = self.rate_limiter.totals()
+
+        return {
+            'requests': self._requests,
+            'in_flight': self.admission.in_flight,
+            'backlog': self.admission.backlog,
+            'shed_expired': self.admission.shed[SHED_EXPIRED],
+            'shed_queue_full': self.admission.shed[SHED_QUEUE_FULL],
+            'rate_limited': rate_limits.rate_limited,
+            'rate_limit_wait_ms': int(rate_limits.wait_time * 1000),
+        }
 
     def chat_input(
         self,
@@ -103,7 +460,23 @@ class ClydeApp:
         description_localizations: Optional[LocalizationDict] = None,
         guilds: Optional[Iterable[SnowflakeLike]] = None,
         dm_permission: Optional[bool] = None,
+        execution: Union[ExecutionMode, str] = ExecutionMode.INLINE,
+        ephemeral: bool = False,
     ) -> Callable[[_TFunc], _TFunc]:
+        """
+        Declare a slash command handled by the decorated function.
+
+        :param execution: Where to run the handler: ``'inline'`` for a
+            coroutine on the event loop, ``'thread'`` or ``'process'``
+            for a blocking function in a pool (see :mod:`clyde.execution`)
+        :type execution: ExecutionMode or str
+        :param ephemeral: Whether the handler responds with ephemeral
+            messages, so that the command is deferred ephemerally when
+            it runs late (see :mod:`clyde.deadline`)
+        :type ephemeral: bool
+        """
+        execution = ExecutionMode(execution)
+
         if guilds is not None and dm_permission is not None:
             raise ValueError('Cannot specify both guilds and dm_permission')
 
@@ -119,7 +492,7 @@ class ClydeApp:
         if guilds is not None:
             guilds = tuple(Snowflake(value) for value in guilds)
 
-        def decorator(func: Callable):  # TODO: Implement this
+        def decorator(func: Callable):
             nonlocal name
 
             # Use the function name if no command name is provided
@@ -145,53 +518,364 @@ class ClydeApp:
                     f'annotated as clyde.context.Context'
                 )
 
+            binder = Binder.from_signature(sig)
+            check_handler(func, execution)
+
             # Log the type of command we've determined `func` to be
             if guilds is not None:
                 logging.debug('Registering guild command: %r', func)
             else:
                 logging.debug('Registering global command: %r', func)
 
-            # TODO: PLACEHOLDER
-            self._pending_registrations.append({
+            self._pending_registrations.append(({
                 'name': name,
                 'name_localizations': name_localizations or {},
                 'description': description,
                 'description_localizations': description_localizations or {},
-                'options': [],
+                'options': binder.options,
                 # 'default_member_permissions': '',
                 # 'dm_permission': dm_permission,
                 'default_permission': True,
                 'type': ApplicationCommandType.CHAT_INPUT,
-            })
+            }, guilds, CommandSpec(func, binder, execution, ephemeral)))
 
             return func
 
         return decorator
 
-    async def _fetch_application_info(self) -> None:
+    def component(self, pattern: str) -> Callable[[_TFunc], _TFunc]:
         """
-        Fetch this application's info from Discord and
-        store it in `self._application`.
+        Handle clicks on message components whose ``custom_id``
+        matches ``pattern``.
+
+        See :class:`clyde.components.ComponentRouter` for the pattern syntax.
+        The handler is called with ``ctx`` and the placeholder values
+        as keyword arguments.
         """
+        return self.components.route(pattern)
 
-        async with self._session.get(
-            '/api/v9/oauth2/applications/@me',
-        ) as response:
-            self._application = Application.parse_obj(
-                await response.json(loads=loads),
-            )
+    def autocomplete(
+        self,
+        command: str,
+        option: str,
+        **kwargs: Any,
+    ) -> Callable[[_TFunc], _TFunc]:
+        """
+        Autocomplete ``option`` of ``command``, which must be declared
+        first so that the option is synced with autocompletion enabled.
+
+        The handler is called with ``ctx`` and ``value``, the text typed
+        so far, and returns up to 25 choices. See
+        :meth:`clyde.autocomplete.AutocompleteEngine.add` for the options.
+
+        :raises ValueError: If ``command`` has no option named ``option``
+            that can be autocompleted
+        """
+        # The same command may be declared for several sets of guilds
+        found = [
+            o
+            for data, _, _ in self._pending_registrations
+            if data['type'] == ApplicationCommandType.CHAT_INPUT
+            and data['name'] == command
+            for o in data['options']
+            if o['name'] == option
+        ]
+
+        if not found:
+            raise ValueError(
+                f'Command {command!r} has no option {option!r} '
+                'to autocomplete')
+
+        if any(o['type'] not in _AUTOCOMPLETE_TYPES for o in found):
+            raise ValueError(
+                f'Option {option!r} of command {command!r} is not '
+                'a string or number, so it cannot be autocompleted')
+
+        for o in found:
+            o['autocomplete'] = True
+
+        return self.autocompleter.route(command, option, **kwargs)
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            base_url=DISCORD_BASE_URL,
+            headers={
+                AUTHORIZATION: 'Bot ' + self.token,
+                USER_AGENT: CLYDE_USER_AGENT
+            },
+            raise_for_status=True,
+            json_serialize=dumps_str,
+        )
+
+    async def _prepare(self) -> None:
+        """
+        Get the application info needed to serve, and route commands to
+        their handlers by name until they are synced.
+        """
+        await self._load_application_info()
 
-        # Log application developer page
         logger.info(
             'Started as https://discord.com/developers/applications/%s',
-            self.application.id,
+            self.id,
+        )
+
+        for data, guilds, spec in self._pending_registrations:
+            for scope in guilds or (None,):
+                self._commands.add_name(
+                    data['type'], data['name'], scope, spec)
+
+    async def _load_application_info(self) -> None:
+        """
+        Use the configured public key and application ID, or else the
+        cached application info, or else fetch it.
+
+        Configured or cached info is revalidated in the background.
+        """
+        self._revalidate = True
+
+        if self._public_key is not None and self._application_id is not None:
+            return
+
+        cache = self.application_cache
+        application = None if cache is None else cache.get(self.token)
+
+        if application is None:
+            try:
+                await self._fetch_application_info()
+                self._revalidate = False
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if cache is not None:
+                    application = cache.get(self.token, stale=True)
+
+                if application is None:
+                    raise
+
+                logger.warning(
+                    'Failed to fetch application info, using cached info',
+                    exc_info=True)
+
+        self._use_application(application)
+
+    def _start_background(self) -> None:
+        """
+        Sync commands, and revalidate application info if it was
+        configured or cached, in the background.
+        """
+        self._background.append(
+            asyncio.ensure_future(self._sync_in_background()))
+
+        if self._revalidate:
+            self._background.append(
+                asyncio.ensure_future(self._revalidate_in_background()))
+
+    async def _revalidate_in_background(self) -> None:
+        try:
+            await self._fetch_application_info()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('Failed to revalidate application info')
+
+    async def _sync_in_background(self) -> None:
+        try:
+            await self._sync_commands()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.sync_state.state = SyncState.FAILED
+            logger.exception(
+                'Failed to sync commands, routing them by name only')
+        else:
+            self.sync_state.state = SyncState.SYNCED
+            logger.info('Commands are synced')
+
+    async def _sync_commands(self) -> None:
+        """
+        Sync the declared commands with Discord, one scope at a time,
+        and route the synced commands to their handlers.
+        """
+        manifest: Dict[Scope, List[dict]] = {}
+        specs: Dict[Tuple[Scope, int, str], CommandSpec] = {}
+
+        for data, guilds, spec in self._pending_registrations:
+            for scope in guilds or (None,):
+                manifest.setdefault(scope, []).append(data)
+                specs[scope, data['type'], data['name']] = spec
+
+        sync = CommandSync(
+            self._session,
+            self.id,
+            self.command_cache,
+            limiter=self.rate_limiter,
         )
+        synced = await sync.sync(manifest)
+
+        for scope, commands in synced.items():
+            for command in commands:
+                command_type = command.type or \
+                    ApplicationCommandType.CHAT_INPUT
+                handler = specs.get((scope, command_type, command.name))
+
+                if handler is not None:
+                    self._commands.add(command, handler)
+
+    def _run_workers(
+        self,
+        *,
+        host: Optional[str],
+        port: Optional[int],
+        listeners: Sequence[Listener],
+        workers: int,
+    ) -> None:
+        async def _main() -> None:
+            async with self._create_session() as self._session:
+                await self._prepare()
+
+        # Build everything the workers share before forking them, with
+        # nothing collected until it is frozen (see clyde.http.workers)
+        gc_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            self.profile.run(_main())
+            self.components.compile()
+            self._run_supervisor(
+                host=host, port=port, listeners=listeners, workers=workers)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _run_supervisor(
+        self,
+        *,
+        host: Optional[str],
+        port: Optional[int],
+        listeners: Sequence[Listener],
+        workers: int,
+    ) -> None:
+        sync_pid = self._fork_sync()
+
+        try:
+            with open_listeners(
+                listeners, backlog=self.profile.backlog,
+            ) as sockets:
+                self.supervisor = WorkerSupervisor(
+                    functools.partial(
+                        self._serve_worker, host=host, port=port),
+                    workers=workers,
+                    sockets=sockets,
+                )
+                self.supervisor.run()
+        finally:
+            # The supervisor reaps the sync process if it exited already
+            try:
+                os.kill(sync_pid, signal.SIGTERM)
+                os.waitpid(sync_pid, 0)
+            except (ChildProcessError, ProcessLookupError):
+                pass
+
+    def _fork_sync(self) -> int:
+        """
+        Sync commands in a child process, which shares :attr:`sync_state`
+        with the worker processes.
+
+        Application info is revalidated there too, updating only the
+        cache, so workers use a changed public key once restarted.
+        """
+        async def _main() -> None:
+            async with self._create_session() as self._session:
+                self._start_background()
+                await asyncio.wait(self._background)
+
+        pid = os.fork()
+
+        if pid == 0:  # pragma: no cover (runs in the child)
+            synced = False
+            gc.enable()
+
+            try:
+                self.profile.run(_main())
+                synced = self.sync_state.state == SyncState.SYNCED
+            finally:
+                os._exit(0 if synced else 1)
+
+        return pid
+
+    def _serve_worker(
+        self,
+        worker: Worker,
+        *,
+        host: Optional[str],
+        port: Optional[int],
+    ) -> None:
+        async def _main() -> None:
+            async with self:
+                await self._run_web_server(
+                    host=host,
+                    port=port,
+                    sockets=worker.sockets,
+                    reuse_port=not worker.sockets,
+                )
+
+                try:
+                    await worker.serve_until_stopped(self.metrics)
+                finally:
+                    await self._drain()
+
+        self.profile.run(_main())
+
+    async def _fetch_application_info(self) -> None:
+        """
+        Fetch this application's info from Discord, use it,
+        and cache it.
+        """
+        async with self.rate_limiter.request(
+            self._session, 'GET', '/api/v9/oauth2/applications/@me',
+        ) as response:
+            data = await response.json(loads=loads)
+
+        self._use_application(Application.parse_obj(data))
+
+        if self.application_cache is not None:
+            self.application_cache.put(self.token, data)
+
+    def _use_application(self, application: Application) -> None:
+        """
+        Store ``application``, and verify signatures with its public key
+        if that changed and no public key was configured.
+        """
+        public_key = bytes(application.verify_key)
+
+        if self._application_id not in (None, application.id):
+            logger.warning(
+                'Configured application ID %s is not %s, the ID of the '
+                'application of the token', self._application_id,
+                application.id)
+
+        if self._configured_public_key is not None:
+            if self._configured_public_key != public_key:
+                logger.warning(
+                    'Configured public key is not the public key of the '
+                    'application of the token, verifying with it anyway')
+
+            public_key = self._configured_public_key
+        elif self._public_key not in (None, public_key):
+            logger.warning(
+                'The public key has changed, verifying with the new one')
+            self._payload_reader = None
+
+        self._application = application
+        self._application_id = application.id
+        self._public_key = public_key
 
     async def _run_web_server(
         self,
         *,
         host: Optional[str] = None,
         port: Optional[int] = None,
+        sockets: Sequence[socket.socket] = (),
+        reuse_port: bool = False,
     ) -> None:
         """
         Create an aiohttp web server to receive interactions with,
@@ -201,24 +885,88 @@ class ClydeApp:
         :type host: str, optional
         :param port: The TCP port to listen on
         :type port: int, optional
+        :param sockets: The listening sockets to serve on instead of
+            ``host`` and ``port``
+        :type sockets: Sequence[socket.socket]
+        :param reuse_port: Whether to bind the port with ``SO_REUSEPORT``
+        :type reuse_port: bool
         """
 
         # Create aiohttp web application
         webapp = web.Application(
-            middlewares=[validate_signature(self._application.verify_key)],
+            middlewares=[payload_middleware(self._read_payload)],
+            client_max_size=self.profile.client_max_size,
         )
         webapp.router.add_post('/', self._handle_post)
 
-        self._runner = web.AppRunner(webapp)
+        # Surface invalid component patterns before serving
+        self.components.compile()
+
+        self._runner = web.AppRunner(webapp, **self.profile.runner_kwargs())
         await self._runner.setup()
 
-        site = web.TCPSite(self._runner, host=host, port=port)
-        await site.start()
+        for site in create_sites(
+            self._runner,
+            sockets=sockets,
+            host=host,
+            port=port,
+            backlog=self.profile.backlog,
+            reuse_port=reuse_port,
+        ):
+            await site.start()
+
+    async def _drain(self) -> None:
+        """
+        Stop the web server gracefully, waiting for the interactions
+        being handled and their followups to finish.
+        """
+        runner, self._runner = self._runner, None
+
+        if runner is not None:
+            await drain(
+                runner,
+                self._in_flight,
+                timeout=self.profile.shutdown_timeout,
+                followups=self._deferrer.pending,
+            )
+
+    async def _read_payload(
+        self,
+        signature: Optional[str],
+        timestamp: Optional[str],
+        body: bytes,
+    ) -> Any:
+        # Looked up per request, since a revalidation can change the key
+        if self._payload_reader is None:
+            self._payload_reader = self._create_payload_reader()
+
+        return await self._payload_reader(signature, timestamp, body)
+
+    def _create_payload_reader(self) -> PayloadReader:
+        assert self._public_key is not None
+
+        return create_payload_reader(
+            create_verifier(self._public_key, self.verifier_backend),
+            offload=self.offload_verification,
+            executor=self.verification_executor,
+        )
 
     async def _handle_post(self, request: web.Request) -> web.Response:
+        return await self._handle_payload(request[PAYLOAD_KEY])
+
+    async def _handle_payload(self, obj: Any) -> web.Response:
+        self._requests += 1
+
+        with self._in_flight.track():
+            return await self._dispatch(obj)
+
+    async def _dispatch(self, obj: Any) -> web.Response:
         # Parse the interaction from JSON
         try:
-            interaction = Interaction.parse_obj(await request.json())
+            interaction = Interaction.parse_lazy(
+                obj,
+                trusted=self.trusted_parsing,
+            )
         except Exception as e:
             logger.error('Failed to read interaction body')
             raise HTTPBadRequest(text='Invalid request') from e
@@ -230,15 +978,143 @@ class ClydeApp:
                 logger.debug(
                     'Interaction options: %r', interaction.data.options)
 
+        if interaction.type == InteractionType.PING:
+            return json_response(PONG)
+
+        try:
+            self.admission.check(interaction)
+        except InteractionShed as e:
+            logger.debug('%s', e)
+            raise HTTPServiceUnavailable() from e
+
+        if interaction.type == InteractionType.APPLICATION_COMMAND:
+            return await self._dispatch_command(interaction)
+
+        if interaction.type == InteractionType.MESSAGE_COMPONENT:
+            return await self._dispatch_component(interaction)
+
+        if interaction.type == \
+                InteractionType.APPLICATION_COMMAND_AUTOCOMPLETE:
+            return json_response(
+                await self.autocompleter.respond(interaction))
+
         return web.json_response(None)  # TODO: Handle interaction
 
-    async def _register_command(self, data: dict) -> None:
-        async with self._session.post(
-            f'/api/v9/applications/{self.application.id}/commands',
-            data=JsonPayload(data),
-        ) as response:
-            jj = await response.json()
-            _ = ApplicationCommand.parse_obj(jj)  # TODO
+    async def _dispatch_command(
+        self,
+        interaction: Interaction,
+    ) -> web.Response:
+        assert isinstance(interaction.data, ApplicationCommandData)
+        route = self._commands.resolve(interaction.data)
+
+        if route is None:
+            logger.warning('No handler for command %r', interaction.data.name)
+            raise HTTPBadRequest(text='Unknown command')
+
+        spec, options = route
+        kwargs = spec.binder.bind(options, interaction.data)
+        handler = functools.partial(
+            self.handler_executor.run,
+            spec.mode,
+            spec.func,
+            Context(interaction),
+            kwargs,
+        )
+
+        if self.sync_state.pending:
+            if self.pending_commands == PendingCommands.REJECT:
+                logger.debug(
+                    'Rejecting command %r until commands are synced',
+                    interaction.data.name)
+                raise HTTPServiceUnavailable()
+
+            if self.pending_commands == PendingCommands.WAIT:
+                handler = functools.partial(self._after_sync, handler)
+
+        return await self._respond(
+            interaction, handler, interaction.data.name, spec.ephemeral)
+
+    async def _after_sync(self, handler: Callable[[], Awaitable[Any]]) -> Any:
+        await self.sync_state.wait()
+        return await handler()
+
+    async def _dispatch_component(
+        self,
+        interaction: Interaction,
+    ) -> web.Response:
+        assert isinstance(interaction.data, ComponentData)
+        custom_id = interaction.data.custom_id or ''
+        route = self.components.match(custom_id)
+
+        if route is None:
+            logger.warning('No handler for component %r', custom_id)
+            raise HTTPBadRequest(text='Unknown component')
+
+        func, kwargs = route
+
+        return await self._respond(
+            interaction,
+            functools.partial(func, ctx=Context(interaction), **kwargs),
+        )
+
+    async def _respond(
+        self,
+        interaction: Interaction,
+        handler: Callable[[], Awaitable[Any]],
+        command: Optional[str] = None,
+        ephemeral: bool = False,
+    ) -> web.Response:
+        async def _to_response() -> ResponseBody:
+            async with self.admission.slot(
+                interaction,
+                command,
+                # Deferred interactions have time to wait for a slot
+                shed_expired=self.defer_after is None,
+            ):
+                return to_response(await handler())
+
+        try:
+            if self.defer_after is None:
+                response = await _to_response()
+            else:
+                response = await self._deferrer.run(
+                    interaction, _to_response(), ephemeral=ephemeral)
+        except InteractionShed as e:
+            logger.debug('%s', e)
+            raise HTTPServiceUnavailable() from e
+
+        return json_response(response)
+
+    async def _edit_original(
+        self,
+        interaction: Interaction,
+        response: ResponseBody,
+    ) -> None:
+        payload = JsonPayload(callback_data(response))
+        url = (
+            f'/api/v9/webhooks/{interaction.application_id}/'
+            f'{interaction.token}/messages/@original'
+        )
+
+        def _patch() -> AsyncContextManager[aiohttp.ClientResponse]:
+            return self.rate_limiter.request(
+                self._session, 'PATCH', url,
+                data=payload, priority=Priority.INTERACTION)
+
+        # The edit can overtake the deferral on its way to Discord,
+        # in which case there is no original response to edit yet
+        for delay in _EDIT_RETRY_DELAYS:
+            try:
+                async with _patch():
+                    return
+            except aiohttp.ClientResponseError as e:
+                if e.status != 404:
+                    raise
+
+            await asyncio.sleep(delay)
+
+        async with _patch():
+            pass
 
     @staticmethod
     def _fixup_localizations(
@@ -278,13 +1154,3 @@ class ClydeApp:
                 )
 
         return new_data
-
-    @staticmethod
-    async def _sleep_forever():
-        if sys.platform == 'win32' and sys.version_info < (3, 8):
-            delay = 1
-        else:
-            delay = 3600
-
-        while True:
-            await asyncio.sleep(delay)
@@ -0,0 +1,325 @@
+"""
+Handling of ``APPLICATION_COMMAND_AUTOCOMPLETE`` interactions.
+
+Autocomplete fires on every keystroke, so :class:`AutocompleteEngine`
+avoids running handlers where it can. Results are cached by command,
+focused option, query and locale. When a user types faster than their
+handler returns, the handler call for the stale keystroke is cancelled.
+
+Routes may also opt in to answering a query with no cached results of
+its own by filtering the results of a shorter query it starts with. That
+is only correct for handlers whose results are prefix-closed: every
+choice returned for a query must also be among the results for each
+shorter query it starts with, and match that query. A handler that
+ranks by relevance, or matches anywhere in a name, breaks that.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .context import Context
+from .dispatch import split_options
+from .internal.json import dumps_bytes
+from .models.interactions import (
+    ApplicationCommandData,
+    Interaction,
+    InteractionCallbackType,
+)
+
+_TFunc = TypeVar('_TFunc', bound=Callable)
+
+_RESULT = InteractionCallbackType.APPLICATION_COMMAND_AUTOCOMPLETE_RESULT
+
+MAX_CHOICES = 25
+""" The most choices Discord accepts in one autocomplete response. """
+
+Choice = Dict[str, Any]
+ChoiceLike = Union[str, Tuple[str, Any], Choice]
+""" A choice as a handler may return it: ``name``, ``(name, value)`` or
+a ``{'name': ..., 'value': ...}`` dict. """
+
+AutocompleteHandler = Callable[..., Awaitable[Iterable[ChoiceLike]]]
+Matcher = Callable[[str, str], bool]
+
+CacheKey = Tuple[str, str, str, Optional[str]]
+""" The command, focused option, query and locale of a lookup. """
+
+
+def starts_with(name: str, query: str) -> bool:
+    """ The default matcher: case-insensitive prefix matching. """
+    return name.casefold().startswith(query.casefold())
+
+
+def _encode(choices: List[Choice]) -> bytes:
+    return dumps_bytes({
+        'type': _RESULT,
+        'data': {'choices': choices},
+    })
+
+
+_NO_CHOICES = _encode([])
+
+
+class _Entry:
+    __slots__ = ('choices', 'body', 'complete', 'expires')
+
+    def __init__(self, choices: List[Choice], expires: float) -> None:
+        self.choices = choices
+        self.body = _encode(choices)
+        self.expires = expires
+
+        # Whether no choices were cut off, so that filtering these
+        # results gives every result of a longer query
+        self.complete = len(choices) < MAX_CHOICES
+
+
+class AutocompleteCache:
+    """ A bounded LRU cache of autocomplete results that expire. """
+
+    def __init__(self, *, maxsize: int = 1024, ttl: float = 30.0) -> None:
+        """
+        :param maxsize: The most results to keep
+        :type maxsize: int
+        :param ttl: How many seconds results are kept for
+        :type ttl: float
+        """
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: 'OrderedDict[CacheKey, _Entry]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        if entry.expires <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: CacheKey, choices: List[Choice]) -> _Entry:
+        entry = _Entry(choices, time.monotonic() + self.ttl)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class _Route:
+    __slots__ = ('handler', 'reuse_prefixes', 'match')
+
+    def __init__(
+        self,
+        handler: AutocompleteHandler,
+        reuse_prefixes: bool,
+        match: Matcher,
+    ) -> None:
+        self.handler = handler
+        self.reuse_prefixes = reuse_prefixes
+        self.match = match
+
+
+class AutocompleteEngine:
+    """ Routes autocomplete interactions to handlers, with caching. """
+
+    def __init__(
+        self,
+        *,
+        cache: Optional[AutocompleteCache] = None,
+    ) -> None:
+        """
+        :param cache: The cache of results, defaults to a new
+            :class:`AutocompleteCache`
+        :type cache: AutocompleteCache, optional
+        """
+        if cache is None:
+            cache = AutocompleteCache()
+
+        self.cache = cache
+
+        self._routes: Dict[Tuple[str, str], _Route] = {}
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    def add(
+        self,
+        command: str,
+        option: str,
+        handler: AutocompleteHandler,
+        *,
+        reuse_prefixes: bool = False,
+        match: Matcher = starts_with,
+    ) -> None:
+        """
+        Handle autocompletion of ``option`` of ``command``.
+
+        The handler is called with ``ctx`` and ``value``, the text typed
+        so far, and returns up to 25 choices.
+
+        :param command: The name of the command, including subcommand
+            group and subcommand names, such as ``'settings config set'``
+        :type command: str
+        :param option: The name of the option to autocomplete
+        :type option: str
+        :param reuse_prefixes: Whether a query may be answered by
+            filtering the cached results of a shorter one with ``match``,
+            instead of calling the handler. Only enable this if the
+            handler's results are prefix-closed
+            (see :mod:`clyde.autocomplete`).
+        :type reuse_prefixes: bool
+        :param match: Whether a choice name matches a query,
+            defaults to case-insensitive prefix matching
+        :type match: Callable[[str, str], bool]
+        """
+        self._routes[command, option] = _Route(handler, reuse_prefixes, match)
+
+    def route(
+        self,
+        command: str,
+        option: str,
+        **kwargs: Any,
+    ) -> Callable[[_TFunc], _TFunc]:
+        """ Decorator form of :meth:`add`. """
+        def decorator(func: _TFunc) -> _TFunc:
+            self.add(command, option, func, **kwargs)
+            return func
+
+        return decorator
+
+    async def respond(self, interaction: Interaction) -> bytes:
+        """
+        Get the serialized response to an autocomplete interaction.
+
+        Unknown commands and options, and handler calls that were
+        superseded by a newer keystroke, get an empty list of choices.
+        """
+        data = interaction.data
+        assert isinstance(data, ApplicationCommandData)
+
+        path, options = split_options(data.options)
+        focused = next((o for o in options if o.get('focused')), None)
+
+        if focused is None:
+            return _NO_CHOICES
+
+        command = ' '.join((data.name,) + path)
+        route = self._routes.get((command, focused['name']))
+
+        if route is None:
+            return _NO_CHOICES
+
+        query = str(focused.get('value', ''))
+        key = (command, focused['name'], query, interaction.locale)
+        entry = self.cache.get(key)
+
+        if entry is None and route.reuse_prefixes:
+            entry = self._from_prefix(key, route.match)
+
+        if entry is not None:
+            self.cache.hits += 1
+            return entry.body
+
+        self.cache.misses += 1
+        choices = await self._call(route, interaction, command, query)
+
+        if choices is None:
+            return _NO_CHOICES
+
+        return self.cache.put(key, choices).body
+
+    def _from_prefix(self, key: CacheKey, match: Matcher) -> Optional[_Entry]:
+        command, option, query, locale = key
+
+        for end in range(len(query) - 1, -1, -1):
+            entry = self.cache.get((command, option, query[:end], locale))
+
+            if entry is not None and entry.complete:
+                return self.cache.put(key, [
+                    c for c in entry.choices if match(c['name'], query)
+                ])
+
+        return None
+
+    async def _call(
+        self,
+        route: _Route,
+        interaction: Interaction,
+        command: str,
+        query: str,
+    ) -> Optional[List[Choice]]:
+        # Every keystroke is its own interaction with its own token,
+        # so the same user typing in the same command is what makes
+        # an earlier call stale
+        user = interaction.member.user if interaction.member \
+            else interaction.user
+        flight_key = (user.id if user else None, command)
+
+        task = asyncio.ensure_future(
+            route.handler(ctx=Context(interaction), value=query))
+
+        previous = self._in_flight.get(flight_key)
+        self._in_flight[flight_key] = task
+
+        if previous is not None:
+            previous.cancel()
+
+        try:
+            # Unlike awaiting the task, this doesn't raise if it's cancelled
+            await asyncio.wait((task,))
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            if self._in_flight.get(flight_key) is task:
+                del self._in_flight[flight_key]
+
+        if task.cancelled():
+            return None
+
+        return [
+            _to_choice(c)
+            for c in itertools.islice(task.result(), MAX_CHOICES)
+        ]
+
+
+def _to_choice(choice: ChoiceLike) -> Choice:
+    if isinstance(choice, str):
+        return {'name': choice, 'value': choice}
+
+    if isinstance(choice, tuple):
+        name, value = choice
+        return {'name': name, 'value': value}
+
+    return choice
@@ -0,0 +1,191 @@
+"""
+Binding of application command options to handler arguments.
+
+A :class:`Binder` is compiled once from a handler's signature when the
+command is declared. It maps each option name straight to the keyword
+argument it fills and the converter for its type, so binding the options
+of an interaction is a single pass over them with no reflection.
+"""
+
+import inspect
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .models.channels import PartialChannel
+from .models.command import ApplicationCommandOptionType
+from .models.interactions import ApplicationCommandData
+from .models.roles import Role
+from .models.users import User
+
+Converter = Callable[[Any, ApplicationCommandData], Any]
+""" Converts the raw value of an option, given the command data. """
+
+_OptionType = Tuple[ApplicationCommandOptionType, Optional[Converter]]
+
+_OPTION_NAME = re.compile(r'[-_\w]{1,32}')
+
+_NoneType = type(None)
+
+
+def _number(value: Any, data: ApplicationCommandData) -> float:
+    return float(value)  # Whole numbers are sent as JSON integers
+
+
+def _resolver(attr: str) -> Converter:
+    def resolve(value: Any, data: ApplicationCommandData) -> Any:
+        # Snowflakes hash like ints, so the raw ID can be used as the key
+        return getattr(data.resolved, attr)[int(value)]
+
+    return resolve
+
+
+# The option type for each supported annotation, and how to convert
+# the option's value if it's not already the right Python type
+_OPTION_TYPES: Dict[Any, _OptionType] = {
+    str: (ApplicationCommandOptionType.STRING, None),
+    int: (ApplicationCommandOptionType.INTEGER, None),
+    bool: (ApplicationCommandOptionType.BOOLEAN, None),
+    float: (ApplicationCommandOptionType.NUMBER, _number),
+    User: (ApplicationCommandOptionType.USER, _resolver('users')),
+    Role: (ApplicationCommandOptionType.ROLE, _resolver('roles')),
+    PartialChannel: (
+        ApplicationCommandOptionType.CHANNEL, _resolver('channels')),
+}
+
+
+class Binder:
+    """ Binds the options of a command to its handler's arguments. """
+
+    __slots__ = ('_slots', '_defaults', 'options')
+
+    def __init__(
+        self,
+        slots: Dict[str, Tuple[str, Optional[Converter]]],
+        defaults: Dict[str, Any],
+        options: List[dict],
+    ) -> None:
+        self._slots = slots
+        self._defaults = defaults
+
+        self.options = options
+        """ The option definitions to register the command with. """
+
+    @classmethod
+    def from_signature(
+        cls,
+        sig: inspect.Signature,
+        *,
+        skip: Iterable[str] = ('ctx',),
+    ) -> 'Binder':
+        """
+        Compile a binder for a handler from its signature.
+
+        Every parameter becomes an option named after it. The option is
+        optional if the parameter has a default or is ``Optional[...]``.
+        A description can be given with ``Annotated[T, 'Description']``,
+        otherwise the parameter name is used.
+
+        :param sig: The signature of the handler
+        :type sig: inspect.Signature
+        :param skip: Names of parameters that are not options
+        :type skip: Iterable[str]
+        :raises TypeError: If a parameter can't be passed by keyword
+            or its annotation is not a supported option type
+        :raises ValueError: If a parameter name is not a valid option name
+        """
+        slots: Dict[str, Tuple[str, Optional[Converter]]] = {}
+        defaults: Dict[str, Any] = {}
+        required: List[dict] = []
+        optional: List[dict] = []
+
+        for param in sig.parameters.values():
+            if param.name in skip:
+                continue
+
+            if param.kind not in (
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                inspect.Parameter.KEYWORD_ONLY,
+            ):
+                raise TypeError(
+                    f'Parameter {param.name!r} must be passable by keyword')
+
+            if not _OPTION_NAME.fullmatch(param.name):
+                raise ValueError(f'Invalid option name: {param.name!r}')
+
+            annotation, description = _unwrap_annotated(param.annotation)
+            annotation, is_optional = _unwrap_optional(annotation)
+
+            try:
+                option_type, convert = _OPTION_TYPES[annotation]
+            except (KeyError, TypeError):
+                raise TypeError(
+                    f'Unsupported type for option {param.name!r}: '
+                    f'{param.annotation!r}'
+                ) from None
+
+            if param.default is not inspect.Parameter.empty:
+                defaults[param.name] = param.default
+            elif is_optional:
+                defaults[param.name] = None
+
+            name = param.name.lower()
+            option = {
+                'type': option_type,
+                'name': name,
+                'description': description or param.name,
+                'required': param.name not in defaults,
+            }
+
+            # Required options must be listed before optional ones
+            (optional if param.name in defaults else required).append(option)
+            slots[name] = (param.name, convert)
+
+        return cls(slots, defaults, required + optional)
+
+    def bind(
+        self,
+        options: List[Dict[str, Any]],
+        data: ApplicationCommandData,
+    ) -> Dict[str, Any]:
+        """
+        Build the keyword arguments for the handler from
+        the options of an invoked command.
+
+        :param options: The options passed to the (sub)command
+        :param data: The data of the interaction, to resolve
+            users, roles and channels from
+        """
+        kwargs = self._defaults.copy()
+        slots = self._slots
+
+        for option in options:
+            slot = slots.get(option['name'])
+
+            if slot is None:
+                continue  # Not an option of the current registration
+
+            name, convert = slot
+            value = option['value']
+            kwargs[name] = value if convert is None else convert(value, data)
+
+        return kwargs
+
+
+def _unwrap_annotated(annotation: Any) -> Tuple[Any, Optional[str]]:
+    metadata = getattr(annotation, '__metadata__', None)
+
+    if metadata is None:
+        return annotation, None
+
+    description = next((m for m in metadata if isinstance(m, str)), None)
+    return annotation.__origin__, description
+
+
+def _unwrap_optional(annotation: Any) -> Tuple[Any, bool]:
+    if getattr(annotation, '__origin__', None) is Union:
+        args = tuple(a for a in annotation.__args__ if a is not _NoneType)
+
+        if len(args) == 1 and len(annotation.__args__) == 2:
+            return args[0], True
+
+    return annotation, False
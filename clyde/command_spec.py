@@ -1,9 +1,15 @@
 from dataclasses import dataclass
 from typing import Callable
 
+from .binding import Binder
+from .execution import ExecutionMode
+
 
 @dataclass
 class CommandSpec:
-    __slots__ = ('func',)
+    __slots__ = ('func', 'binder', 'mode', 'ephemeral')
 
     func: Callable
+    binder: Binder
+    mode: ExecutionMode
+    ephemeral: bool
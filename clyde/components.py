@@ -0,0 +1,247 @@
+"""
+Routing of message component interactions by their ``custom_id``.
+
+Patterns are ``custom_id`` templates made of segments split by a
+separator, where a segment may be a placeholder such as ``{page:int}``::
+
+    router = ComponentRouter()
+
+    @router.route('page:{page:int}:user:{user:snowflake}')
+    async def turn_page(ctx: Context, page: int, user: Snowflake):
+        ...
+
+All patterns are compiled into one deterministic segment trie, where a
+literal segment takes priority over a placeholder in the same position.
+Matching a ``custom_id`` then takes one dict lookup per segment, however
+many patterns are registered.
+"""
+
+import itertools
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from .models.snowflake import Snowflake
+
+_TFunc = TypeVar('_TFunc', bound=Callable)
+
+PLACEHOLDER_TYPES: Dict[str, Callable[[str], Any]] = {
+    'str': str,
+    'int': int,
+    'snowflake': Snowflake,
+}
+""" The converters for each placeholder type, by name. """
+
+_PLACEHOLDER = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)(?::([a-z]+))?\}')
+
+# (segment index, argument name, converter)
+_Capture = Tuple[int, str, Callable[[str], Any]]
+
+
+class _Pattern:
+    __slots__ = ('pattern', 'handler', 'segments', 'captures')
+
+    def __init__(self, pattern: str, handler: Callable, separator: str):
+        self.pattern = pattern
+        self.handler = handler
+
+        # A literal string, or None for a placeholder
+        self.segments: List[Optional[str]] = []
+        self.captures: List[_Capture] = []
+
+        # Set the placeholders aside first, since their type
+        # annotations may contain the separator
+        placeholders = _PLACEHOLDER.findall(pattern)
+        masked = _PLACEHOLDER.sub('\x00', pattern)
+
+        for i, segment in enumerate(masked.split(separator)):
+            if segment != '\x00':
+                if '{' in segment or '}' in segment or '\x00' in segment:
+                    raise ValueError(
+                        f'Invalid segment {segment!r} in pattern {pattern!r}')
+
+                self.segments.append(segment)
+                continue
+
+            name, type_name = placeholders.pop(0)
+            type_name = type_name or 'str'
+
+            try:
+                convert = PLACEHOLDER_TYPES[type_name]
+            except KeyError:
+                raise ValueError(
+                    f'Unknown placeholder type {type_name!r} '
+                    f'in pattern {pattern!r}'
+                ) from None
+
+            self.segments.append(None)
+            self.captures.append((i, name, convert))
+
+    @property
+    def specificity(self) -> Tuple[bool, ...]:
+        # Literal segments win over placeholders, leftmost first
+        return tuple(s is not None for s in self.segments)
+
+
+# A node of the trie of patterns, and of the trie compiled from it in
+# which every custom_id follows a single path
+class _Node:
+    __slots__ = ('literals', 'wildcard', 'pattern')
+
+    def __init__(self) -> None:
+        self.literals: Dict[str, _Node] = {}
+        self.wildcard: Optional[_Node] = None
+        self.pattern: Optional[_Pattern] = None
+
+
+class ComponentRouter:
+    """ Routes ``custom_id`` strings to handlers by pattern. """
+
+    def __init__(self, *, separator: str = ':') -> None:
+        """
+        :param separator: The string between segments of a ``custom_id``
+        :type separator: str
+        """
+        if not separator:
+            raise ValueError('separator must not be empty')
+
+        self.separator = separator
+
+        self._patterns: List[_Pattern] = []
+        self._root: Optional[_Node] = None
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def add(self, pattern: str, handler: Callable) -> None:
+        """
+        Route ``custom_id`` strings matching ``pattern`` to ``handler``.
+
+        :raises ValueError: If the pattern is invalid
+        """
+        self._patterns.append(_Pattern(pattern, handler, self.separator))
+        self._root = None
+
+    def route(self, pattern: str) -> Callable[[_TFunc], _TFunc]:
+        """ Decorator form of :meth:`add`. """
+        def decorator(func: _TFunc) -> _TFunc:
+            self.add(pattern, func)
+            return func
+
+        return decorator
+
+    def compile(self) -> None:
+        """
+        Compile the registered patterns into the matching trie.
+
+        This happens automatically on the first match after a pattern
+        is added, but may be called at startup to surface errors early.
+
+        :raises ValueError: If two patterns match exactly the same
+            ``custom_id`` strings
+        """
+        nfa = _Node()
+
+        for p in self._patterns:
+            node = nfa
+
+            for segment in p.segments:
+                if segment is None:
+                    node.wildcard = node.wildcard or _Node()
+                    node = node.wildcard
+                else:
+                    node = node.literals.setdefault(segment, _Node())
+
+            if node.pattern is not None:
+                raise ValueError(
+                    f'Patterns {node.pattern.pattern!r} and {p.pattern!r} '
+                    'are ambiguous'
+                )
+
+            node.pattern = p
+
+        self._root = _determinize(nfa)
+
+    def match(
+        self,
+        custom_id: str,
+    ) -> Optional[Tuple[Callable, Dict[str, Any]]]:
+        """
+        Find the handler for a ``custom_id`` and extract its arguments.
+
+        :return: The handler and its keyword arguments, or ``None`` if
+            no pattern matches or a placeholder value is invalid
+        """
+        node = self._root
+
+        if node is None:
+            self.compile()
+            node = self._root
+
+        segments = custom_id.split(self.separator)
+
+        for segment in segments:
+            assert node is not None
+            node = node.literals.get(segment, node.wildcard)
+
+            if node is None:
+                return None
+
+        assert node is not None
+        p = node.pattern
+
+        if p is None:
+            return None
+
+        try:
+            kwargs = {
+                name: convert(segments[i])
+                for i, name, convert in p.captures
+            }
+        except (TypeError, ValueError):
+            return None
+
+        return p.handler, kwargs
+
+
+def _determinize(root: _Node) -> _Node:
+    # Subset construction: each trie node stands for every pattern
+    # prefix that a custom_id could have matched so far
+    nodes: Dict[FrozenSet[_Node], _Node] = {}
+
+    def build(states: FrozenSet[_Node]) -> _Node:
+        try:
+            return nodes[states]
+        except KeyError:
+            pass
+
+        node = nodes[states] = _Node()
+        wildcards = frozenset(s.wildcard for s in states if s.wildcard)
+
+        for literal in set(itertools.chain.from_iterable(
+            s.literals for s in states
+        )):
+            node.literals[literal] = build(wildcards | frozenset(
+                s.literals[literal] for s in states
+                if literal in s.literals
+            ))
+
+        if wildcards:
+            node.wildcard = build(wildcards)
+
+        patterns = [s.pattern for s in states if s.pattern is not None]
+
+        if patterns:
+            node.pattern = max(patterns, key=lambda p: p.specificity)
+
+        return node
+
+    return build(frozenset({root}))
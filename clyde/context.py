@@ -1,2 +1,11 @@
+from .models.interactions import Interaction
+
+
 class Context:
-    pass
+    """ The context a command handler is invoked in. """
+
+    __slots__ = ('interaction',)
+
+    def __init__(self, interaction: Interaction) -> None:
+        self.interaction = interaction
+        """ The interaction that invoked the command. """
@@ -0,0 +1,194 @@
+"""
+Automatic deferral of interactions whose handlers run out of time.
+
+Discord fails an interaction that gets no response within three seconds
+of being created. :class:`AutoDeferrer` runs each handler as a task and
+waits for it only until a budget, measured from the timestamp in the
+interaction's ID, is spent. Handlers that finish in time are answered in
+the HTTP response as usual. Otherwise the interaction is deferred, and the
+handler's result is delivered later by editing the original response.
+
+An edit can't make a message ephemeral, so commands whose responses are
+ephemeral must say so up front, to be deferred with an ephemeral
+"thinking..." message. A late ephemeral result of an interaction that
+was deferred publicly is dropped rather than shown to everyone, as are
+late results that are not messages, such as modals.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from .http.response import (
+    DEFERRED_CHANNEL_MESSAGE,
+    DEFERRED_EPHEMERAL_MESSAGE,
+    DEFERRED_UPDATE_MESSAGE,
+    ResponseBody,
+    message_flags,
+    response_type,
+)
+from .models.interactions import (
+    Interaction,
+    InteractionCallbackType,
+    InteractionType,
+)
+from .models.messages import MessageFlags
+from .models.snowflake import Snowflake
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET = 2.2
+""" Seconds after an interaction's creation to respond by, by default. """
+
+Deliver = Callable[[Interaction, ResponseBody], Awaitable[Any]]
+""" Sends a late result as an edit of an interaction's original response. """
+
+# Components defer by acknowledging the message they're attached to,
+# everything else with a "thinking..." message to be edited later
+_DEFERRALS: Dict[InteractionType, bytes] = {
+    InteractionType.MESSAGE_COMPONENT: DEFERRED_UPDATE_MESSAGE,
+}
+
+# The responses that can still be delivered as an edit
+_LATE_TYPES = frozenset({
+    InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+    InteractionCallbackType.UPDATE_MESSAGE,
+})
+
+
+def remaining_budget(
+    interaction_id: Snowflake,
+    budget: float,
+    *,
+    now: Optional[float] = None,
+) -> float:
+    """
+    Get how many seconds are left of ``budget`` for an interaction,
+    measured from the creation time in its ID.
+
+    The result is clamped to ``[0, budget]``, which absorbs clock skew
+    between this machine and Discord.
+
+    :param now: The current Unix time, defaults to :func:`time.time`
+    :type now: float, optional
+    """
+    if now is None:
+        now = time.time()
+
+    elapsed = now - interaction_id.timestamp / 1000
+    return min(max(budget - elapsed, 0.0), budget)
+
+
+class AutoDeferrer:
+    """ Defers interactions whose handlers exceed a response budget. """
+
+    def __init__(
+        self,
+        deliver: Deliver,
+        *,
+        budget: float = DEFAULT_BUDGET,
+    ) -> None:
+        """
+        :param deliver: Sends a late result to Discord
+        :type deliver: Callable[[Interaction, ResponseBody], Awaitable]
+        :param budget: Seconds after an interaction's creation
+            to wait for its handler before deferring
+        :type budget: float
+        """
+        self.deliver = deliver
+        self.budget = budget
+
+        self._followups: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> Set[asyncio.Task]:
+        """ The tasks delivering late results that have not finished. """
+        return self._followups
+
+    async def run(
+        self,
+        interaction: Interaction,
+        response: Awaitable[ResponseBody],
+        *,
+        ephemeral: bool = False,
+    ) -> ResponseBody:
+        """
+        Wait for a handler's response until the budget is spent.
+
+        :param interaction: The interaction being handled
+        :type interaction: Interaction
+        :param response: The handler's response
+        :type response: Awaitable[ResponseBody]
+        :param ephemeral: Whether the response will be ephemeral, so
+            that the deferral is too. Message components are deferred
+            without a message, so this doesn't apply to them.
+        :type ephemeral: bool
+        :return: The response, or a deferral if it is not ready in time
+        """
+        task = asyncio.ensure_future(response)
+        timeout = remaining_budget(interaction.id, self.budget)
+
+        try:
+            await asyncio.wait((task,), timeout=timeout)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        if task.done():
+            return task.result()
+
+        logger.debug('Deferring interaction %s', interaction.id)
+
+        default = DEFERRED_EPHEMERAL_MESSAGE if ephemeral \
+            else DEFERRED_CHANNEL_MESSAGE
+        deferral = _DEFERRALS.get(interaction.type, default)
+
+        followup = asyncio.ensure_future(self._follow_up(
+            interaction,
+            task,
+            ephemeral=deferral is DEFERRED_EPHEMERAL_MESSAGE,
+        ))
+        self._followups.add(followup)
+        followup.add_done_callback(self._followups.discard)
+
+        return deferral
+
+    async def _follow_up(
+        self,
+        interaction: Interaction,
+        task: 'asyncio.Future[ResponseBody]',
+        *,
+        ephemeral: bool,
+    ) -> None:
+        try:
+            response = await task
+        except Exception:
+            logger.exception(
+                'Deferred handler of interaction %s failed', interaction.id)
+            return
+
+        try:
+            late_type = response_type(response)
+
+            if late_type not in _LATE_TYPES:
+                logger.error(
+                    'Dropping the %s response to interaction %s, which an '
+                    'edit cannot deliver after deferring',
+                    late_type.name, interaction.id)
+                return
+
+            if message_flags(response) & MessageFlags.EPHEMERAL \
+                    and not ephemeral:
+                logger.error(
+                    'Dropping the ephemeral response to interaction %s, '
+                    'which was deferred publicly; declare the command '
+                    'ephemeral', interaction.id)
+                return
+
+            await self.deliver(interaction, response)
+        except Exception:
+            logger.exception(
+                'Failed to deliver response to interaction %s',
+                interaction.id,
+            )
@@ -0,0 +1,125 @@
+"""
+Routing of application command interactions to their handlers.
+
+Handlers are keyed by the command ``id`` Discord assigned when the command
+was registered, with ``(type, name, guild_id)`` as a fallback for commands
+whose ID is not known. Subcommands and subcommand groups are part of the
+key, so resolving a handler is a single dict lookup however deeply the
+command is nested.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .command_spec import CommandSpec
+from .models.command import ApplicationCommand, ApplicationCommandOptionType
+from .models.interactions import ApplicationCommandData, ApplicationCommandType
+from .models.snowflake import Snowflake
+
+CommandPath = Tuple[str, ...]
+""" The names of the subcommand group and subcommand invoked, if any. """
+
+_IdKey = Tuple[Snowflake, CommandPath]
+_NameKey = Tuple[ApplicationCommandType, str, Optional[Snowflake], CommandPath]
+
+_NESTING_TYPES = frozenset({
+    ApplicationCommandOptionType.SUB_COMMAND,
+    ApplicationCommandOptionType.SUB_COMMAND_GROUP,
+})
+
+
+def split_options(
+    options: Optional[List[Dict[str, Any]]],
+) -> Tuple[CommandPath, List[Dict[str, Any]]]:
+    """
+    Split the options of an invoked command into the subcommand path
+    and the options passed to that (sub)command.
+
+    Only the invoked branch is followed, which is at most two levels deep.
+    """
+    path: CommandPath = ()
+
+    while options and options[0].get('type') in _NESTING_TYPES:
+        path += (options[0]['name'],)
+        options = options[0].get('options')
+
+    return path, options or []
+
+
+class CommandRegistry:
+    """ A dispatch table from application commands to their handlers. """
+
+    __slots__ = ('_by_id', '_by_name')
+
+    def __init__(self) -> None:
+        self._by_id: Dict[_IdKey, CommandSpec] = {}
+        self._by_name: Dict[_NameKey, CommandSpec] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def add(
+        self,
+        command: ApplicationCommand,
+        spec: CommandSpec,
+        path: CommandPath = (),
+    ) -> None:
+        """
+        Route a registered command, or one of its subcommands, to ``spec``.
+
+        :param command: The command as returned by Discord on registration
+        :type command: ApplicationCommand
+        :param spec: The handler of the command
+        :type spec: CommandSpec
+        :param path: The subcommand group and/or subcommand names
+            that lead to ``spec``, if it handles a subcommand
+        :type path: Tuple[str, ...]
+        """
+        command_type = command.type or ApplicationCommandType.CHAT_INPUT
+
+        self._by_id[command.id, path] = spec
+        self._by_name[command_type, command.name, command.guild_id, path] = \
+            spec
+
+    def add_name(
+        self,
+        command_type: ApplicationCommandType,
+        name: str,
+        guild_id: Optional[Snowflake],
+        spec: CommandSpec,
+        path: CommandPath = (),
+    ) -> None:
+        """
+        Route a command to ``spec`` by name alone, such as before it is
+        registered and its ID is known.
+
+        :param guild_id: The guild of a guild command, or ``None``
+        :type guild_id: Snowflake, optional
+        """
+        self._by_name[command_type, name, guild_id, path] = spec
+
+    def clear(self) -> None:
+        """ Remove every route, such as before re-registering commands. """
+        self._by_id.clear()
+        self._by_name.clear()
+
+    def resolve(
+        self,
+        data: ApplicationCommandData,
+    ) -> Optional[Tuple[CommandSpec, List[Dict[str, Any]]]]:
+        """
+        Find the handler of an invoked command.
+
+        :return: The handler and the options passed to it, or ``None``
+            if no handler is registered for the command
+        """
+        path, options = split_options(data.options)
+        spec = self._by_id.get((data.id, path))
+
+        if spec is None:
+            spec = self._by_name.get(
+                (data.type, data.name, data.guild_id, path))
+
+            if spec is None:
+                return None
+
+        return spec, options
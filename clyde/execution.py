@@ -0,0 +1,181 @@
+"""
+Execution modes for command handlers.
+
+Handlers run as coroutines on the event loop by default. Handlers that
+block, such as ones that render images, can instead be plain functions
+run in a thread pool or in a process pool:
+
+- :attr:`ExecutionMode.INLINE`: an ``async def`` handler awaited on the
+  event loop.
+- :attr:`ExecutionMode.THREAD`: a ``def`` handler run in a thread pool,
+  for handlers that block on I/O or release the GIL.
+- :attr:`ExecutionMode.PROCESS`: a ``def`` handler run in a process pool,
+  for CPU-bound handlers. The handler must be defined at module level so
+  it can be pickled, and it gets a :class:`~clyde.context.Context` whose
+  interaction carries only the fields listed in :data:`WORKER_FIELDS`.
+  The others, such as ``data``, are ``None``.
+  Its response is serialized in the worker, so only the finished body
+  is sent back.
+"""
+
+import asyncio
+import functools
+import inspect
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .context import Context
+from .http.response import encode_response, to_response
+from .models.interactions import Interaction
+
+
+class ExecutionMode(str, Enum):
+    INLINE = 'inline'
+    """ Await a coroutine handler on the event loop. """
+
+    THREAD = 'thread'
+    """ Run a blocking handler in a thread pool. """
+
+    PROCESS = 'process'
+    """ Run a CPU-bound handler in a process pool. """
+
+
+WORKER_FIELDS = frozenset({
+    'id',
+    'application_id',
+    'type',
+    'guild_id',
+    'channel_id',
+    'member',
+    'user',
+    'locale',
+    'guild_locale',
+    'token',
+    'version',
+})
+""" The interaction fields sent to handlers that run in a process pool. """
+
+
+def check_handler(func: Callable, mode: ExecutionMode) -> None:
+    """
+    Check that ``func`` can be run in ``mode``.
+
+    :raises TypeError: If ``func`` is a coroutine function and ``mode``
+        runs it in a pool, or the other way around
+    """
+    is_coroutine = inspect.iscoroutinefunction(func)
+
+    if mode is ExecutionMode.INLINE and not is_coroutine:
+        raise TypeError(
+            f'{func.__name__} must be a coroutine function (async def) '
+            'to run inline'
+        )
+
+    if mode is not ExecutionMode.INLINE and is_coroutine:
+        raise TypeError(
+            f'{func.__name__} must be a regular function (def) '
+            f'to run in {mode.value} mode'
+        )
+
+
+class HandlerExecutor:
+    """ Runs handlers in their execution mode, and owns the pools. """
+
+    def __init__(
+        self,
+        *,
+        max_threads: Optional[int] = None,
+        max_processes: Optional[int] = None,
+    ) -> None:
+        """
+        :param max_threads: The size of the thread pool, defaults to
+            :class:`~concurrent.futures.ThreadPoolExecutor`'s default
+        :type max_threads: int, optional
+        :param max_processes: The size of the process pool, defaults to
+            the number of CPUs
+        :type max_processes: int, optional
+        """
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+
+        self._pools: Dict[ExecutionMode, Executor] = {}
+
+    def start(self, modes: Iterable[ExecutionMode]) -> None:
+        """ Create the pools that handlers in ``modes`` need. """
+        modes = set(modes)
+
+        if ExecutionMode.THREAD in modes and \
+                ExecutionMode.THREAD not in self._pools:
+            self._pools[ExecutionMode.THREAD] = ThreadPoolExecutor(
+                self.max_threads, thread_name_prefix='clyde-handler')
+
+        if ExecutionMode.PROCESS in modes and \
+                ExecutionMode.PROCESS not in self._pools:
+            self._pools[ExecutionMode.PROCESS] = \
+                ProcessPoolExecutor(self.max_processes)
+
+    async def shutdown(self) -> None:
+        """ Wait for running handlers to finish, then close the pools. """
+        pools = list(self._pools.values())
+        self._pools.clear()
+
+        loop = asyncio.get_running_loop()
+
+        for pool in pools:
+            await loop.run_in_executor(None, pool.shutdown)
+
+    async def run(
+        self,
+        mode: ExecutionMode,
+        func: Callable,
+        ctx: Context,
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        """
+        Run a handler in ``mode``.
+
+        :return: What the handler returned, or the serialized response
+            for handlers run in a process pool
+        :raises RuntimeError: If the pool for ``mode`` was not started
+        """
+        if mode is ExecutionMode.INLINE:
+            return await func(ctx=ctx, **kwargs)
+
+        try:
+            pool = self._pools[mode]
+        except KeyError:
+            raise RuntimeError(
+                f'The {mode.value} pool has not been started') from None
+
+        loop = asyncio.get_running_loop()
+
+        if mode is ExecutionMode.THREAD:
+            return await loop.run_in_executor(
+                pool, functools.partial(func, ctx=ctx, **kwargs))
+
+        return await loop.run_in_executor(
+            pool, _run_in_worker, func, _worker_context(ctx), kwargs)
+
+
+def _worker_context(ctx: Context) -> Context:
+    interaction = ctx.interaction
+
+    return Context(Interaction.construct(
+        interaction.__fields_set__ & WORKER_FIELDS,
+        **{name: getattr(interaction, name) for name in WORKER_FIELDS},
+    ))
+
+
+def _run_in_worker(
+    func: Callable,
+    ctx: Context,
+    kwargs: Dict[str, Any],
+) -> bytes:
+    # Serializing here sends back one bytes object instead of pickling
+    # the response models, and spares the event loop the encoding
+    return encode_response(to_response(func(ctx=ctx, **kwargs)))
@@ -1,5 +1,56 @@
-from .middleware import validate_signature
+from .asgi import ASGIApplication
+from .lifecycle import HANDOVER_SIGNAL, spawn_replacement
+from .listeners import (
+    FDListener,
+    Listener,
+    TCPListener,
+    UnixListener,
+    systemd_listeners,
+)
+from .middleware import (
+    PAYLOAD_KEY,
+    PayloadReader,
+    create_payload_reader,
+    payload_middleware,
+    validate_signature,
+)
 from .payload import JsonPayload
+from .profile import DEFAULT_PROFILE, PERFORMANCE_PROFILE, ServerProfile
+from .response import encode_response, json_response, to_response
 from .server import HTTPServer
+from .verifier import (
+    BatchVerifier,
+    CryptographyVerifier,
+    NaClVerifier,
+    SignatureVerifier,
+    create_verifier,
+)
 
-__all__ = ['validate_signature', 'JsonPayload', 'HTTPServer']
+__all__ = [
+    'ASGIApplication',
+    'HANDOVER_SIGNAL',
+    'spawn_replacement',
+    'FDListener',
+    'Listener',
+    'TCPListener',
+    'UnixListener',
+    'systemd_listeners',
+    'PAYLOAD_KEY',
+    'PayloadReader',
+    'create_payload_reader',
+    'payload_middleware',
+    'validate_signature',
+    'JsonPayload',
+    'DEFAULT_PROFILE',
+    'PERFORMANCE_PROFILE',
+    'ServerProfile',
+    'encode_response',
+    'json_response',
+    'to_response',
+    'HTTPServer',
+    'BatchVerifier',
+    'CryptographyVerifier',
+    'NaClVerifier',
+    'SignatureVerifier',
+    'create_verifier',
+]
@@ -0,0 +1,217 @@
+"""
+Serving interactions from an ASGI server.
+
+:class:`ASGIApplication` runs the same pipeline as the aiohttp server,
+so that interactions can be served by uvicorn, hypercorn or any other
+ASGI server. It verifies each request with the same
+:data:`~clyde.http.middleware.PayloadReader` as the aiohttp middleware,
+then passes the payload to the same handler. Get one from
+:meth:`HTTPServer.asgi() <clyde.http.server.HTTPServer.asgi>` or
+:meth:`ClydeApp.asgi() <clyde.application.ClydeApp.asgi>`::
+
+    app = server.asgi()
+
+and serve it with, for example, ``uvicorn module:app --workers 4``.
+
+Each ASGI worker imports the module separately, so every one of them
+would sync the commands with Discord when it starts. With several
+workers, leave syncing to a single owner instead: get the application
+with ``app.asgi(sync=False)`` and run
+:meth:`ClydeApp.sync_commands() <clyde.application.ClydeApp.sync_commands>`
+once before starting the server.
+"""
+
+import logging
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
+
+from aiohttp import web
+from aiohttp.web_exceptions import (
+    HTTPBadRequest,
+    HTTPMethodNotAllowed,
+    HTTPNotFound,
+    HTTPRequestEntityTooLarge,
+    HTTPServiceUnavailable,
+    HTTPUnauthorized,
+)
+
+from .middleware import PayloadReader
+
+logger = logging.getLogger(__name__)
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+PayloadHandler = Callable[[Any], Awaitable[web.Response]]
+""" Handles a verified interaction payload, like the aiohttp handlers. """
+
+LifespanHook = Callable[[], Awaitable[None]]
+
+_SIGNATURE = b'x-signature-ed25519'
+_TIMESTAMP = b'x-signature-timestamp'
+
+
+class ASGIApplication:
+    """ An ASGI application that serves Discord interactions. """
+
+    def __init__(
+        self,
+        handle: PayloadHandler,
+        reader: Optional[PayloadReader] = None,
+        *,
+        path: str = '/',
+        client_max_size: int = 1024 ** 2,
+        on_startup: Optional[LifespanHook] = None,
+        on_shutdown: Optional[LifespanHook] = None,
+    ) -> None:
+        """
+        :param handle: Handles verified interaction payloads
+        :type handle: PayloadHandler
+        :param reader: Verifies and parses request bodies, which may be
+            left for ``on_startup`` to set if it isn't known yet
+        :type reader: PayloadReader, optional
+        :param path: The path to receive interactions on
+        :type path: str
+        :param client_max_size: The largest request body to accept
+        :type client_max_size: int
+        :param on_startup: Called when the ASGI server starts up
+        :type on_startup: Callable[[], Awaitable[None]], optional
+        :param on_shutdown: Called when the ASGI server shuts down
+        :type on_shutdown: Callable[[], Awaitable[None]], optional
+        """
+        self.handle = handle
+        self.reader = reader
+        self.path = path
+        self.client_max_size = client_max_size
+        self.on_startup = on_startup
+        self.on_shutdown = on_shutdown
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if scope['type'] == 'http':
+            await self._handle_http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self._handle_lifespan(receive, send)
+        else:
+            raise ValueError(f'Unsupported ASGI scope type: {scope["type"]}')
+
+    async def _handle_http(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        try:
+            response = await self._respond(scope, receive)
+        except web.HTTPException as e:
+            response = e
+
+        await _send_response(send, response)
+
+    async def _respond(self, scope: Scope, receive: Receive) -> web.Response:
+        if scope['path'] != self.path:
+            raise HTTPNotFound()
+
+        if scope['method'] != 'POST':
+            raise HTTPMethodNotAllowed(scope['method'], ['POST'])
+
+        headers: Dict[bytes, bytes] = dict(scope['headers'])
+        signature = headers.get(_SIGNATURE)
+        timestamp = headers.get(_TIMESTAMP)
+
+        # Skip reading the body of unsigned requests
+        if signature is None or timestamp is None:
+            raise HTTPUnauthorized(text='Missing request signature')
+
+        body = await self._read_body(receive)
+
+        if self.reader is None:
+            raise HTTPServiceUnavailable(text='Not started')
+
+        payload = await self.reader(
+            signature.decode('latin-1'),
+            timestamp.decode('latin-1'),
+            body,
+        )
+        return await self.handle(payload)
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks: List[bytes] = []
+        size = 0
+
+        while True:
+            message = await receive()
+
+            if message['type'] == 'http.disconnect':
+                raise HTTPBadRequest(text='Client disconnected')
+
+            chunk = message.get('body', b'')
+            size += len(chunk)
+
+            if size > self.client_max_size:
+                raise HTTPRequestEntityTooLarge(
+                    max_size=self.client_max_size, actual_size=size)
+
+            chunks.append(chunk)
+
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def _handle_lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+
+            if message['type'] == 'lifespan.startup':
+                hook, event = self.on_startup, 'lifespan.startup'
+            elif message['type'] == 'lifespan.shutdown':
+                hook, event = self.on_shutdown, 'lifespan.shutdown'
+            else:
+                continue
+
+            try:
+                if hook is not None:
+                    await hook()
+            except Exception as e:
+                logger.exception('ASGI %s failed', event)
+                await send({'type': event + '.failed', 'message': str(e)})
+                return
+
+            await send({'type': event + '.complete'})
+
+            if event == 'lifespan.shutdown':
+                return
+
+
+async def _send_response(send: Send, response: web.Response) -> None:
+    body = response.body
+
+    if not isinstance(body, bytes):
+        body = b''
+
+    headers: List[Tuple[bytes, bytes]] = [
+        (name.lower().encode('latin-1'), value.encode('latin-1'))
+        for name, value in response.headers.items()
+        if name.lower() != 'content-length'
+    ]
+    headers.append((b'content-length', str(len(body)).encode('latin-1')))
+
+    await send({
+        'type': 'http.response.start',
+        'status': response.status,
+        'headers': headers,
+    })
+    await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,298 @@
+"""
+Graceful shutdown and socket handover.
+
+On ``SIGTERM`` or ``SIGINT``, a server stops accepting connections, then
+waits for the requests it is handling and the followups it has pending
+to finish, for up to :attr:`ServerProfile.shutdown_timeout
+<clyde.http.profile.ServerProfile.shutdown_timeout>` seconds.
+
+On :data:`HANDOVER_SIGNAL`, a server starts a new copy of its program
+that inherits its listening sockets, passed like systemd socket
+activation passes them (see :func:`~clyde.http.listeners.systemd_listeners`).
+Once the replacement is serving, it stops the old process with
+``SIGTERM``. Connections queue on the shared sockets all the while, so
+none are refused. Servers with no sockets to pass on, such as workers
+that each bind with ``SO_REUSEPORT``, get a replacement that binds its
+own in the same way.
+
+The replacement is a child of the old process, so process managers that
+track a main process ID may not follow the handover. Before Python 3.10,
+the replacement runs the same script or ``-m`` module with the same
+arguments, but without any interpreter options such as ``-O`` or ``-X``.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import sys
+from contextlib import contextmanager
+from typing import Callable, Collection, Iterator, List, Optional, Sequence
+
+from aiohttp import web
+
+from .listeners import SD_LISTEN_FDS_START, mark_handed_over
+
+logger = logging.getLogger(__name__)
+
+HANDOVER_SIGNAL = getattr(signal, 'SIGUSR2', None)
+""" The signal that starts a handover to a replacement process. """
+
+STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+""" The signals that stop a server gracefully. """
+
+_HANDOVER_PID = 'CLYDE_HANDOVER_PID'
+
+
+class InFlight:
+    """ Counts the requests being handled, to wait for them to finish. """
+
+    __slots__ = ('count', '_waiters')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._waiters: List[asyncio.Future] = []
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """ Count a request while it is being handled. """
+        self.count += 1
+
+        try:
+            yield
+        finally:
+            self.count -= 1
+
+            if not self.count:
+                for waiter in self._waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+                self._waiters.clear()
+
+    async def wait(self) -> None:
+        """ Wait until no requests are being handled. """
+        if not self.count:
+            return
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await waiter
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+
+async def wait_for_stop(
+    *,
+    sockets: Sequence[socket.socket] = (),
+    handover: bool = True,
+    tick: Optional[Callable[[], None]] = None,
+    interval: float = 1.0,
+) -> None:
+    """
+    Wait for ``SIGTERM`` or ``SIGINT``, handing over ``sockets`` to a
+    replacement process on :data:`HANDOVER_SIGNAL` in the meantime.
+
+    :param sockets: The listening sockets to hand over
+    :type sockets: Sequence[socket.socket]
+    :param handover: Whether to start a replacement on
+        :data:`HANDOVER_SIGNAL`
+    :type handover: bool
+    :param tick: Called every ``interval`` seconds while waiting
+    :type tick: Callable[[], None], optional
+    :param interval: Seconds between calls of ``tick``
+    :type interval: float
+    """
+    loop = asyncio.get_event_loop()
+    stop = asyncio.Event()
+    handlers = {signum: stop.set for signum in STOP_SIGNALS}
+
+    if handover and HANDOVER_SIGNAL is not None:
+        handlers[HANDOVER_SIGNAL] = lambda: _try_handover(sockets)
+
+    installed = []
+
+    for signum, handler in handlers.items():
+        try:
+            loop.add_signal_handler(signum, handler)
+        except (NotImplementedError, RuntimeError):
+            continue  # Windows, or not the main thread: KeyboardInterrupt
+
+        installed.append(signum)
+
+    try:
+        while not stop.is_set():
+            if tick is not None:
+                tick()
+
+            try:
+                # Waking up regularly lets Ctrl+C through on Windows
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        for signum in installed:
+            loop.remove_signal_handler(signum)
+
+
+async def drain(
+    runner: web.BaseRunner,
+    in_flight: InFlight,
+    *,
+    timeout: float,
+    followups: Collection['asyncio.Future[None]'] = (),
+) -> None:
+    """
+    Stop accepting connections on the sites of ``runner``, wait for
+    ``in_flight`` requests and ``followups`` to finish for up to
+    ``timeout`` seconds, then clean up ``runner``.
+
+    Followups still pending after ``timeout`` are cancelled.
+    """
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout
+
+    for site in list(runner.sites):
+        await site.stop()
+
+    logger.info(
+        'Draining %d requests and %d followups',
+        in_flight.count, len(followups),
+    )
+
+    try:
+        await asyncio.wait_for(in_flight.wait(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning('%d requests did not finish in time', in_flight.count)
+
+    await finish_followups(
+        followups, timeout=max(deadline - loop.time(), 0.0))
+    await runner.cleanup()
+
+
+async def finish_followups(
+    followups: Collection['asyncio.Future[None]'],
+    *,
+    timeout: float,
+) -> None:
+    """
+    Wait for ``followups`` to finish for up to ``timeout`` seconds,
+    then cancel the rest.
+    """
+    pending = set(followups)
+
+    if pending:
+        _, pending = await asyncio.wait(pending, timeout=timeout)
+
+    if pending:
+        logger.warning('Cancelling %d pending followups', len(pending))
+
+        for task in pending:
+            task.cancel()
+
+        await asyncio.wait(pending)
+
+
+def spawn_replacement(sockets: Sequence[socket.socket]) -> int:
+    """
+    Start a new copy of this program that inherits ``sockets``.
+
+    :return: The process ID of the replacement
+    """
+    argv = [sys.executable] + _program_args()
+
+    env = dict(os.environ)
+    env[_HANDOVER_PID] = str(os.getpid())
+    fds = [sock.fileno() for sock in sockets]
+
+    for name in ('LISTEN_PID', 'LISTEN_FDS', 'LISTEN_FDNAMES'):
+        env.pop(name, None)
+
+    if fds:
+        env['LISTEN_FDS'] = str(len(fds))
+
+    pid = os.fork()
+
+    if pid == 0:  # pragma: no cover (runs in the child)
+        try:
+            _exec_replacement(argv, env, fds)
+        finally:
+            os._exit(127)
+
+    mark_handed_over(sockets)
+    logger.info('Started replacement process %d', pid)
+    return pid
+
+
+def _program_args() -> List[str]:
+    """ Get the arguments that run this program again. """
+    orig_argv = getattr(sys, 'orig_argv', None)  # Python 3.10+
+
+    if orig_argv is not None:
+        return list(orig_argv[1:])
+
+    # Otherwise, sys.argv[0] is the path of a module run with `-m`,
+    # which might not run as a script, so run it by name again
+    spec = getattr(sys.modules['__main__'], '__spec__', None)
+
+    if spec is None:
+        return list(sys.argv)
+
+    name = spec.name
+
+    # `python -m package` runs `package.__main__`
+    if name.endswith('.__main__'):
+        name = name[:-len('.__main__')]
+
+    return ['-m', name] + sys.argv[1:]
+
+
+def finish_handover() -> None:
+    """
+    Stop the process that this one replaced, if any, now that this one
+    is serving.
+    """
+    pid = os.environ.pop(_HANDOVER_PID, None)
+
+    if pid is None:
+        return
+
+    logger.info('Taking over from process %s', pid)
+
+    try:
+        os.kill(int(pid), signal.SIGTERM)
+    except (ProcessLookupError, ValueError):
+        pass
+
+
+def _try_handover(sockets: Sequence[socket.socket]) -> None:
+    try:
+        spawn_replacement(sockets)
+    except OSError:
+        logger.exception('Failed to start a replacement process')
+
+
+def _exec_replacement(
+    argv: List[str],
+    env: dict,
+    fds: List[int],
+) -> None:  # pragma: no cover
+    import fcntl  # Not available on Windows
+
+    # Move the sockets out of the way first, then into place
+    # from the first file descriptor systemd would use
+    start = SD_LISTEN_FDS_START
+    moved = [fcntl.fcntl(fd, fcntl.F_DUPFD, start + len(fds)) for fd in fds]
+
+    for i, fd in enumerate(moved):
+        os.dup2(fd, start + i)
+        os.close(fd)
+
+    if fds:
+        env['LISTEN_PID'] = str(os.getpid())
+
+    os.execve(argv[0], argv, env)
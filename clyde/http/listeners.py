@@ -0,0 +1,343 @@
+"""
+Sockets to serve interactions on.
+
+By default, servers listen on a TCP host and port. A listener can be given
+instead, or several of them:
+
+- :class:`TCPListener`: a TCP host and port.
+- :class:`UnixListener`: a Unix domain socket, for a reverse proxy on the
+  same host, with the permissions of the socket file.
+- :class:`FDListener`: a socket that is already listening, inherited as a
+  file descriptor. :func:`systemd_listeners` gets the sockets passed by
+  systemd socket activation.
+
+Listeners are opened once, before any worker processes are forked, and
+every worker accepts connections from the same sockets. A listener may
+open several sockets, such as one for each address a TCP host has.
+"""
+
+import errno
+import os
+import socket
+import stat
+import weakref
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from aiohttp import web
+
+SD_LISTEN_FDS_START = 3
+""" The first file descriptor passed by systemd socket activation. """
+
+_handed_over: 'weakref.WeakSet[socket.socket]' = weakref.WeakSet()
+
+
+class Listener(ABC):
+    """ Opens a listening socket to serve on. """
+
+    @abstractmethod
+    def open(self, *, backlog: int = 128) -> List[socket.socket]:
+        """
+        Open the listening sockets.
+
+        :param backlog: The most connections waiting to be accepted
+        :type backlog: int
+        """
+
+    def close(self, sock: socket.socket) -> None:
+        """ Close a socket opened by :meth:`open`. """
+        sock.close()
+
+
+class TCPListener(Listener):
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        *,
+        reuse_port: bool = False,
+    ) -> None:
+        """
+        :param host: The host to listen on, on every address it resolves
+            to, defaults to every interface of every address family
+        :type host: str, optional
+        :param port: The port to listen on, defaults to 8080 like aiohttp
+        :type port: int, optional
+        :param reuse_port: Whether to set ``SO_REUSEPORT``
+        :type reuse_port: bool
+        """
+        self.host = host
+        self.port = 8080 if port is None else port
+        self.reuse_port = reuse_port
+
+    def __repr__(self) -> str:
+        return f'TCPListener({self.host!r}, {self.port!r})'
+
+    def open(self, *, backlog: int = 128) -> List[socket.socket]:
+        # Like aiohttp, listen on every address the host resolves to,
+        # which without a host is the wildcard address of each family
+        infos = socket.getaddrinfo(
+            self.host, self.port,
+            family=socket.AF_UNSPEC,
+            type=socket.SOCK_STREAM,
+            flags=socket.AI_PASSIVE,
+        )
+        sockets: List[socket.socket] = []
+
+        try:
+            for family, type_, proto, _, address in dict.fromkeys(infos):
+                try:
+                    sock = socket.socket(family, type_, proto)
+                except OSError:
+                    continue  # The family isn't supported here
+
+                sockets.append(sock)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+                if self.reuse_port:
+                    sock.setsockopt(
+                        socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+                # Leave the IPv4 addresses to their own socket
+                if family == socket.AF_INET6:
+                    sock.setsockopt(
+                        socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 1)
+
+                sock.bind(address)
+                sock.listen(backlog)
+                sock.setblocking(False)
+        except BaseException:
+            for sock in sockets:
+                sock.close()
+
+            raise
+
+        return sockets
+
+
+class UnixListener(Listener):
+    def __init__(
+        self,
+        path: Union[str, 'os.PathLike[str]'],
+        *,
+        mode: int = 0o660,
+        group: Optional[Union[str, int]] = None,
+    ) -> None:
+        """
+        :param path: The path of the socket file, which is replaced if
+            it is a stale socket
+        :type path: str or os.PathLike
+        :param mode: The permissions of the socket file. Connecting
+            requires write permission.
+        :type mode: int
+        :param group: The name or ID of the group to give the socket file,
+            such as that of the reverse proxy
+        :type group: str or int, optional
+        """
+        self.path = os.fspath(path)
+        self.mode = mode
+        self.group = group
+
+    def __repr__(self) -> str:
+        return f'UnixListener({self.path!r})'
+
+    def open(self, *, backlog: int = 128) -> List[socket.socket]:
+        self._remove_stale()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        try:
+            # Create the socket file with its final permissions,
+            # so that it's never reachable by anyone else
+            umask = os.umask(~self.mode & 0o777)
+
+            try:
+                sock.bind(self.path)
+            finally:
+                os.umask(umask)
+
+            if self.group is not None:
+                os.chown(self.path, -1, self._gid())
+
+            os.chmod(self.path, self.mode)
+            sock.listen(backlog)
+            sock.setblocking(False)
+        except BaseException:
+            sock.close()
+            raise
+
+        return [sock]
+
+    def close(self, sock: socket.socket) -> None:
+        # A replacement process may still be serving on the socket file
+        keep = sock in _handed_over
+        sock.close()
+
+        if keep:
+            return
+
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _gid(self) -> int:
+        if isinstance(self.group, int):
+            return self.group
+
+        import grp  # Not available on Windows
+        return grp.getgrnam(str(self.group)).gr_gid
+
+    def _remove_stale(self) -> None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+
+        if not stat.S_ISSOCK(st.st_mode):
+            raise FileExistsError(
+                f'{self.path} exists and is not a socket')
+
+        # Only a socket that nothing is listening on is stale
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.path)
+            except ConnectionRefusedError:
+                os.unlink(self.path)
+                return
+            except FileNotFoundError:
+                return
+
+        raise OSError(
+            errno.EADDRINUSE, f'{self.path} is in use by another server')
+
+
+class FDListener(Listener):
+    def __init__(self, fd: int) -> None:
+        """
+        :param fd: The file descriptor of a listening stream socket
+        :type fd: int
+        """
+        self.fd = fd
+
+    def __repr__(self) -> str:
+        return f'FDListener({self.fd!r})'
+
+    def open(self, *, backlog: int = 128) -> List[socket.socket]:
+        # The socket is already bound and listening, and its
+        # family and type are read from the file descriptor
+        sock = socket.socket(fileno=self.fd)
+
+        if sock.type != socket.SOCK_STREAM:
+            sock.detach()
+            raise ValueError(f'File descriptor {self.fd} is not a stream')
+
+        sock.setblocking(False)
+        return [sock]
+
+
+def create_sites(
+    runner: web.BaseRunner,
+    *,
+    sockets: Sequence[socket.socket] = (),
+    host: Optional[Union[str, Iterable[str]]] = None,
+    port: Optional[int] = None,
+    backlog: int = 128,
+    reuse_port: bool = False,
+) -> List[web.BaseSite]:
+    """
+    Create the sites to serve ``runner`` on: one for each of ``sockets``,
+    or else one for each ``host`` on ``port``.
+    """
+    if sockets:
+        return [
+            web.SockSite(runner, sock, backlog=backlog)
+            for sock in sockets
+        ]
+
+    hosts = [host] if host is None or isinstance(host, str) else host
+
+    return [
+        web.TCPSite(
+            runner, h, port, backlog=backlog, reuse_port=reuse_port)
+        for h in hosts
+    ]
+
+
+def resolve_listeners(
+    listeners: Optional[Sequence[Listener]],
+    host: Optional[Union[str, Iterable[str]]],
+    port: Optional[int],
+) -> List[Listener]:
+    """
+    Get the sockets passed by systemd socket activation or a handover
+    (see :mod:`clyde.http.lifecycle`) if there are any, or else
+    ``listeners``, or else TCP listeners for each ``host`` on ``port``.
+    """
+    inherited = systemd_listeners()
+
+    if inherited:
+        return inherited
+
+    if listeners is not None:
+        return list(listeners)
+
+    hosts = [host] if host is None or isinstance(host, str) else host
+    return [TCPListener(h, port) for h in hosts]
+
+
+def mark_handed_over(sockets: Iterable[socket.socket]) -> None:
+    """
+    Mark ``sockets`` as passed on to a replacement process, so that
+    closing them leaves their socket files in place for it.
+    """
+    _handed_over.update(sockets)
+
+
+@contextmanager
+def open_listeners(
+    listeners: Sequence[Listener],
+    *,
+    backlog: int = 128,
+) -> Iterator[List[socket.socket]]:
+    """ Open the sockets of ``listeners``, and close them on exit. """
+    opened: List[Tuple[Listener, socket.socket]] = []
+
+    try:
+        for listener in listeners:
+            opened.extend(
+                (listener, sock) for sock in listener.open(backlog=backlog))
+
+        yield [sock for _, sock in opened]
+    finally:
+        for listener, sock in reversed(opened):
+            listener.close(sock)
+
+
+def systemd_listeners(*, unset_environment: bool = True) -> List[Listener]:
+    """
+    Get the sockets passed to this process by systemd socket activation,
+    which is empty if there are none.
+
+    :param unset_environment: Whether to remove the variables that pass
+        the sockets from the environment, so that child processes don't
+        mistake them for their own
+    :type unset_environment: bool
+    """
+    try:
+        pid = int(os.environ['LISTEN_PID'])
+        count = int(os.environ['LISTEN_FDS'])
+    except (KeyError, ValueError):
+        return []
+    finally:
+        if unset_environment:
+            for name in ('LISTEN_PID', 'LISTEN_FDS', 'LISTEN_FDNAMES'):
+                os.environ.pop(name, None)
+
+    if pid != os.getpid():
+        return []
+
+    return [
+        FDListener(fd)
+        for fd in range(SD_LISTEN_FDS_START, SD_LISTEN_FDS_START + count)
+    ]
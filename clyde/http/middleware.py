@@ -1,36 +1,152 @@
-from typing import Awaitable, Callable
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Optional, Union
 
-from aiohttp.web import HTTPUnauthorized, Request, StreamResponse, middleware
-from nacl.exceptions import BadSignatureError
+from aiohttp.web import (
+    HTTPBadRequest,
+    HTTPUnauthorized,
+    Request,
+    StreamResponse,
+    middleware,
+)
 from nacl.signing import VerifyKey
 
+from clyde.internal.json import loads
 
-def validate_signature(key: VerifyKey):
+from .verifier import BatchVerifier, SignatureVerifier, create_verifier
+
+PAYLOAD_KEY = 'clyde.payload'
+""" The request key under which the parsed interaction body is stored. """
+
+PayloadReader = Callable[[Optional[str], Optional[str], bytes], Awaitable[Any]]
+""" Verifies a request's signature and timestamp headers against its raw
+body, then parses the body. """
+
+
+def create_payload_reader(
+    verifier: Union[SignatureVerifier, VerifyKey],
+    *,
+    offload: bool = False,
+    executor: Optional[Executor] = None,
+    max_batch_size: int = 64,
+) -> PayloadReader:
+    """
+    Create a function that checks the ``X-Signature-Ed25519`` and
+    ``X-Signature-Timestamp`` header values of a request against its raw
+    body with ``verifier``, then parses the body as JSON.
+
+    This is the part of :func:`validate_signature` that doesn't depend on
+    aiohttp, shared with :class:`~clyde.http.asgi.ASGIApplication`.
+
+    :param verifier: The verifier to check signatures with. A bare
+        ``VerifyKey`` uses the fastest installed backend.
+    :type verifier: SignatureVerifier or VerifyKey
+    :param offload: Whether to verify signatures in ``executor`` (batching
+        concurrent requests) instead of on the event loop
+    :type offload: bool
+    :param executor: The executor to verify in when ``offload`` is set,
+        defaults to the event loop's default executor
+    :type executor: Executor, optional
+    :param max_batch_size: The most signatures to verify per executor hop
+    :type max_batch_size: int
+    :raises HTTPUnauthorized: From the returned function, if the signature
+        is missing or invalid
+    :raises HTTPBadRequest: From the returned function, if the body is
+        not valid JSON
+    """
+    if isinstance(verifier, VerifyKey):
+        verifier = create_verifier(bytes(verifier))
+
+    verify: Callable[[bytes, bytes], Awaitable[bool]]
+
+    if offload:
+        batcher = BatchVerifier(
+            verifier, executor=executor, max_batch_size=max_batch_size)
+        verify = batcher.verify
+    else:
+        verify_sync = verifier.verify
+
+        async def _verify_inline(message: bytes, signature: bytes) -> bool:
+            return verify_sync(message, signature)
+
+        verify = _verify_inline
+
+    async def _read(
+        signature: Optional[str],
+        timestamp: Optional[str],
+        body: bytes,
+    ) -> Any:
+        if signature is None or timestamp is None:
+            raise HTTPUnauthorized(text='Missing request signature')
+
+        try:
+            sig = bytes.fromhex(signature)
+        except ValueError as e:
+            raise HTTPUnauthorized(text='Invalid request signature') from e
+
+        # The signed message is the raw body prefixed with the timestamp
+        if not await verify(timestamp.encode() + body, sig):
+            raise HTTPUnauthorized(text='Invalid request signature')
+
+        try:
+            return loads(body)
+        except ValueError as e:
+            raise HTTPBadRequest(text='Invalid request body') from e
+
+    return _read
+
+
+def validate_signature(
+    verifier: Union[SignatureVerifier, VerifyKey],
+    *,
+    offload: bool = False,
+    executor: Optional[Executor] = None,
+    max_batch_size: int = 64,
+):
     """
     Create a middleware that validates inbound Discord interactions
-    against the provided ``key`` using the request's
+    against the provided ``verifier`` using the request's
     ``X-Signature-Ed25519`` and ``X-Signature-Timestamp`` headers.
+
+    The raw body is read exactly once. After the signature is verified,
+    it is parsed as JSON and stored in the request under
+    :data:`PAYLOAD_KEY` so handlers never have to decode it again.
+
+    The parameters are those of :func:`create_payload_reader`.
     """
+    return payload_middleware(create_payload_reader(
+        verifier,
+        offload=offload,
+        executor=executor,
+        max_batch_size=max_batch_size,
+    ))
 
+
+def payload_middleware(read_payload: PayloadReader):
+    """
+    Create a middleware that reads the interaction body of each request
+    with ``read_payload`` and stores it under :data:`PAYLOAD_KEY`.
+
+    :param read_payload: Verifies and parses request bodies,
+        such as a function from :func:`create_payload_reader`
+    :type read_payload: PayloadReader
+    """
     @middleware
     async def _impl(
         request: Request,
         handler: Callable[[Request], Awaitable[StreamResponse]],
     ) -> StreamResponse:
-        try:
-            signature = request.headers['X-Signature-Ed25519']
-            timestamp = request.headers['X-Signature-Timestamp']
-        except KeyError as e:
-            raise HTTPUnauthorized(text='Missing request signature') from e
+        headers = request.headers
 
-        # The signed message is the decoded body prefixed with the timestamp
-        body = await request.text()
-        smessage = (timestamp + body).encode()
+        # Skip reading the body of unsigned requests
+        if 'X-Signature-Ed25519' not in headers or \
+                'X-Signature-Timestamp' not in headers:
+            raise HTTPUnauthorized(text='Missing request signature')
 
-        try:
-            key.verify(smessage, bytes.fromhex(signature))
-        except BadSignatureError as e:
-            raise HTTPUnauthorized(text='Invalid request signature') from e
+        request[PAYLOAD_KEY] = await read_payload(
+            headers['X-Signature-Ed25519'],
+            headers['X-Signature-Timestamp'],
+            await request.read(),
+        )
 
         # Everything looks good, continue as normal
         return await handler(request)
@@ -0,0 +1,116 @@
+from typing import Any, Dict, Union
+
+from aiohttp.web import Response
+
+from clyde.internal.json import dumps_bytes, loads
+
+from ..models.interactions import (
+    InteractionCallbackData,
+    InteractionCallbackType,
+    InteractionResponse,
+)
+from ..models.messages import MessageFlags
+
+ResponseBody = Union[InteractionResponse, bytes]
+""" An interaction response, either as a model or already serialized. """
+
+_CONTENT_TYPE = 'application/json'
+
+# Responses that carry nothing but their type never change,
+# so serialize each of them once up front
+_TYPE_ONLY_BODIES: Dict[InteractionCallbackType, bytes] = {
+    t: dumps_bytes({'type': t.value}) for t in InteractionCallbackType
+}
+
+PONG = _TYPE_ONLY_BODIES[InteractionCallbackType.PONG]
+""" The serialized response to a ``PING`` interaction. """
+
+DEFERRED_CHANNEL_MESSAGE = _TYPE_ONLY_BODIES[
+    InteractionCallbackType.DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE]
+""" The serialized ``DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE`` response. """
+
+DEFERRED_EPHEMERAL_MESSAGE = dumps_bytes({
+    'type': InteractionCallbackType.DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE,
+    'data': {'flags': MessageFlags.EPHEMERAL},
+})
+"""
+The serialized ``DEFERRED_CHANNEL_MESSAGE_WITH_SOURCE`` response whose
+message will be ephemeral.
+"""
+
+DEFERRED_UPDATE_MESSAGE = _TYPE_ONLY_BODIES[
+    InteractionCallbackType.DEFERRED_UPDATE_MESSAGE]
+""" The serialized ``DEFERRED_UPDATE_MESSAGE`` response. """
+
+
+def encode_response(response: ResponseBody) -> bytes:
+    """
+    Serialize an interaction response to JSON in a single pass.
+
+    Pre-serialized ``bytes`` are returned as-is, and responses without
+    ``data`` come from a cache of prebuilt bodies.
+    """
+    if isinstance(response, bytes):
+        return response
+
+    if response.data is None:
+        return _TYPE_ONLY_BODIES[response.type]
+
+    return dumps_bytes(response)
+
+
+def to_response(result: Any) -> ResponseBody:
+    """
+    Convert the return value of a command handler to a response.
+
+    A ``str`` is sent as the content of a message and bare callback data
+    as a message; responses and serialized ``bytes`` are sent as-is.
+
+    :raises TypeError: If ``result`` is none of the above
+    """
+    if isinstance(result, (bytes, InteractionResponse)):
+        return result
+
+    if isinstance(result, str):
+        result = InteractionCallbackData.construct(content=result)
+
+    if isinstance(result, InteractionCallbackData):
+        return InteractionResponse(
+            type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+            data=result,
+        )
+
+    raise TypeError(
+        f'Cannot respond to an interaction with {type(result).__name__}')
+
+
+def response_type(response: ResponseBody) -> InteractionCallbackType:
+    """ Get the type of an interaction response. """
+    if isinstance(response, bytes):
+        return InteractionCallbackType(loads(response)['type'])
+
+    return response.type
+
+
+def callback_data(response: ResponseBody) -> Any:
+    """
+    Get the ``data`` of an interaction response, such as to send it
+    as a message edit instead. Responses without data give ``{}``.
+    """
+    if isinstance(response, bytes):
+        return loads(response).get('data') or {}
+
+    return response.data or {}
+
+
+def message_flags(response: ResponseBody) -> int:
+    """ Get the message flags of an interaction response, or ``0``. """
+    if isinstance(response, bytes):
+        return callback_data(response).get('flags') or 0
+
+    return getattr(response.data, 'flags', None) or 0
+
+
+def json_response(response: ResponseBody) -> Response:
+    """ Create an aiohttp response for an interaction response. """
+    return Response(body=encode_response(response), content_type=_CONTENT_TYPE)
@@ -1,19 +1,27 @@
-import functools
 import logging
-from json import JSONEncoder
-from typing import Any, Optional, Union
+import socket
+from concurrent.futures import Executor
+from typing import Any, Dict, Optional, Sequence, Union
 
 from aiohttp import web
 from aiohttp.web import HostSequence, Request, Response
 from aiohttp.web_exceptions import HTTPBadRequest
-from nacl.signing import VerifyKey
-from pydantic import BaseModel
-
-from clyde.internal.json import dumps_str
 
 from ..interaction_handler import InteractionHandler
 from ..models.interactions import Interaction, InteractionType
-from .middleware import validate_signature
+from .asgi import ASGIApplication
+from .lifecycle import InFlight, drain, finish_handover, wait_for_stop
+from .listeners import (
+    Listener,
+    create_sites,
+    open_listeners,
+    resolve_listeners,
+)
+from .middleware import PAYLOAD_KEY, create_payload_reader, payload_middleware
+from .profile import DEFAULT_PROFILE, ServerProfile
+from .response import json_response
+from .verifier import create_verifier
+from .workers import Worker, WorkerSupervisor, worker_listeners
 
 logger = logging.getLogger(__name__)
 
@@ -24,42 +32,184 @@ class HTTPServer:
         *,
         host: Optional[Union[str, HostSequence]] = None,
         port: Optional[int] = None,
+        listeners: Optional[Sequence[Listener]] = None,
         path: str = '/',
         public_key: bytes,
+        verifier_backend: Optional[str] = None,
+        offload_verification: bool = False,
+        verification_executor: Optional[Executor] = None,
+        trusted_parsing: bool = False,
+        profile: ServerProfile = DEFAULT_PROFILE,
     ) -> None:
         self.host = host
         self.port = port
+        self.listeners = listeners
+        self.path = path
+        self.trusted_parsing = trusted_parsing
+        self.profile = profile
         self.handler = InteractionHandler()
 
-        self._app = web.Application(middlewares=[
-            validate_signature(VerifyKey(public_key)),
-        ])
+        self.supervisor: Optional[WorkerSupervisor] = None
+        """ The supervisor of the worker processes, if there are any. """
+
+        self._requests = 0
+        self._in_flight = InFlight()
+        self._runner: Optional[web.AppRunner] = None
+
+        self._read_payload = create_payload_reader(
+            create_verifier(public_key, verifier_backend),
+            offload=offload_verification,
+            executor=verification_executor,
+        )
+        self._app = web.Application(
+            middlewares=[payload_middleware(self._read_payload)],
+            client_max_size=profile.client_max_size,
+        )
         self._app.router.add_post(path, self._handle_interaction)
 
-    def run(self) -> None:
-        web.run_app(
-            self._app,
-            host=self.host,
-            port=self.port,
-            print=None,  # type: ignore[arg-type]
+    def run(
+        self,
+        *,
+        workers: int = 1,
+        reuse_port: Optional[bool] = None,
+    ) -> None:
+        """
+        Serve until interrupted, then shut down gracefully
+        (see :mod:`clyde.http.lifecycle`).
+
+        :param workers: The number of worker processes to serve with
+            (see :mod:`clyde.http.workers`)
+        :type workers: int
+        :param reuse_port: Whether workers each bind the port with
+            ``SO_REUSEPORT`` instead of sharing one inherited socket,
+            defaults to whether the platform balances connections that way
+        :type reuse_port: bool, optional
+        """
+        if workers == 1:
+            with open_listeners(
+                resolve_listeners(self.listeners, self.host, self.port),
+                backlog=self.profile.backlog,
+            ) as sockets:
+                self.profile.run(self._serve(sockets))
+            return
+
+        listeners = worker_listeners(
+            self.host,
+            self.port,
+            listeners=self.listeners,
+            reuse_port=reuse_port,
+        )
+
+        with open_listeners(
+            listeners, backlog=self.profile.backlog,
+        ) as sockets:
+            self.supervisor = WorkerSupervisor(
+                self._serve_worker, workers=workers, sockets=sockets)
+            self.supervisor.run()
+
+    def asgi(self) -> ASGIApplication:
+        """
+        Get an ASGI application that serves the same interactions,
+        for running under an ASGI server instead of :meth:`run`
+        (see :mod:`clyde.http.asgi`).
+        """
+        return ASGIApplication(
+            self._handle_payload,
+            self._read_payload,
+            path=self.path,
+            client_max_size=self.profile.client_max_size,
         )
 
-    async def start(self):
-        runner = web.AppRunner(self._app)
+    def metrics(self) -> Dict[str, int]:
+        """ Get the request count of this process. """
+        return {'requests': self._requests}
+
+    async def start(
+        self,
+        *,
+        sockets: Sequence[socket.socket] = (),
+        reuse_port: bool = False,
+    ) -> None:
+        """
+        Start serving in the background, until :meth:`stop`.
+
+        :param sockets: Listening sockets to serve on instead of
+            the host and port
+        :type sockets: Sequence[socket.socket]
+        :param reuse_port: Whether to bind the port with ``SO_REUSEPORT``
+        :type reuse_port: bool
+        """
+        if self._runner is not None:
+            raise RuntimeError('Server is already started')
+
+        runner = web.AppRunner(self._app, **self.profile.runner_kwargs())
         await runner.setup()
-        site = web.TCPSite(runner, self.host, self.port)
-        await site.start()
-        await runner.cleanup()
 
-    async def stop(self):
-        await self._app.shutdown()
+        try:
+            for site in create_sites(
+                runner,
+                sockets=sockets,
+                host=self.host,
+                port=self.port,
+                backlog=self.profile.backlog,
+                reuse_port=reuse_port,
+            ):
+                await site.start()
+        except BaseException:
+            await runner.cleanup()
+            raise
+
+        self._runner = runner
+
+    async def stop(self) -> None:
+        """
+        Stop accepting connections, and wait for the requests being
+        handled to finish for up to
+        :attr:`~clyde.http.profile.ServerProfile.shutdown_timeout` seconds.
+        """
+        runner, self._runner = self._runner, None
+
+        if runner is not None:
+            await drain(
+                runner, self._in_flight,
+                timeout=self.profile.shutdown_timeout)
+
+    async def _serve(self, sockets: Sequence[socket.socket]) -> None:
+        await self.start(sockets=sockets)
+
+        try:
+            finish_handover()
+            await wait_for_stop(sockets=sockets)
+        finally:
+            await self.stop()
+
+    def _serve_worker(self, worker: Worker) -> None:
+        async def _main() -> None:
+            await self.start(
+                sockets=worker.sockets, reuse_port=not worker.sockets)
+
+            try:
+                await worker.serve_until_stopped(self.metrics)
+            finally:
+                await self.stop()
+
+        self.profile.run(_main())
 
     async def _handle_interaction(self, request: Request) -> Response:
+        return await self._handle_payload(request[PAYLOAD_KEY])
+
+    async def _handle_payload(self, obj: Any) -> Response:
+        self._requests += 1
+
+        with self._in_flight.track():
+            return await self._dispatch(obj)
+
+    async def _dispatch(self, obj: Any) -> Response:
         # Parse the interaction from JSON
         try:
-            obj = await request.json()
-            logger.debug('Received interaction: %r', await request.text())
-            interaction = Interaction.parse_obj(obj)
+            logger.debug('Received interaction: %r', obj)
+            interaction = Interaction.parse_lazy(
+                obj, trusted=self.trusted_parsing)
         except Exception as e:
             logger.error('Failed to read interaction body')
             raise HTTPBadRequest(text='Invalid request') from e
@@ -71,23 +221,10 @@ class HTTPServer:
             data = await self.handler.handle_application_command(interaction)
         elif interaction.type == InteractionType.MESSAGE_COMPONENT:
             data = await self.handler.handle_message_component(interaction)
+        elif interaction.type == \
+                InteractionType.APPLICATION_COMMAND_AUTOCOMPLETE:
+            data = await self.handler.handle_autocomplete(interaction)
         else:
             raise HTTPBadRequest(text='Unknown interaction type')
 
-        return web.json_response(data, dumps=_dumps_custom)
-
-
-class PydanticJSONEncoder(JSONEncoder):
-    def default(self, o: Any) -> Any:
-        if isinstance(o, BaseModel):
-            return o.dict(exclude_unset=True)
-
-        return super().default(o)
-
-
-_dumps_custom = functools.partial(
-    dumps_str,
-    cls=PydanticJSONEncoder,
-    separators=(',', ':'),
-    indent=None,
-)
+        return json_response(data)
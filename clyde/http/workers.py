@@ -0,0 +1,392 @@
+"""
+Multi-process serving.
+
+:class:`WorkerSupervisor` forks worker processes that all serve the same
+port, and restarts any that die. Everything built before the fork, such
+as application info, command tables and compiled routers, is shared with
+the workers copy-on-write. Following the recipe of :func:`gc.freeze`, the
+garbage collector is disabled while those objects are built and frozen
+right before each fork, so that it never touches them and un-shares
+their memory pages. Workers enable it again but never unfreeze.
+
+The workers either accept from listening sockets that the parent opened
+and they inherited (see :mod:`clyde.http.listeners`), or each bind their
+own socket to the same TCP port with ``SO_REUSEPORT``. With
+``SO_REUSEPORT``, the kernel balances connections between workers.
+
+Each worker publishes a snapshot of its metrics into memory shared with
+the parent and every other worker, so :meth:`WorkerSupervisor.metrics`
+adds them up in any of those processes.
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from multiprocessing.sharedctypes import RawArray
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .lifecycle import (
+    HANDOVER_SIGNAL,
+    STOP_SIGNALS,
+    finish_handover,
+    spawn_replacement,
+    wait_for_stop,
+)
+from .listeners import Listener, TCPListener, systemd_listeners
+
+logger = logging.getLogger(__name__)
+
+METRICS = (
+    'requests',
+    'in_flight',
+    'backlog',
+    'shed_expired',
+    'shed_queue_full',
+    'rate_limited',
+    'rate_limit_wait_ms',
+)
+""" The metrics that workers publish. """
+
+GAUGES = frozenset({'in_flight', 'backlog'})
+""" The metrics that are current levels rather than running totals. """
+
+PUBLISH_INTERVAL = 1.0
+""" Seconds between metric snapshots from each worker. """
+
+_MIN_UPTIME = 1.0
+_MAX_RESTART_DELAY = 30.0
+_RESTART_POLL_INTERVAL = 0.1
+
+
+def can_reuse_port() -> bool:
+    """ Whether this platform balances ``SO_REUSEPORT`` connections. """
+    return hasattr(socket, 'SO_REUSEPORT') and sys.platform.startswith('linux')
+
+
+def worker_listeners(
+    host: Optional[Union[str, Iterable[str]]],
+    port: Optional[int],
+    *,
+    listeners: Optional[Sequence[Listener]] = None,
+    reuse_port: Optional[bool] = None,
+) -> List[Listener]:
+    """
+    Get the listeners for workers serving on ``host`` and ``port`` to
+    inherit, which is none if they each bind their own.
+
+    Sockets passed by systemd socket activation or a handover are
+    used if there are any, or else ``listeners`` if given.
+
+    :param listeners: The listeners to use instead of ``host`` and ``port``
+    :type listeners: Sequence[Listener], optional
+    :param reuse_port: Whether workers each bind the port with
+        ``SO_REUSEPORT``, defaults to :func:`can_reuse_port`
+    :type reuse_port: bool, optional
+    """
+    inherited = systemd_listeners()
+
+    if inherited:
+        return inherited
+
+    if listeners is not None:
+        return list(listeners)
+
+    if host is not None and not isinstance(host, str):
+        raise ValueError('Multiple workers can only listen on one host')
+
+    if reuse_port is None:
+        reuse_port = can_reuse_port()
+
+    return [] if reuse_port else [TCPListener(host, port)]
+
+
+class Worker:
+    """ A worker process, as seen from inside of it. """
+
+    __slots__ = ('slot', 'sockets', '_metrics')
+
+    def __init__(
+        self,
+        slot: int,
+        sockets: Sequence[socket.socket],
+        metrics: Any,
+    ) -> None:
+        self.slot = slot
+        """ The index of this worker, from ``0`` to ``workers - 1``. """
+
+        self.sockets = sockets
+        """
+        The inherited listening sockets, or none if the worker should
+        bind its own with ``SO_REUSEPORT``.
+        """
+
+        self._metrics = metrics
+
+    def publish(self, metrics: Mapping[str, int]) -> None:
+        """ Publish a snapshot of this worker's metrics. """
+        offset = self.slot * len(METRICS)
+
+        for i, name in enumerate(METRICS):
+            self._metrics[offset + i] = metrics.get(name, 0)
+
+    async def serve_until_stopped(
+        self,
+        metrics: Callable[[], Mapping[str, int]],
+    ) -> None:
+        """
+        Publish ``metrics()`` periodically until
+        the worker is asked to stop with ``SIGTERM`` or ``SIGINT``.
+        """
+        await wait_for_stop(
+            handover=False,
+            tick=lambda: self.publish(metrics()),
+            interval=PUBLISH_INTERVAL,
+        )
+        self.publish(metrics())
+
+
+class WorkerSupervisor:
+    """ Forks worker processes and keeps them running. """
+
+    def __init__(
+        self,
+        target: Callable[[Worker], None],
+        *,
+        workers: int,
+        sockets: Sequence[socket.socket] = (),
+    ) -> None:
+        """
+        :param target: Runs in each worker process and serves until the
+            worker is stopped
+        :type target: Callable[[Worker], None]
+        :param workers: The number of worker processes
+        :type workers: int
+        :param sockets: The listening sockets for workers to inherit,
+            or none if they each bind their own with ``SO_REUSEPORT``
+        :type sockets: Sequence[socket.socket]
+        """
+        if not hasattr(os, 'fork'):
+            raise RuntimeError('Multiple workers require os.fork()')
+
+        if workers < 1:
+            raise ValueError('workers must be at least 1')
+
+        self.target = target
+        self.workers = workers
+        self.sockets = sockets
+
+        # One row of metrics per worker, then one with the running
+        # totals of workers that were restarted
+        self._metrics = RawArray('q', (workers + 1) * len(METRICS))
+        self._pids: Dict[int, int] = {}  # pid -> slot
+        self._started: Dict[int, float] = {}  # slot -> start time
+        self._failures: Dict[int, int] = {}  # slot -> consecutive failures
+        self._restarts: Dict[int, float] = {}  # slot -> when to restart
+        self._stopping = False
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Get the metrics of all workers added up, including the totals
+        of workers that have since been restarted.
+        """
+        totals = dict.fromkeys(METRICS, 0)
+
+        for slot in range(self.workers + 1):
+            for name, value in self._slot_metrics(slot).items():
+                totals[name] += value
+
+        return totals
+
+    def run(self) -> None:
+        """
+        Start the workers and supervise them until ``SIGTERM`` or
+        ``SIGINT``, which is passed on to every worker.
+
+        On :data:`~clyde.http.lifecycle.HANDOVER_SIGNAL`, a replacement
+        process is started that inherits the sockets.
+        """
+        handlers: Dict[int, Any] = {
+            signum: self._handle_stop for signum in STOP_SIGNALS}
+
+        if HANDOVER_SIGNAL is not None:
+            handlers[HANDOVER_SIGNAL] = self._handle_handover
+
+        previous = {
+            signum: signal.signal(signum, handler)
+            for signum, handler in handlers.items()
+        }
+
+        try:
+            for slot in range(self.workers):
+                self._spawn(slot)
+
+            finish_handover()
+            self._supervise()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+            # No worker is left to share memory pages with
+            gc.unfreeze()
+
+        logger.info('All workers stopped: %r', self.metrics())
+
+    def stop(self) -> None:
+        """ Ask every worker to stop, and stop restarting them. """
+        self._stopping = True
+        self._restarts.clear()
+
+        for pid in self._pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _handle_stop(self, signum: int, frame: Any) -> None:
+        self.stop()
+
+    def _handle_handover(self, signum: int, frame: Any) -> None:
+        if self._stopping:
+            return
+
+        try:
+            spawn_replacement(self.sockets)
+        except OSError:
+            logger.exception('Failed to start a replacement process')
+
+    def _spawn(self, slot: int) -> None:
+        self._slot_metrics_reset(slot)
+
+        # Objects built so far are shared with the worker, so keep
+        # the garbage collector from writing to their memory pages
+        gc.freeze()
+        pid = os.fork()
+
+        if pid == 0:  # pragma: no cover (runs in the child)
+            self._run_child(slot)
+
+        logger.debug('Started worker %d (pid %d)', slot, pid)
+        self._pids[pid] = slot
+        self._started[slot] = time.monotonic()
+
+        # A stop that came in before the worker was recorded missed it
+        if self._stopping:
+            os.kill(pid, signal.SIGTERM)
+
+    def _run_child(self, slot: int) -> None:  # pragma: no cover
+        code = 0
+
+        try:
+            for signum in STOP_SIGNALS:
+                signal.signal(signum, signal.SIG_DFL)
+
+            # Handovers are started by the supervisor
+            if HANDOVER_SIGNAL is not None:
+                signal.signal(HANDOVER_SIGNAL, signal.SIG_IGN)
+
+            # Unfreezing would have the next full collection un-share
+            # every page, so new objects are collected as usual instead
+            gc.enable()
+            self.target(Worker(slot, self.sockets, self._metrics))
+        except BaseException:
+            logger.exception('Worker %d crashed', slot)
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def _supervise(self) -> None:
+        while self._pids or self._restarts:
+            self._restart_due()
+
+            # Poll while restarts are scheduled, so they start on time
+            try:
+                pid, status = os.waitpid(
+                    -1, os.WNOHANG if self._restarts else 0)
+            except ChildProcessError:
+                if not self._restarts:
+                    break
+
+                pid = 0
+
+            if pid == 0:
+                time.sleep(_RESTART_POLL_INTERVAL)
+                continue
+
+            slot = self._pids.pop(pid, None)
+
+            if slot is None:
+                continue  # Not one of the workers
+
+            self._retire(slot)
+
+            if self._stopping:
+                logger.debug('Worker %d stopped', slot)
+                continue
+
+            logger.warning(
+                'Worker %d (pid %d) exited with status %d, restarting',
+                slot, pid, status,
+            )
+            self._schedule_restart(slot)
+
+    def _schedule_restart(self, slot: int) -> None:
+        now = time.monotonic()
+
+        # Back off if the worker keeps dying right after starting
+        if now - self._started[slot] < _MIN_UPTIME:
+            self._failures[slot] = self._failures.get(slot, 0) + 1
+            delay = min(2.0 ** self._failures[slot], _MAX_RESTART_DELAY)
+            logger.info('Restarting worker %d in %.0fs', slot, delay)
+        else:
+            self._failures[slot] = 0
+            delay = 0.0
+
+        self._restarts[slot] = now + delay
+
+    def _restart_due(self) -> None:
+        now = time.monotonic()
+
+        for slot, due in list(self._restarts.items()):
+            if due <= now and self._restarts.pop(slot, None) is not None:
+                self._spawn(slot)
+
+    def _retire(self, slot: int) -> None:
+        # Keep the running totals of the dead worker, but not its levels
+        offset = slot * len(METRICS)
+        retired = self.workers * len(METRICS)
+
+        for i, name in enumerate(METRICS):
+            if name not in GAUGES:
+                self._metrics[retired + i] += self._metrics[offset + i]
+
+        self._slot_metrics_reset(slot)
+
+    def _slot_metrics(self, slot: int) -> Dict[str, int]:
+        offset = slot * len(METRICS)
+
+        return {
+            name: self._metrics[offset + i]
+            for i, name in enumerate(METRICS)
+        }
+
+    def _slot_metrics_reset(self, slot: int) -> None:
+        offset = slot * len(METRICS)
+
+        for i in range(len(METRICS)):
+            self._metrics[offset + i] = 0
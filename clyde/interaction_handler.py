@@ -1,4 +1,13 @@
+from typing import Optional
+
+from aiohttp.web_exceptions import HTTPBadRequest
+
+from .autocomplete import AutocompleteEngine
+from .components import ComponentRouter
+from .context import Context
+from .http.response import PONG, ResponseBody, to_response
 from .models.interactions import (
+    ComponentData,
     Interaction,
     InteractionCallbackData,
     InteractionCallbackType,
@@ -8,16 +17,37 @@ from .models.messages import MessageFlags
 
 
 class InteractionHandler:
+    def __init__(
+        self,
+        *,
+        components: Optional[ComponentRouter] = None,
+        autocompleter: Optional[AutocompleteEngine] = None,
+    ) -> None:
+        """
+        :param components: The router for message component interactions
+        :type components: ComponentRouter, optional
+        :param autocompleter: The handler of autocomplete interactions
+        :type autocompleter: AutocompleteEngine, optional
+        """
+        if components is None:
+            components = ComponentRouter()
+
+        if autocompleter is None:
+            autocompleter = AutocompleteEngine()
+
+        self.components = components
+        self.autocompleter = autocompleter
+
     async def handle_ping(
         self,
         interaction: Interaction,
-    ) -> InteractionResponse:
-        return InteractionResponse(type=InteractionCallbackType.PONG)
+    ) -> ResponseBody:
+        return PONG
 
     async def handle_application_command(
         self,
         interaction: Interaction,
-    ) -> InteractionResponse:
+    ) -> ResponseBody:
         return InteractionResponse(
             type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
             data=InteractionCallbackData(
@@ -29,5 +59,18 @@ class InteractionHandler:
     async def handle_message_component(
         self,
         interaction: Interaction,
-    ) -> InteractionResponse:
-        raise NotImplementedError()
+    ) -> ResponseBody:
+        assert isinstance(interaction.data, ComponentData)
+        route = self.components.match(interaction.data.custom_id or '')
+
+        if route is None:
+            raise HTTPBadRequest(text='Unknown component')
+
+        func, kwargs = route
+        return to_response(await func(ctx=Context(interaction), **kwargs))
+
+    async def handle_autocomplete(
+        self,
+        interaction: Interaction,
+    ) -> ResponseBody:
+        return await self.autocompleter.respond(interaction)
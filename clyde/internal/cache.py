@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def cache_dir() -> Path:
+    """ The directory that files cached between runs go in by default. """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+
+    return Path(cache_home, 'clyde')
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """
+    Replace the file at ``path`` with ``text``, so that other processes
+    read either the old file or the new one in full.
+    """
+    temp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        temp.write_text(text, encoding='utf-8')
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            temp.unlink()
+        except OSError:
+            pass
+
+        raise
+
+
+def load_cache(
+    path: Path,
+    version: int,
+    key: str,
+    *,
+    description: str,
+) -> Dict[str, Any]:
+    """
+    Read the entries under ``key`` of a JSON cache file written by
+    :func:`save_cache` with the same ``version``.
+
+    A missing file, or one of another version, has no entries.
+    Unreadable files are logged and have none either, since without
+    them things only get slower.
+
+    :param description: What the file is, for log messages
+    :type description: str
+    """
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning(
+            'Ignoring unreadable %s %s', description, path, exc_info=True)
+        return {}
+
+    if isinstance(data, dict) and data.get('version') == version:
+        entries = data.get(key)
+
+        if isinstance(entries, dict):
+            return entries
+
+    return {}
+
+
+def save_cache(
+    path: Path,
+    version: int,
+    key: str,
+    entries: Dict[str, Any],
+    *,
+    description: str,
+) -> None:
+    """
+    Write ``entries`` under ``key`` to a JSON cache file atomically.
+
+    Failing to write it is logged like failing to read it in
+    :func:`load_cache`.
+    """
+    try:
+        write_atomic(path, json.dumps({'version': version, key: entries}))
+    except OSError:
+        logger.warning(
+            'Failed to write %s %s', description, path, exc_info=True)
@@ -1,25 +1,44 @@
-from typing import Any
+from datetime import datetime
+from typing import Any, Dict
+
+from pydantic import BaseModel
 
 _ENCODING = 'utf-8'
 
+
+def _default(obj: Any) -> Any:
+    # Models are flattened one level at a time as the encoder reaches them,
+    # so nested models never build an intermediate dict tree
+    if isinstance(obj, BaseModel):
+        fields: Dict[str, Any] = dict(obj._iter(exclude_unset=True))
+        return fields
+
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+
+    raise TypeError(f'Object of type {type(obj).__name__} is not serializable')
+
+
 try:
     import orjson
     from orjson import loads
 
     def dumps_str(obj: Any) -> str:
-        return orjson.dumps(obj).decode(_ENCODING)
+        return orjson.dumps(obj, default=_default).decode(_ENCODING)
 
     def dumps_bytes(obj: Any) -> bytes:
-        return orjson.dumps(obj)
+        return orjson.dumps(obj, default=_default)
 except ImportError:
     import json
-    from json import loads
+    from json import loads  # type: ignore[assignment]
+
+    _encoder = json.JSONEncoder(separators=(',', ':'), default=_default)
 
     def dumps_str(obj: Any) -> str:
-        return json.dumps(obj)
+        return _encoder.encode(obj)
 
     def dumps_bytes(obj: Any) -> bytes:
-        return json.dumps(obj).encode(_ENCODING)
+        return _encoder.encode(obj).encode(_ENCODING)
 
 
 __all__ = ['dumps_bytes', 'dumps_str', 'loads']
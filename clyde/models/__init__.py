@@ -1,22 +1,35 @@
 from .application import Application, ApplicationFlags
+from .channels import ChannelType, PartialChannel
 from .interactions import Interaction
 from .messages import Message, MessageFlags, MessageType
 from .permissions import Permissions
+from .roles import Role, RoleTags
 from .snowflake import Snowflake
 from .team import MembershipState, Team, TeamMember
-from .users import GuildMember, PremiumType, User, UserFlags
+from .users import (
+    GuildMember,
+    PartialGuildMember,
+    PremiumType,
+    User,
+    UserFlags,
+)
 
 __all__ = [
     'Application',
     'ApplicationFlags',
+    'ChannelType',
     'GuildMember',
     'Interaction',
     'MembershipState',
     'Message',
     'MessageFlags',
     'MessageType',
+    'PartialChannel',
+    'PartialGuildMember',
     'Permissions',
     'PremiumType',
+    'Role',
+    'RoleTags',
     'Snowflake',
     'Team',
     'TeamMember',
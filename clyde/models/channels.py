@@ -0,0 +1,43 @@
+from enum import IntEnum
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .permissions import Permissions
+from .snowflake import Snowflake
+
+
+# https://discord.com/developers/docs/resources/channel#channel-object-channel-types
+class ChannelType(IntEnum):
+    GUILD_TEXT = 0
+    DM = 1
+    GUILD_VOICE = 2
+    GROUP_DM = 3
+    GUILD_CATEGORY = 4
+    GUILD_NEWS = 5
+    GUILD_NEWS_THREAD = 10
+    GUILD_PUBLIC_THREAD = 11
+    GUILD_PRIVATE_THREAD = 12
+    GUILD_STAGE_VOICE = 13
+    GUILD_DIRECTORY = 14
+    GUILD_FORUM = 15
+
+
+# https://discord.com/developers/docs/interactions/receiving-and-responding#interaction-object-resolved-data-structure
+class PartialChannel(BaseModel):
+    """ A channel as it appears in the resolved data of an interaction. """
+
+    id: Snowflake
+    """ The ID of this channel. """
+
+    type: ChannelType
+    """ The type of channel. """
+
+    name: Optional[str]
+    """ The name of the channel. """
+
+    permissions: Optional[Permissions]
+    """ Computed permissions for the invoking user in the channel. """
+
+    parent_id: Optional[Snowflake]
+    """ For threads, the ID of the channel the thread was created in. """
@@ -1,4 +1,5 @@
 import sys
+from enum import IntEnum
 from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
@@ -14,6 +15,30 @@ else:
 
 ApplicationCommandOption = Any  # TODO
 
+
+# https://discord.com/developers/docs/interactions/application-commands#application-command-object-application-command-option-type
+class ApplicationCommandOptionType(IntEnum):
+    SUB_COMMAND = 1
+    SUB_COMMAND_GROUP = 2
+    STRING = 3
+    INTEGER = 4
+    """ Any integer between -2^53 and 2^53. """
+
+    BOOLEAN = 5
+    USER = 6
+    CHANNEL = 7
+    """ Includes all channel types + categories. """
+
+    ROLE = 8
+    MENTIONABLE = 9
+    """ Includes users and roles. """
+
+    NUMBER = 10
+    """ Any double between -2^53 and 2^53. """
+
+    ATTACHMENT = 11
+
+
 _NameStr = Annotated[str, Field(min_length=1, max_length=32)]
 _DescriptionStr = Annotated[str, Field(max_length=100)]
 _OptionList = Annotated[List[ApplicationCommandOption], Field(max_items=25)]
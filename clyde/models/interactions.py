@@ -1,12 +1,17 @@
 import sys
 from enum import IntEnum
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError, validator
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.fields import ModelField
 
+from .channels import PartialChannel
+from .lazy import LazyModel
 from .messages import Message, MessageFlags
+from .roles import Role
 from .snowflake import Snowflake
-from .users import GuildMember, User
+from .users import GuildMember, PartialGuildMember, User
 
 if sys.version_info >= (3, 8):
     from typing import Literal
@@ -16,14 +21,10 @@ else:
 
 # TODO: Remove these, for testing only
 AllowedMentions = object
-Channel = object
 Component = object
 Embed = object
 InteractionDataOption = dict
-PartialChannel = Channel
-PartialGuildMember = GuildMember
 PartialMessage = Message
-Role = dict
 SelectOptionValue = dict
 
 
@@ -33,6 +34,7 @@ class InteractionType(IntEnum):
     APPLICATION_COMMAND = 2
     MESSAGE_COMPONENT = 3
     APPLICATION_COMMAND_AUTOCOMPLETE = 4
+    MODAL_SUBMIT = 5
 
 
 # https://discord.com/developers/docs/interactions/application-commands#application-command-object-application-command-types
@@ -72,6 +74,7 @@ class ApplicationCommandData(BaseModel):
     type: ApplicationCommandType
     resolved: Optional[ResolvedData]
     options: Optional[List[InteractionDataOption]]
+    guild_id: Optional[Snowflake]
     target_id: Optional[Snowflake]
 
 
@@ -94,11 +97,25 @@ class ComponentData(BaseModel):
     values: Optional[List[str]]
 
 
-InteractionData = Union[ApplicationCommandData, ComponentData]
+# https://discord.com/developers/docs/interactions/receiving-and-responding#interaction-object-modal-submit-data-structure
+class ModalSubmitData(BaseModel):
+    custom_id: str
+    components: List[Component]
+
+
+InteractionData = Union[ApplicationCommandData, ComponentData, ModalSubmitData]
+
+INTERACTION_DATA_MODELS: Dict[InteractionType, Type[BaseModel]] = {
+    InteractionType.APPLICATION_COMMAND: ApplicationCommandData,
+    InteractionType.MESSAGE_COMPONENT: ComponentData,
+    InteractionType.APPLICATION_COMMAND_AUTOCOMPLETE: ApplicationCommandData,
+    InteractionType.MODAL_SUBMIT: ModalSubmitData,
+}
+""" The model of ``Interaction.data`` for each interaction type. """
 
 
 # https://discord.com/developers/docs/interactions/receiving-and-responding#interaction-object-interaction-structure
-class Interaction(BaseModel):
+class Interaction(BaseModel, smart_union=True):
     id: Snowflake
     """ ID of the interaction. """
 
@@ -146,6 +163,91 @@ class Interaction(BaseModel):
     def from_dm(self) -> bool:
         return self.user is not None
 
+    @classmethod
+    def parse_lazy(cls, obj: Any, *, trusted: bool = False) -> 'Interaction':
+        """
+        Parse an interaction, validating only what handlers
+        almost always need and deferring everything else.
+
+        Only ``id``, ``application_id``, ``type``, ``token`` and the
+        ``name``/``custom_id`` of ``data`` are validated up front;
+        sub-models such as ``member``, ``message`` and ``data.resolved``
+        are built the first time they are accessed.
+
+        :param obj: The raw JSON object
+        :type obj: Any
+        :param trusted: Whether ``obj`` has passed signature verification,
+            in which case fields are only converted and not validated
+            (see :mod:`clyde.models.trusted`)
+        :type trusted: bool
+        """
+        return LazyInteraction.parse_lazy(obj, trusted=trusted)
+
+    @validator('data', pre=True)
+    def __validate_data(cls, value, values):  # noqa: N805
+        # Validate against the model for this interaction type only,
+        # rather than trying each member of the union in turn
+        if not isinstance(value, dict) or 'type' not in values:
+            return value
+
+        model = INTERACTION_DATA_MODELS.get(values['type'])
+        return value if model is None else model.parse_obj(value)
+
+
+class LazyApplicationCommandData(LazyModel, ApplicationCommandData):
+    __eager_fields__ = frozenset({'name'})
+
+
+class LazyComponentData(LazyModel, ComponentData):
+    __eager_fields__ = frozenset({'custom_id'})
+
+
+class LazyModalSubmitData(LazyModel, ModalSubmitData):
+    __eager_fields__ = frozenset({'custom_id'})
+
+
+class LazyInteraction(LazyModel, Interaction):
+    """ An :class:`Interaction` created by :meth:`Interaction.parse_lazy`. """
+
+    __eager_fields__ = frozenset({
+        'id',
+        'application_id',
+        'type',
+        'data',
+        'token',
+    })
+
+    @classmethod
+    def _validate_eager(
+        cls,
+        field: ModelField,
+        raw: Any,
+        values: Dict[str, Any],
+        trusted: bool,
+    ) -> Tuple[Any, Any]:
+        model = None
+
+        if field.name == 'data' and raw is not None and 'type' in values:
+            strict_model = INTERACTION_DATA_MODELS.get(values['type'])
+
+            if strict_model is not None:
+                model = _LAZY_DATA_MODELS[strict_model]
+
+        if model is None:
+            return super()._validate_eager(field, raw, values, trusted)
+
+        try:
+            return model.parse_lazy(raw, trusted=trusted), None
+        except ValidationError as e:
+            return None, ErrorWrapper(e, loc=field.alias)
+
+
+_LAZY_DATA_MODELS: Dict[Type[BaseModel], Type[LazyModel]] = {
+    ApplicationCommandData: LazyApplicationCommandData,
+    ComponentData: LazyComponentData,
+    ModalSubmitData: LazyModalSubmitData,
+}
+
 
 class InteractionCallbackType(IntEnum):
     PONG = 1
@@ -172,6 +274,9 @@ class InteractionCallbackType(IntEnum):
     APPLICATION_COMMAND_AUTOCOMPLETE_RESULT = 8
     """ Respond to an autocomplete interaction with suggested choices. """
 
+    MODAL = 9
+    """ Respond to an interaction with a popup modal. """
+
 
 class InteractionCallbackData(BaseModel):
     tts: Optional[bool]
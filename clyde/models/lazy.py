@@ -0,0 +1,179 @@
+from typing import Any, ClassVar, Dict, FrozenSet, List, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, PrivateAttr, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import DictError, MissingError
+from pydantic.fields import ModelField
+from pydantic.utils import ROOT_KEY
+
+from .trusted import convert_field
+
+_TModel = TypeVar('_TModel', bound='LazyModel')
+
+
+class LazyModel(BaseModel):
+    """
+    A model that only validates some of its fields up front.
+
+    Models created with :meth:`parse_lazy` validate the fields named in
+    ``__eager_fields__`` immediately and keep every other field's raw value
+    until that attribute is first read. Reading, dumping, copying or
+    comparing the model behaves exactly like a fully validated instance.
+
+    Subclass it alongside the model it should mimic, for example
+    ``class LazyFoo(LazyModel, Foo)``, so that ``isinstance`` checks and
+    the model's properties keep working.
+
+    In trusted mode, fields are built with
+    :func:`clyde.models.trusted.construct_trusted` semantics
+    instead of being validated.
+    """
+
+    __eager_fields__: ClassVar[FrozenSet[str]] = frozenset()
+
+    _lazy_values: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _lazy_trusted: bool = PrivateAttr(default=False)
+
+    @classmethod
+    def parse_lazy(
+        cls: Type[_TModel],
+        obj: Any,
+        *,
+        trusted: bool = False,
+    ) -> _TModel:
+        """
+        Validate the eager fields of ``obj`` and defer the rest.
+
+        :param obj: The raw JSON object
+        :type obj: Any
+        :param trusted: Whether ``obj`` is known to come from Discord,
+            in which case fields are converted instead of validated
+        :type trusted: bool
+        :raises ValidationError: If ``obj`` is not a dict, a required
+            field is missing or an eager field is invalid
+        """
+        if not isinstance(obj, dict):
+            raise ValidationError([ErrorWrapper(DictError(), ROOT_KEY)], cls)
+
+        values: Dict[str, Any] = {}
+        lazy_values: Dict[str, Any] = {}
+        fields_set = set()
+        errors: List[ErrorWrapper] = []
+
+        for name, field in cls.__fields__.items():
+            try:
+                raw = obj[field.alias]
+            except KeyError:
+                if field.required:
+                    errors.append(ErrorWrapper(MissingError(), field.alias))
+                else:
+                    values[name] = field.get_default()
+
+                continue
+
+            fields_set.add(name)
+
+            if name not in cls.__eager_fields__:
+                lazy_values[name] = raw
+                continue
+
+            value, error = cls._validate_eager(field, raw, values, trusted)
+
+            if error:
+                errors.append(error)
+            else:
+                values[name] = value
+
+        if errors:
+            raise ValidationError(errors, cls)
+
+        m = cls.__new__(cls)
+        object.__setattr__(m, '__dict__', values)
+        object.__setattr__(m, '__fields_set__', fields_set)
+        m._init_private_attributes()
+        m._lazy_values = lazy_values
+        m._lazy_trusted = trusted
+        return m
+
+    @classmethod
+    def _validate_eager(
+        cls,
+        field: ModelField,
+        raw: Any,
+        values: Dict[str, Any],
+        trusted: bool,
+    ) -> Tuple[Any, Any]:
+        """
+        Validate the eager field ``field``. Subclasses may override this
+        to build a field differently, such as with another lazy model.
+        """
+        return cls._validate_field(field, raw, values, trusted)
+
+    @classmethod
+    def _validate_field(
+        cls,
+        field: ModelField,
+        raw: Any,
+        values: Dict[str, Any],
+        trusted: bool,
+    ) -> Tuple[Any, Any]:
+        if not trusted:
+            return field.validate(raw, values, loc=field.alias, cls=cls)
+
+        try:
+            return convert_field(field, raw), None
+        except (ValueError, TypeError) as e:
+            return None, ErrorWrapper(e, loc=field.alias)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        try:
+            raw = self._lazy_values.pop(name)
+        except KeyError:
+            raise AttributeError(
+                f'{type(self).__name__!r} object has no attribute {name!r}',
+            ) from None
+
+        value, error = self._validate_field(
+            self.__fields__[name], raw, self.__dict__, self._lazy_trusted)
+
+        if error:
+            self._lazy_values[name] = raw
+            raise ValidationError([error], type(self))
+
+        self.__dict__[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.__fields__:
+            self._lazy_values.pop(name, None)
+
+        super().__setattr__(name, value)
+
+    def __iter__(self) -> Any:
+        self._materialize()
+        return super().__iter__()
+
+    def __repr_args__(self) -> Any:
+        self._materialize()
+        return super().__repr_args__()
+
+    def _iter(self, *args: Any, **kwargs: Any) -> Any:
+        self._materialize()
+        return super()._iter(*args, **kwargs)
+
+    def _materialize(self) -> None:
+        """ Validate every field that hasn't been accessed yet. """
+        if not self._lazy_values:
+            return
+
+        for name in list(self._lazy_values):
+            getattr(self, name)
+
+        # Restore the declared field order for dumping
+        values = self.__dict__
+        ordered = {k: values[k] for k in self.__fields__ if k in values}
+        ordered.update(values)
+        object.__setattr__(self, '__dict__', ordered)
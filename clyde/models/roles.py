@@ -0,0 +1,51 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .permissions import Permissions
+from .snowflake import Snowflake
+
+
+# https://discord.com/developers/docs/topics/permissions#role-object-role-tags-structure
+class RoleTags(BaseModel):
+    bot_id: Optional[Snowflake]
+    """ The ID of the bot this role belongs to. """
+
+    integration_id: Optional[Snowflake]
+    """ The ID of the integration this role belongs to. """
+
+
+# https://discord.com/developers/docs/topics/permissions#role-object-role-structure
+class Role(BaseModel):
+    id: Snowflake
+    """ Role ID. """
+
+    name: str
+    """ Role name. """
+
+    color: int
+    """ Integer representation of hexadecimal color code. """
+
+    hoist: bool
+    """ If this role is pinned in the user listing. """
+
+    icon: Optional[str]
+    """ Role icon hash. """
+
+    unicode_emoji: Optional[str]
+    """ Role unicode emoji. """
+
+    position: int
+    """ Position of this role. """
+
+    permissions: Permissions
+    """ Permission bit set. """
+
+    managed: bool
+    """ Whether this role is managed by an integration. """
+
+    mentionable: bool
+    """ Whether this role is mentionable. """
+
+    tags: Optional[RoleTags]
+    """ The tags this role has. """
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Union
+from typing import Callable, Iterator, Union
 
 # A Unix timestamp in milliseconds
 DISCORD_EPOCH = 1420070400000
@@ -34,6 +34,11 @@ class Snowflake(int):
 
         return super().__new__(cls, value)
 
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable[..., 'Snowflake']]:
+        # Without this, pydantic validates fields as plain ints
+        yield cls
+
     def __repr__(self) -> str:
         return f'Snowflake({int(self)})'
 
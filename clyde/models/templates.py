@@ -0,0 +1,108 @@
+import re
+from typing import List, Tuple, Union
+
+from clyde.internal.json import dumps_bytes
+
+from .interactions import (
+    InteractionCallbackData,
+    InteractionCallbackType,
+    InteractionResponse,
+)
+
+_SLOT_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+# How a slot marker looks once it has been JSON-encoded. Both orjson and
+# the stdlib escape the NUL characters, so the marker can't be forged by
+# regular template text.
+_ENCODED_SLOT = re.compile(rb'\\u0000clyde:([A-Za-z_][A-Za-z0-9_]*)\\u0000')
+
+
+def slot(name: str) -> str:
+    """
+    Create a placeholder for a string that is filled in when a
+    :class:`ResponseTemplate` is rendered.
+
+    The placeholder may make up a whole string field or only part of one,
+    such as ``f'Hello, {slot("name")}!'``.
+    """
+    if not _SLOT_NAME.fullmatch(name):
+        raise ValueError(f'Invalid slot name: {name!r}')
+
+    return f'\x00clyde:{name}\x00'
+
+
+class ResponseTemplate:
+    """
+    An interaction response that is serialized once and then rendered
+    many times with different slot values.
+
+    Declaring a template serializes the response into a JSON skeleton.
+    Rendering only JSON-escapes each slot value and splices it into
+    the skeleton, with no model or dict work per request.
+    """
+
+    __slots__ = ('_literals', '_slots', '_slot_names')
+
+    def __init__(
+        self,
+        response: Union[InteractionResponse, InteractionCallbackData],
+    ) -> None:
+        """
+        :param response: The response to serialize, with :func:`slot`
+            placeholders in its strings. Bare callback data is sent as a
+            ``CHANNEL_MESSAGE_WITH_SOURCE`` response.
+        :type response: InteractionResponse or InteractionCallbackData
+        """
+        if isinstance(response, InteractionCallbackData):
+            response = InteractionResponse(
+                type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+                data=response,
+            )
+
+        # Splitting on the markers yields [literal, name, literal, ...]
+        parts = _ENCODED_SLOT.split(dumps_bytes(response))
+
+        self._literals: List[bytes] = parts[0::2]
+        self._slots: Tuple[str, ...] = tuple(
+            p.decode('ascii') for p in parts[1::2])
+        self._slot_names = frozenset(self._slots)
+
+    @property
+    def slots(self) -> Tuple[str, ...]:
+        """ The names of this template's slots, in order of appearance. """
+        return self._slots
+
+    def render(self, **values: str) -> bytes:
+        """
+        Render the template into a serialized response body.
+
+        :raises TypeError: If a slot has no value, a value is not a
+            ``str``, or a value is given for an unknown slot
+        """
+        unknown = values.keys() - self._slot_names
+
+        if unknown:
+            raise TypeError(f'Unknown template slots: {sorted(unknown)}')
+
+        literals = self._literals
+        chunks = [literals[0]]
+
+        for i, name in enumerate(self._slots, 1):
+            try:
+                value = values[name]
+            except KeyError:
+                raise TypeError(f'Missing template slot: {name!r}') from None
+
+            if not isinstance(value, str):
+                raise TypeError(
+                    f'Slot {name!r} must be str, not {type(value).__name__}')
+
+            # Strip the quotes from the encoded string to splice it inside
+            # the skeleton's own string literal
+            chunks.append(dumps_bytes(value)[1:-1])
+            chunks.append(literals[i])
+
+        return b''.join(chunks)
+
+    def __repr__(self) -> str:
+        return f'ResponseTemplate(slots={self._slots!r})'
@@ -0,0 +1,175 @@
+"""
+Fast model construction for payloads that are known to come from Discord.
+
+Once an interaction's signature has been verified there is no need to
+validate every field of every model. :func:`construct_trusted` builds a
+model the same shape as ``parse_obj`` would, but only converts the values
+whose Python type differs from their JSON type: snowflakes, enums,
+datetimes and nested models. Everything else is stored as-is, and field
+types it has no fast path for fall back to normal validation.
+"""
+
+import functools
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+from pydantic.datetime_parse import parse_datetime
+from pydantic.fields import (
+    SHAPE_DICT,
+    SHAPE_LIST,
+    SHAPE_MAPPING,
+    SHAPE_SEQUENCE,
+    SHAPE_SINGLETON,
+    ModelField,
+)
+
+from .snowflake import Snowflake
+
+_TModel = TypeVar('_TModel', bound=BaseModel)
+
+Converter = Callable[[Any], Any]
+
+# Types whose JSON representation is already the right Python value
+_PASSTHROUGH_TYPES = (bool, dict, float, int, list, object, str)
+
+_Plan = Tuple[Tuple[str, ModelField, Optional[Converter], bool], ...]
+
+
+def construct_trusted(model: Type[_TModel], obj: Dict[str, Any]) -> _TModel:
+    """
+    Build ``model`` from the trusted JSON object ``obj``
+    with minimal coercion.
+
+    Missing optional fields get their defaults and ``pre`` field
+    validators still run, but no other validation is performed.
+    """
+    values: Dict[str, Any] = {}
+    fields_set = set()
+
+    for name, field, convert, default_none in _plan(model):
+        try:
+            value = obj[field.alias]
+        except KeyError:
+            if default_none:
+                values[name] = None
+            elif not field.required:
+                values[name] = field.get_default()
+
+            continue
+
+        if field.pre_validators:
+            for validator in field.pre_validators:
+                value = validator(
+                    model, value, values, field, model.__config__)
+
+        if convert is not None and value is not None:
+            value = convert(value)
+
+        values[name] = value
+        fields_set.add(name)
+
+    m = model.__new__(model)
+    object.__setattr__(m, '__dict__', values)
+    object.__setattr__(m, '__fields_set__', fields_set)
+    m._init_private_attributes()
+    return m
+
+
+def convert_field(field: ModelField, value: Any) -> Any:
+    """ Convert the trusted raw ``value`` of a single ``field``. """
+    convert = field_converter(field)
+
+    if convert is None or value is None:
+        return value
+
+    return convert(value)
+
+
+@functools.lru_cache(maxsize=None)
+def _plan(model: Type[BaseModel]) -> _Plan:
+    return tuple(
+        (
+            name,
+            field,
+            field_converter(field),
+            # Skip `get_default` for the common case of `Optional[...]`
+            not field.required and field.default is None and
+            field.default_factory is None,
+        )
+        for name, field in model.__fields__.items()
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def field_converter(field: ModelField) -> Optional[Converter]:
+    """
+    Get the function that converts the trusted raw value of ``field``,
+    or ``None`` if the raw value can be used as-is.
+    """
+    if field.shape in (SHAPE_LIST, SHAPE_SEQUENCE):
+        assert field.sub_fields
+        item = field_converter(field.sub_fields[0])
+
+        if item is None:
+            return None
+
+        return lambda v: [None if x is None else item(x) for x in v]
+
+    if field.shape in (SHAPE_DICT, SHAPE_MAPPING):
+        assert field.key_field and field.sub_fields
+        key = field_converter(field.key_field) or _identity
+        value = field_converter(field.sub_fields[0]) or _identity
+
+        if key is _identity and value is _identity:
+            return None
+
+        return lambda v: {
+            key(k): None if x is None else value(x)
+            for k, x in v.items()
+        }
+
+    if field.shape == SHAPE_SINGLETON and not field.sub_fields:
+        t = field.type_
+
+        if isinstance(t, type):
+            if issubclass(t, Snowflake):
+                return _snowflake
+            elif issubclass(t, Enum):
+                return t
+            elif issubclass(t, datetime):
+                return _datetime
+            elif issubclass(t, BaseModel):
+                return functools.partial(construct_trusted, t)
+            elif t in _PASSTHROUGH_TYPES:
+                return None
+        elif t is Any or getattr(t, '__origin__', None) is not None:
+            return None  # Any, Literal[...] and friends
+
+    # Fall back to normal validation for everything else (unions etc.)
+    return functools.partial(_validate, field)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _snowflake(value: Any) -> Snowflake:
+    return int.__new__(Snowflake, value)
+
+
+def _datetime(value: Any) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return parse_datetime(value)  # e.g. a 'Z' suffix before Python 3.11
+
+
+def _validate(field: ModelField, value: Any) -> Any:
+    value, error = field.validate(value, {}, loc=field.alias)
+
+    if error:
+        raise ValidationError([error], BaseModel)
+
+    return value
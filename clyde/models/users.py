@@ -224,3 +224,17 @@ class GuildMember(BaseModel):
             return None  # Normalize empty dict to None
 
         return value
+
+
+# https://discord.com/developers/docs/interactions/receiving-and-responding#interaction-object-resolved-data-structure
+class PartialGuildMember(GuildMember):
+    """
+    A guild member as found in resolved interaction data,
+    which omits the ``user``, ``deaf`` and ``mute`` fields.
+    """
+
+    deaf: Optional[bool]  # type: ignore[assignment]
+    """ Whether the user is deafened in voice channels. """
+
+    mute: Optional[bool]  # type: ignore[assignment]
+    """ Whether the user is muted in voice channels. """
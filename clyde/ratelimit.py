@@ -0,0 +1,570 @@
+"""
+Following Discord's REST rate limits.
+
+Discord limits how often each route may be requested, in buckets that it
+names in the ``X-RateLimit-Bucket`` response header. Requests to the
+same bucket for different channels, guilds or webhooks, its major
+parameters, are limited separately. On top of those, a bot may make at
+most 50 requests per second in total, the global rate limit.
+
+A :class:`RateLimiter` sends requests with a shared
+:class:`aiohttp.ClientSession` while following these limits:
+
+- Requests wait in a queue for each bucket until it has requests
+  remaining, and are woken when it resets instead of polling it.
+  Requests to a bucket that Discord hasn't described yet are sent one at
+  a time until a response does.
+- Requests that are rate limited anyway are sent again once the limit
+  resets instead of raising, up to :data:`MAX_RETRIES` times. Since a
+  bucket only lets as many waiting requests go as it has remaining, they
+  don't all retry at once.
+- Requests with a higher :class:`Priority` go first, within a bucket and
+  for the global rate limit, so followups to interactions don't wait
+  behind background work such as syncing commands.
+
+How long requests waited for each bucket, and how often they were rate
+limited anyway, is kept in :meth:`RateLimiter.stats`.
+"""
+
+import asyncio
+import collections
+import dataclasses
+import heapq
+import itertools
+import logging
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+from aiohttp.web_exceptions import HTTPTooManyRequests
+from yarl import URL
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_LIMIT = 50
+""" Requests per second that Discord allows a bot to make in total. """
+
+MAX_RETRIES = 5
+""" Times a request is sent again after being rate limited anyway. """
+
+_MAJOR_PARAMETERS = {
+    'channels': '{channel_id}',
+    'guilds': '{guild_id}',
+    'webhooks': '{webhook_id}',
+}
+_TOKEN_PARENTS = frozenset({'interactions', 'webhooks'})
+_PRUNE_SIZE = 1024
+
+# A little over a second, since requests take varying times to arrive
+_GLOBAL_PERIOD = 1.05
+
+
+class Priority(IntEnum):
+    """ Which requests go first when waiting for a rate limit. """
+
+    INTERACTION = 0
+    """ Followups to interactions, which users are waiting for. """
+
+    BACKGROUND = 1
+    """ Everything else, such as syncing commands. """
+
+
+@dataclass
+class BucketStats:
+    """ How the requests to a rate limit bucket fared. """
+
+    requests: int = 0
+    """ Requests sent, including those sent again after a 429. """
+
+    waited: int = 0
+    """ Requests that had to wait for a rate limit. """
+
+    wait_time: float = 0.0
+    """ Seconds that requests waited for rate limits in total. """
+
+    max_wait: float = 0.0
+    """ The most seconds that one request waited. """
+
+    rate_limited: int = 0
+    """ Responses that were ``429 Too Many Requests`` anyway. """
+
+    def add(self, other: 'BucketStats') -> None:
+        """ Count the requests of ``other`` too. """
+        self.requests += other.requests
+        self.waited += other.waited
+        self.wait_time += other.wait_time
+        self.max_wait = max(self.max_wait, other.max_wait)
+        self.rate_limited += other.rate_limited
+
+
+def route_key(method: str, url: str) -> Tuple[str, str]:
+    """
+    Get the route of a request, with its IDs and tokens replaced by
+    placeholders, and its major parameters.
+
+    >>> route_key('PUT', '/api/v9/applications/1/guilds/2/commands')
+    ('PUT /api/v9/applications/{id}/guilds/{guild_id}/commands', '2')
+    """
+    parts = URL(url).path.split('/')
+    route: List[str] = []
+    major: List[str] = []
+
+    for i, part in enumerate(parts):
+        previous = parts[i - 1] if i > 0 else ''
+
+        if previous in _MAJOR_PARAMETERS:
+            route.append(_MAJOR_PARAMETERS[previous])
+            major.append(part)
+        elif i > 1 and parts[i - 2] in _TOKEN_PARENTS and previous.isdigit():
+            # Tokens never end up in routes, since routes are logged
+            route.append('{token}')
+
+            if parts[i - 2] == 'webhooks':
+                major.append(part)
+        elif part.isdigit():
+            route.append('{id}')
+        else:
+            route.append(part)
+
+    return f'{method.upper()} {"/".join(route)}', '/'.join(major)
+
+
+class _Waiters:
+    """ Futures waiting for their turn, by priority and then in order. """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    def __bool__(self) -> bool:
+        # Waiters that were cancelled are dropped once they come up
+        while self._heap and self._heap[0][2].done():
+            heapq.heappop(self._heap)
+
+        return bool(self._heap)
+
+    def push(self, priority: int) -> asyncio.Future:
+        waiter = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._order), waiter))
+        return waiter
+
+    def wake(self) -> None:
+        heapq.heappop(self._heap)[2].set_result(None)
+
+
+class _Gate(ABC):
+    """
+    Lets requests through while a limit allows it, and wakes the
+    requests waiting for it once it may allow more.
+    """
+
+    def __init__(self) -> None:
+        self._waiters = _Waiters()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self, priority: int) -> bool:
+        """
+        Wait until the limit allows another request.
+
+        :return: Whether the request had to wait
+        """
+        loop = asyncio.get_event_loop()
+
+        if not self._waiters and self._can_take(loop.time()):
+            self._take()
+            return False
+
+        waiter = self._waiters.push(priority)
+        self._wake()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._give_back()  # The turn was handed over as we left
+
+            raise
+
+        return True
+
+    def _wake(self) -> None:
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters and self._can_take(now):
+            self._take()
+            self._waiters.wake()
+
+        if self._waiters:
+            when = self._next_change()
+
+            # Otherwise, a response will change the limit
+            if when is not None:
+                self._timer = loop.call_at(when, self._wake)
+
+    @abstractmethod
+    def _can_take(self, now: float) -> bool:
+        """ Whether the limit allows another request at ``now``. """
+
+    @abstractmethod
+    def _take(self) -> None:
+        """ Count a request that was let through against the limit. """
+
+    @abstractmethod
+    def _give_back(self) -> None:
+        """ Undo :meth:`_take` for a request that left without going. """
+
+    @abstractmethod
+    def _next_change(self) -> Optional[float]:
+        """
+        Get the loop time at which the limit may allow more requests,
+        or ``None`` if only a response can change it.
+        """
+
+
+class _Bucket(_Gate):
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self.name = name
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.reset_after = 0.0
+        self.in_flight = 0
+        self.unlimited = False
+
+    def idle(self, now: float) -> bool:
+        return not (self.in_flight or self._waiters or now < self.reset_at)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def update(self, response: aiohttp.ClientResponse, now: float) -> None:
+        headers = response.headers
+        remaining = _int(headers.get('X-RateLimit-Remaining'))
+
+        if remaining is None:
+            # Errors from proxies in front of Discord have no headers
+            if response.status < 400:
+                self.unlimited = True
+
+            return
+
+        self.unlimited = False
+        self.limit = _int(headers.get('X-RateLimit-Limit')) or self.limit
+        self.reset_after = _seconds(headers.get('X-RateLimit-Reset-After'))
+        self.reset_at = now + self.reset_after
+
+        # Discord may not have counted the other requests in flight yet
+        self.remaining = max(remaining - (self.in_flight - 1), 0)
+
+    def pause(self, until: float) -> None:
+        self.remaining = 0
+        self.reset_at = max(self.reset_at, until)
+
+    def _can_take(self, now: float) -> bool:
+        if self.unlimited:
+            return True
+
+        if self.remaining == 0 and now >= self.reset_at:
+            # Until a response tells, assume the new window is as long
+            self.remaining = self.limit
+            self.reset_at = now + self.reset_after
+
+        if self.remaining is None:
+            return self.in_flight == 0  # Probe it with a single request
+
+        return self.remaining > 0
+
+    def _take(self) -> None:
+        self.in_flight += 1
+
+        if self.remaining is not None:
+            self.remaining -= 1
+
+    def _give_back(self) -> None:
+        self.in_flight -= 1
+
+        if self.remaining is not None:
+            self.remaining += 1
+
+        self._wake()
+
+    def _next_change(self) -> Optional[float]:
+        if self.remaining == 0:
+            return self.reset_at
+
+        return None
+
+
+class _GlobalLimit(_Gate):
+    def __init__(self, limit: Optional[int]) -> None:
+        super().__init__()
+        self.limit = limit
+        self._sent: Deque[float] = collections.deque()  # In the last second
+        self._paused_until = 0.0
+
+    def pause(self, until: float) -> None:
+        self._paused_until = max(self._paused_until, until)
+
+    def _can_take(self, now: float) -> bool:
+        if now < self._paused_until:
+            return False
+
+        if self.limit is None:
+            return True
+
+        # A sliding window, so no second has more than the limit
+        while self._sent and self._sent[0] <= now - _GLOBAL_PERIOD:
+            self._sent.popleft()
+
+        return len(self._sent) < self.limit
+
+    def _take(self) -> None:
+        if self.limit is not None:
+            self._sent.append(asyncio.get_event_loop().time())
+
+    def _give_back(self) -> None:
+        if self._sent:
+            self._sent.pop()
+
+        self._wake()
+
+    def _next_change(self) -> Optional[float]:
+        if self._sent:
+            return max(self._paused_until, self._sent[0] + _GLOBAL_PERIOD)
+
+        return self._paused_until
+
+
+class RateLimiter:
+    """ Sends requests to Discord while following its rate limits. """
+
+    def __init__(
+        self,
+        *,
+        global_limit: Optional[int] = GLOBAL_LIMIT,
+        max_retries: int = MAX_RETRIES,
+    ) -> None:
+        """
+        :param global_limit: The most requests to send per second in
+            total, or ``None`` to only wait out the global rate limit
+            once Discord reports it. Processes count separately, so
+            divide it among the processes sharing a bot token.
+        :type global_limit: int, optional
+        :param max_retries: Times to send a request again after it was
+            rate limited anyway, before giving up on it
+        :type max_retries: int
+        """
+        if global_limit is not None and global_limit < 1:
+            raise ValueError('global_limit must be at least 1')
+
+        if max_retries < 0:
+            raise ValueError('max_retries must not be negative')
+
+        self.global_limit = global_limit
+        self.max_retries = max_retries
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global = _GlobalLimit(global_limit)
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._names: Dict[str, str] = {}  # route -> bucket name
+        self._stats: Dict[str, BucketStats] = {}
+        self._prune_at = _PRUNE_SIZE
+
+    def stats(self) -> Dict[str, BucketStats]:
+        """
+        Get how the requests to each bucket fared, keyed by the name
+        Discord gave the bucket, or by route until it has. Requests for
+        different major parameters are counted together.
+        """
+        return {
+            name: dataclasses.replace(stats)
+            for name, stats in self._stats.items()
+        }
+
+    def totals(self) -> BucketStats:
+        """ Get how the requests to every bucket fared, added up. """
+        totals = BucketStats()
+
+        for stats in self._stats.values():
+            totals.add(stats)
+
+        return totals
+
+    @asynccontextmanager
+    async def request(
+        self,
+        session: aiohttp.ClientSession,
+        method: str,
+        url: str,
+        *,
+        priority: Priority = Priority.BACKGROUND,
+        raise_for_status: bool = True,
+        **kwargs: Any,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Send a request with ``session`` once the rate limits allow it,
+        and again whenever it is rate limited anyway, up to
+        :attr:`max_retries` times. A request that is still rate limited
+        then gets its ``429`` response like any other error response.
+
+        :param session: The session to send the request with
+        :type session: aiohttp.ClientSession
+        :param method: The HTTP method
+        :type method: str
+        :param url: The URL, which may be relative to the session's
+        :type url: str
+        :param priority: Whether the request goes before others
+        :type priority: Priority
+        :param raise_for_status: Whether to raise
+            :class:`aiohttp.ClientResponseError` for error responses
+        :type raise_for_status: bool
+        :param kwargs: Passed on to :meth:`aiohttp.ClientSession.request`
+        :return: A context manager for the response
+        """
+        loop = asyncio.get_event_loop()
+
+        if self._loop is not loop:
+            # Waiters and timers belong to the loop they were made on
+            self._loop = loop
+            self._global = _GlobalLimit(self.global_limit)
+            self._buckets.clear()
+
+        route, major = route_key(method, url)
+
+        for attempt in itertools.count():
+            bucket = self._bucket(route, major)
+            start = loop.time()
+            waited = await bucket.acquire(priority)
+
+            try:
+                waited = await self._global.acquire(priority) or waited
+                self._record(bucket.name, waited, loop.time() - start)
+
+                response = await session.request(
+                    method, url, raise_for_status=False, **kwargs)
+
+                self._update(route, major, bucket, response)
+            finally:
+                bucket.release()
+
+            async with response:
+                if response.status == HTTPTooManyRequests.status_code:
+                    if attempt < self.max_retries:
+                        continue
+
+                    logger.warning(
+                        'Giving up on %s %s, rate limited %d times',
+                        method, url, attempt + 1)
+
+                if raise_for_status:
+                    response.raise_for_status()
+
+                yield response
+                return
+
+    def _bucket(self, route: str, major: str) -> _Bucket:
+        name = self._names.get(route, route)
+        bucket = self._buckets.get((name, major))
+
+        if bucket is None:
+            if len(self._buckets) >= self._prune_at:
+                self._prune()
+
+            bucket = self._buckets[name, major] = _Bucket(name)
+
+        return bucket
+
+    def _prune(self) -> None:
+        # Every interaction followed up gets its own webhook bucket
+        now = asyncio.get_event_loop().time()
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if not bucket.idle(now)
+        }
+        self._prune_at = max(_PRUNE_SIZE, 2 * len(self._buckets))
+
+    def _record(self, name: str, waited: bool, seconds: float) -> None:
+        stats = self._stats.setdefault(name, BucketStats())
+        stats.requests += 1
+
+        if waited:
+            stats.waited += 1
+            stats.wait_time += seconds
+            stats.max_wait = max(stats.max_wait, seconds)
+
+    def _update(
+        self,
+        route: str,
+        major: str,
+        bucket: _Bucket,
+        response: aiohttp.ClientResponse,
+    ) -> None:
+        now = asyncio.get_event_loop().time()
+        headers = response.headers
+        name = headers.get('X-RateLimit-Bucket')
+
+        if name is not None and bucket.name == route:
+            self._name(route, name)
+
+        if response.status != HTTPTooManyRequests.status_code:
+            bucket.update(response, now)
+            return
+
+        retry_after = _seconds(
+            headers.get('Retry-After') or
+            headers.get('X-RateLimit-Reset-After'))
+        is_global = bool(headers.get('X-RateLimit-Global')) or \
+            headers.get('X-RateLimit-Scope') == 'global'
+
+        self._stats.setdefault(bucket.name, BucketStats()).rate_limited += 1
+        logger.warning(
+            'Rate limited%s on %s for %.2fs',
+            ' globally' if is_global else '', route, retry_after)
+
+        if is_global:
+            self._global.pause(now + retry_after)
+        else:
+            bucket.pause(now + retry_after)
+
+    def _name(self, route: str, name: str) -> None:
+        """
+        Key the buckets of ``route`` by the name Discord gave them, which
+        routes sharing their limits have in common.
+        """
+        self._names[route] = name
+        stats = self._stats.pop(route, None)
+
+        if stats is not None:
+            self._stats.setdefault(name, BucketStats()).add(stats)
+
+        for (key, major), bucket in list(self._buckets.items()):
+            if key == route:
+                del self._buckets[key, major]
+                bucket.name = name
+
+                # Requests may be waiting on either bucket
+                self._buckets.setdefault((name, major), bucket)
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    try:
+        return None if value is None else int(float(value))
+    except ValueError:
+        return None
+
+
+def _seconds(value: Optional[str]) -> float:
+    try:
+        return max(float(value or 1.0), 0.0)
+    except ValueError:
+        return 1.0
@@ -0,0 +1,531 @@
+"""
+Syncing application commands with Discord.
+
+Commands are sent with one bulk-overwrite request per scope: the global
+commands, and the commands of each guild. Discord replaces every command
+in the scope with those sent, so commands removed from the application
+are removed from Discord too.
+
+Optionally, a fingerprint of each scope's commands is kept in a
+:class:`SyncCache` file, along with the commands Discord returned for
+it. While a scope's fingerprint is unchanged, the cached commands are
+used instead of sending them again, so an unchanged application starts
+without making any requests. Commands edited elsewhere, such as by
+another deployment of the same application, go unnoticed until the
+manifest changes or the cache file is removed, which is why
+:class:`~clyde.application.ClydeApp` only uses a cache when given one.
+
+Guild scopes are synced concurrently, with at most
+:attr:`CommandSync.concurrency` requests in flight, while a
+:class:`~clyde.ratelimit.RateLimiter` follows Discord's rate limits.
+Progress is logged and can be followed with a callback. Since each scope
+is cached as soon as it is synced, a restart partway through only sends
+the scopes that were not synced yet or have changed since.
+
+:class:`~clyde.application.ClydeApp` serves before its commands are
+synced, and syncs them in the background. Until then, commands are routed
+to their handlers by name, and :class:`PendingCommands` decides what
+happens to commands invoked in the meantime. :class:`SyncState` tells
+whether the sync is done, including in forked worker processes.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from enum import Enum
+from multiprocessing.sharedctypes import RawValue
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
+
+import aiohttp
+
+from .http.payload import JsonPayload
+from .internal.cache import cache_dir, load_cache, save_cache
+from .internal.json import loads
+from .models.command import ApplicationCommand
+from .models.snowflake import Snowflake
+from .ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+Scope = Optional[Snowflake]
+""" The guild ID of guild commands, or ``None`` for global commands. """
+
+_CACHE_VERSION = 1
+_GLOBAL = 'global'
+_SAVE_INTERVAL = 1.0
+_PROGRESS_INTERVAL = 5.0
+_POLL_INTERVAL = 0.05
+
+
+DEFAULT_CACHE_PATH = cache_dir() / 'commands.json'
+""" The conventional place to cache synced commands in. """
+
+
+def fingerprint(commands: Sequence[Dict[str, Any]]) -> str:
+    """
+    Hash ``commands`` canonically: the order of the commands and of
+    their keys does not matter.
+    """
+    ordered = sorted(commands, key=lambda c: (c.get('type', 1), c['name']))
+    canonical = json.dumps(
+        ordered,
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class PendingCommands(str, Enum):
+    """
+    What to do with commands invoked before the sync has finished.
+
+    Until then, Discord may still have the commands of the previous
+    deployment, whose options can differ from those of the handlers.
+    """
+
+    DISPATCH = 'dispatch'
+    """ Handle them right away, routed by name. """
+
+    WAIT = 'wait'
+    """
+    Wait for the sync to finish before handling them, deferring them
+    if that takes too long.
+    """
+
+    REJECT = 'reject'
+    """ Answer them with ``503 Service Unavailable``. """
+
+
+class SyncState:
+    """
+    Whether commands have been synced, in memory that is shared with the
+    worker processes forked after it was created.
+    """
+
+    PENDING = 0
+    SYNCED = 1
+    FAILED = 2
+    SKIPPED = 3
+    """ Another process syncs the commands, so this one never knows. """
+
+    __slots__ = ('_value',)
+
+    def __init__(self) -> None:
+        self._value = RawValue('b', self.PENDING)
+
+    def __repr__(self) -> str:
+        names = {
+            self.PENDING: 'pending',
+            self.SYNCED: 'synced',
+            self.FAILED: 'failed',
+            self.SKIPPED: 'skipped',
+        }
+        return f'<SyncState {names[self.state]}>'
+
+    @property
+    def state(self) -> int:
+        """
+        :attr:`PENDING`, :attr:`SYNCED`, :attr:`FAILED` or :attr:`SKIPPED`.
+        """
+        state: int = self._value.value
+        return state
+
+    @state.setter
+    def state(self, state: int) -> None:
+        self._value.value = state
+
+    @property
+    def pending(self) -> bool:
+        """ Whether the sync has not finished yet. """
+        return self.state == self.PENDING
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the sync to finish.
+
+        The state may be changed by another process, so it is checked
+        every 50 milliseconds.
+
+        :param timeout: The most seconds to wait, defaults to no limit
+        :type timeout: float, optional
+        :return: Whether the commands were synced
+        """
+        loop = asyncio.get_event_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        while self.pending:
+            if deadline is not None and loop.time() >= deadline:
+                break
+
+            await asyncio.sleep(_POLL_INTERVAL)
+
+        return self.state == self.SYNCED
+
+
+@dataclass
+class SyncProgress:
+    """ How far a sync has gotten, in scopes. """
+
+    total: int
+    """ The number of scopes being synced. """
+
+    sent: int = 0
+    """ Scopes whose commands were sent. """
+
+    unchanged: int = 0
+    """ Scopes skipped since they are unchanged. """
+
+    failed: int = 0
+    """ Guild scopes that could not be synced, such as guilds left. """
+
+    @property
+    def done(self) -> int:
+        """ The number of scopes finished so far. """
+        return self.sent + self.unchanged + self.failed
+
+
+class SyncCache:
+    """ The commands last synced for each application and scope. """
+
+    def __init__(self, path: Union[str, 'os.PathLike[str]']) -> None:
+        """
+        :param path: The cache file, which is created if it doesn't exist
+        :type path: str or os.PathLike
+        """
+        self.path = Path(path)
+        self._applications: Optional[Dict[str, Dict[str, Any]]] = None
+        self._saved_at = 0.0
+        self._dirty = False
+
+    def get(
+        self,
+        application_id: Snowflake,
+        scope: Scope,
+        fingerprint: str,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the commands returned when ``scope`` was last synced,
+        if its fingerprint was ``fingerprint``.
+        """
+        entry = self._scopes(application_id).get(_scope_key(scope))
+
+        if entry is None or entry.get('fingerprint') != fingerprint:
+            return None
+
+        commands: List[Dict[str, Any]] = entry['commands']
+        return commands
+
+    def put(
+        self,
+        application_id: Snowflake,
+        scope: Scope,
+        fingerprint: str,
+        commands: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Record the commands returned by syncing ``scope``, and save
+        unless the cache was saved within the last second.
+        """
+        self._scopes(application_id)[_scope_key(scope)] = {
+            'fingerprint': fingerprint,
+            'commands': commands,
+        }
+        self._changed()
+
+    def discard(self, application_id: Snowflake, scope: Scope) -> None:
+        """ Forget ``scope``, and save like :meth:`put`. """
+        if self._scopes(application_id).pop(_scope_key(scope), None):
+            self._changed()
+
+    def scopes(self, application_id: Snowflake) -> List[Scope]:
+        """ Get the scopes that have been synced. """
+        return [
+            None if key == _GLOBAL else Snowflake(key)
+            for key in self._scopes(application_id)
+        ]
+
+    def save(self) -> None:
+        """
+        Write the cache file, replacing it atomically.
+
+        Failing to write it is logged, since syncing only gets slower.
+        """
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        save_cache(
+            self.path, _CACHE_VERSION, 'applications', self._load(),
+            description='command cache')
+
+    def flush(self) -> None:
+        """ Save the changes not saved yet by :meth:`put`, if any. """
+        if self._dirty:
+            self.save()
+
+    def _changed(self) -> None:
+        # Saving after every scope would rewrite the whole
+        # file thousands of times when syncing many guilds
+        self._dirty = True
+
+        if time.monotonic() - self._saved_at >= _SAVE_INTERVAL:
+            self.save()
+
+    def _scopes(self, application_id: Snowflake) -> Dict[str, Any]:
+        return self._load().setdefault(str(application_id), {})
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._applications is None:
+            self._applications = load_cache(
+                self.path, _CACHE_VERSION, 'applications',
+                description='command cache')
+
+        return self._applications
+
+
+class CommandSync:
+    """ Syncs the commands of an application, one request per scope. """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        application_id: Snowflake,
+        cache: Optional[SyncCache] = None,
+        *,
+        concurrency: int = 8,
+        progress: Optional[Callable[[SyncProgress], None]] = None,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        """
+        :param session: The authenticated session to send requests with
+        :type session: aiohttp.ClientSession
+        :param application_id: The ID of the application
+        :type application_id: Snowflake
+        :param cache: Where to keep the fingerprints of synced scopes,
+            or ``None`` to always send every scope
+        :type cache: SyncCache, optional
+        :param concurrency: The most guild scopes to sync at once
+        :type concurrency: int
+        :param progress: Called after each scope is synced
+        :type progress: Callable[[SyncProgress], None], optional
+        :param limiter: The rate limiter to send requests through,
+            defaults to one of the sync's own
+        :type limiter: RateLimiter, optional
+        """
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+
+        self.session = session
+        self.application_id = application_id
+        self.cache = cache
+        self.concurrency = concurrency
+        self.progress = progress
+        self.limiter = limiter or RateLimiter()
+
+    async def sync(
+        self,
+        manifest: Mapping[Scope, Sequence[Dict[str, Any]]],
+    ) -> Dict[Scope, List[ApplicationCommand]]:
+        """
+        Make the commands of every scope those of ``manifest``.
+
+        Global commands are always synced, and scopes synced before but
+        missing from ``manifest`` are cleared of commands. Guild scopes
+        that can't be synced because the application is not in the
+        guild are logged and left out of the result.
+
+        :return: The commands of each scope in ``manifest``
+        """
+        scopes: Dict[Scope, Sequence[Dict[str, Any]]] = {None: []}
+        scopes.update(manifest)
+        stale: Set[Scope] = set()
+
+        if self.cache is not None:
+            stale.update(
+                scope for scope in self.cache.scopes(self.application_id)
+                if scope not in scopes)
+
+        for scope in stale:
+            scopes[scope] = ()  # Cleared, then forgotten
+
+        synced: Dict[Scope, List[ApplicationCommand]] = {}
+        progress = SyncProgress(len(scopes))
+        reporter = _ProgressReporter(progress, self.progress)
+
+        async def _sync(scope: Scope) -> None:
+            commands = scopes[scope]
+
+            try:
+                result = await self.sync_scope(scope, commands, progress)
+            except aiohttp.ClientResponseError as e:
+                if scope is None or e.status not in (403, 404):
+                    raise
+
+                # The application may have been removed from the guild
+                logger.warning(
+                    'Could not sync the commands of %s: %s',
+                    _describe(scope), e.message)
+                progress.failed += 1
+
+                if scope in stale and self.cache is not None:
+                    self.cache.discard(self.application_id, scope)
+            else:
+                if scope not in stale:
+                    synced[scope] = result
+
+            reporter.report()
+
+        try:
+            await _sync(None)
+            await self._gather(
+                _sync, [scope for scope in scopes if scope is not None])
+        finally:
+            if self.cache is not None:
+                self.cache.flush()
+
+        reporter.finish()
+        return synced
+
+    async def sync_scope(
+        self,
+        scope: Scope,
+        commands: Sequence[Dict[str, Any]],
+        progress: Optional[SyncProgress] = None,
+    ) -> List[ApplicationCommand]:
+        """
+        Make the commands of ``scope`` exactly ``commands``, unless they
+        are unchanged since the last sync.
+
+        :param progress: The progress to count the scope in
+        :type progress: SyncProgress, optional
+        :return: The commands of ``scope``, as returned by Discord
+        """
+        digest = fingerprint(commands)
+        raw = None
+        cache = self.cache
+
+        if cache is not None:
+            raw = cache.get(self.application_id, scope, digest)
+
+        if raw is not None:
+            logger.debug('Commands of %s are unchanged', _describe(scope))
+
+            if progress is not None:
+                progress.unchanged += 1
+        else:
+            raw = await self._overwrite(scope, commands)
+
+            if progress is not None:
+                progress.sent += 1
+
+            if cache is None:
+                pass
+            elif commands or scope is None:
+                cache.put(self.application_id, scope, digest, raw)
+            else:
+                cache.discard(self.application_id, scope)
+
+        return [ApplicationCommand.parse_obj(obj) for obj in raw]
+
+    async def _gather(
+        self,
+        func: Callable[[Scope], Awaitable[None]],
+        scopes: Iterable[Scope],
+    ) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _bounded(scope: Scope) -> None:
+            async with semaphore:
+                await func(scope)
+
+        tasks = [asyncio.ensure_future(_bounded(scope)) for scope in scopes]
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # Stop the others once one has failed
+            for task in tasks:
+                task.cancel()
+
+            if tasks:
+                await asyncio.wait(tasks)
+
+    async def _overwrite(
+        self,
+        scope: Scope,
+        commands: Sequence[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        logger.debug(
+            'Syncing %d commands of %s', len(commands), _describe(scope))
+
+        async with self.limiter.request(
+            self.session,
+            'PUT',
+            self._url(scope),
+            data=JsonPayload(list(commands)),
+        ) as response:
+            raw: List[Dict[str, Any]] = await response.json(loads=loads)
+            return raw
+
+    def _url(self, scope: Scope) -> str:
+        url = f'/api/v9/applications/{self.application_id}'
+
+        if scope is not None:
+            url += f'/guilds/{scope}'
+
+        return url + '/commands'
+
+
+class _ProgressReporter:
+    def __init__(
+        self,
+        progress: SyncProgress,
+        callback: Optional[Callable[[SyncProgress], None]],
+    ) -> None:
+        self.progress = progress
+        self.callback = callback
+        self._logged_at = time.monotonic()
+
+    def report(self) -> None:
+        if self.callback is not None:
+            self.callback(self.progress)
+
+        if time.monotonic() - self._logged_at >= _PROGRESS_INTERVAL:
+            self._log()
+
+    def finish(self) -> None:
+        if self.progress.sent or self.progress.failed:
+            self._log()
+
+    def _log(self) -> None:
+        self._logged_at = time.monotonic()
+        p = self.progress
+        logger.info(
+            'Synced commands of %d/%d scopes '
+            '(%d sent, %d unchanged, %d failed)',
+            p.done, p.total, p.sent, p.unchanged, p.failed)
+
+
+def _scope_key(scope: Scope) -> str:
+    return _GLOBAL if scope is None else str(scope)
+
+
+def _describe(scope: Scope) -> str:
+    return 'global scope' if scope is None else f'guild {scope}'
@@ -1,5 +1,6 @@
 import logging
 import os
+import random
 
 import clyde
 from clyde.models.locale import Locale
@@ -23,6 +24,9 @@ async def color(
     integral: int,  # Any integer between -2^53 and 2^53
     is_cool: bool,  # True/false
 ):
-    pass
+    # A str is sent as the content of a message
+    color = f'#{random.randrange(0x1000000):06x}'
+    coolness = 'cool' if is_cool else 'not cool'
+    return f'{name}, your color is {color}. It is {coolness}. ({integral})'
 
 app.run(port=80)
@@ -0,0 +1,32 @@
+import time
+
+import pytest
+
+from clyde.models.interactions import Interaction
+from clyde.models.snowflake import DISCORD_EPOCH, Snowflake
+
+
+def _snowflake(unix_time):
+    return Snowflake((int(unix_time * 1000) - DISCORD_EPOCH) << 22)
+
+
+@pytest.fixture
+def make_interaction():
+    """
+    Build an interaction of ``type`` created ``age`` seconds ago, or at
+    the Unix time ``created``, with any other fields given.
+    """
+    def _make(type=2, *, age=0.0, created=None, **fields):
+        if created is None:
+            created = time.time() - age
+
+        return Interaction.parse_lazy({
+            'id': str(_snowflake(created)),
+            'application_id': '881397058114826261',
+            'type': type,
+            'token': 'EXAMPLE_TOKEN',
+            'version': 1,
+            **fields,
+        })
+
+    return _make
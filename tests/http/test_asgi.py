@@ -0,0 +1,156 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from nacl.signing import SigningKey
+
+from clyde.application import ClydeApp
+from clyde.http.asgi import ASGIApplication
+from clyde.http.profile import ServerProfile
+from clyde.http.server import HTTPServer
+from clyde.sync import SyncState
+
+SIGNING_KEY = SigningKey(b'\x03' * 32)
+TIMESTAMP = '1664323200'
+DATA_DIR = Path(__file__).parent.parent / 'models' / 'data'
+
+
+def _call(app, scope, messages):
+    sent = []
+    incoming = iter(messages)
+
+    async def receive():
+        return next(incoming)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def _request(app, body, *, signed=True, method='POST', path='/', chunks=1):
+    headers = [(b'content-type', b'application/json')]
+
+    if signed:
+        signature = SIGNING_KEY.sign(TIMESTAMP.encode() + body).signature
+        headers += [
+            (b'x-signature-ed25519', signature.hex().encode()),
+            (b'x-signature-timestamp', TIMESTAMP.encode()),
+        ]
+
+    size = -(-len(body) // chunks)
+    messages = [
+        {
+            'type': 'http.request',
+            'body': body[i * size:(i + 1) * size],
+            'more_body': i < chunks - 1,
+        }
+        for i in range(chunks)
+    ]
+
+    start, end = _call(app, {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'headers': headers,
+    }, messages)
+
+    assert start['type'] == 'http.response.start'
+    assert end['type'] == 'http.response.body'
+    assert dict(start['headers'])[b'content-length'] == \
+        str(len(end['body'])).encode()
+
+    return start['status'], dict(start['headers']), end['body']
+
+
+def _ping_body():
+    return (DATA_DIR / 'ping_interaction.json').read_bytes()
+
+
+def test_ping():
+    app = HTTPServer(public_key=bytes(SIGNING_KEY.verify_key)).asgi()
+
+    status, headers, body = _request(app, _ping_body(), chunks=3)
+    assert status == 200
+    assert headers[b'content-type'].startswith(b'application/json')
+    assert json.loads(body) == {'type': 1}
+
+
+def test_rejected_requests():
+    app = HTTPServer(
+        public_key=bytes(SIGNING_KEY.verify_key),
+        profile=ServerProfile(client_max_size=64),
+    ).asgi()
+
+    assert _request(app, _ping_body(), signed=False)[0] == 401
+    assert _request(app, _ping_body(), path='/other')[0] == 404
+    assert _request(app, b'x' * 65)[0] == 413
+
+    status, headers, _ = _request(app, b'', method='GET')
+    assert status == 405
+    assert headers[b'allow'] == b'POST'
+
+
+def test_invalid_signature():
+    app = HTTPServer(public_key=bytes(SigningKey(b'\x04' * 32).verify_key))
+    assert _request(app.asgi(), _ping_body())[0] == 401
+
+
+def test_lifespan():
+    events = []
+
+    async def startup():
+        events.append('startup')
+        app.reader = reader
+
+    async def shutdown():
+        events.append('shutdown')
+
+    async def reader(signature, timestamp, body):
+        raise AssertionError('unreachable')
+
+    app = ASGIApplication(
+        None, on_startup=startup, on_shutdown=shutdown)
+
+    sent = _call(app, {'type': 'lifespan'}, [
+        {'type': 'lifespan.startup'},
+        {'type': 'lifespan.shutdown'},
+    ])
+
+    assert events == ['startup', 'shutdown']
+    assert app.reader is reader
+    assert [m['type'] for m in sent] == [
+        'lifespan.startup.complete',
+        'lifespan.shutdown.complete',
+    ]
+
+
+def test_not_started():
+    app = ASGIApplication(None)
+    assert _request(app, _ping_body())[0] == 503
+
+
+@pytest.mark.parametrize('sync,state', [
+    (True, SyncState.PENDING),
+    (False, SyncState.SKIPPED),
+])
+def test_app_sync_owner(sync, state):
+    app = ClydeApp(
+        'token',
+        public_key=bytes(SIGNING_KEY.verify_key),
+        application_id='881397058114826261',
+    )
+    adapter = app.asgi(sync=sync)
+
+    async def _run():
+        await adapter.on_startup()
+
+        # Only the worker that owns the sync starts it
+        assert bool(app._background) == sync
+        assert app.sync_state.state == state
+
+        await adapter.on_shutdown()
+
+    asyncio.run(_run())
@@ -0,0 +1,198 @@
+import asyncio
+import importlib.machinery
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aiohttp import web
+from nacl.signing import SigningKey
+
+from clyde.http import lifecycle
+from clyde.http.lifecycle import InFlight, drain, finish_handover
+from clyde.http.listeners import TCPListener, open_listeners
+from clyde.http.server import HTTPServer
+
+SIGNING_KEY = SigningKey(b'\x03' * 32)
+TIMESTAMP = '1664323200'
+DATA_DIR = Path(__file__).parent.parent / 'models' / 'data'
+ROOT = Path(__file__).parent.parent.parent
+
+
+def test_in_flight():
+    async def _run():
+        in_flight = InFlight()
+        await in_flight.wait()
+
+        with in_flight.track():
+            waiter = asyncio.ensure_future(in_flight.wait())
+            await asyncio.sleep(0)
+            assert not waiter.done()
+
+        await asyncio.wait_for(waiter, 1)
+        assert in_flight.count == 0
+
+    asyncio.run(_run())
+
+
+def test_drain_cancels_late_followups():
+    async def _run():
+        runner = web.AppRunner(web.Application())
+        await runner.setup()
+
+        done = asyncio.ensure_future(asyncio.sleep(0))
+        late = asyncio.ensure_future(asyncio.sleep(10))
+
+        await drain(runner, InFlight(), timeout=0.1, followups={done, late})
+        assert done.done() and not done.cancelled()
+        assert late.cancelled()
+
+    asyncio.run(_run())
+
+
+def test_stop_waits_for_requests():
+    server = HTTPServer(public_key=bytes(SIGNING_KEY.verify_key))
+    body = (DATA_DIR / 'ping_interaction.json').read_bytes()
+    headers = {
+        'X-Signature-Ed25519':
+            SIGNING_KEY.sign(TIMESTAMP.encode() + body).signature.hex(),
+        'X-Signature-Timestamp': TIMESTAMP,
+    }
+    handle_ping = server.handler.handle_ping
+
+    async def _slow_ping(interaction):
+        await asyncio.sleep(0.2)
+        return await handle_ping(interaction)
+
+    server.handler.handle_ping = _slow_ping
+
+    async def _run(sock):
+        host, port = sock.getsockname()
+        url = f'http://{host}:{port}/'
+        await server.start(sockets=[sock])
+
+        async with aiohttp.ClientSession() as session:
+            async def _post():
+                async with session.post(url, data=body, headers=headers) as r:
+                    return r.status
+
+            request = asyncio.ensure_future(_post())
+            await asyncio.sleep(0.1)
+            await server.stop()
+
+            # The request in flight was answered before stopping
+            assert request.done()
+            assert request.result() == 200
+
+            with pytest.raises(aiohttp.ClientConnectionError):
+                await _post()
+
+    with open_listeners([TCPListener('127.0.0.1', 0)]) as (sock,):
+        asyncio.run(_run(sock))
+
+
+@pytest.mark.parametrize('spec,argv,args', [
+    (None, ['bot.py', '--debug'], ['bot.py', '--debug']),
+    ('bot', ['/srv/bot.py', '--debug'], ['-m', 'bot', '--debug']),
+    ('bot.__main__', ['/srv/bot/__main__.py'], ['-m', 'bot']),
+])
+def test_program_args_before_orig_argv(monkeypatch, spec, argv, args):
+    monkeypatch.delattr(sys, 'orig_argv', raising=False)
+    monkeypatch.setattr(sys, 'argv', argv)
+    monkeypatch.setattr(
+        sys.modules['__main__'], '__spec__',
+        spec and importlib.machinery.ModuleSpec(spec, None))
+
+    assert lifecycle._program_args() == args
+
+
+def test_finish_handover(monkeypatch):
+    killed = []
+    monkeypatch.setattr(os, 'kill', lambda *args: killed.append(args))
+
+    finish_handover()
+    assert killed == []
+
+    monkeypatch.setenv(lifecycle._HANDOVER_PID, '1234')
+    finish_handover()
+    assert killed == [(1234, signal.SIGTERM)]
+    assert lifecycle._HANDOVER_PID not in os.environ
+
+
+_SERVE = '''
+import os, sys
+from nacl.signing import SigningKey
+from clyde.http.listeners import UnixListener
+from clyde.http.server import HTTPServer
+
+with open(sys.argv[2], 'a') as f:
+    f.write(f'{os.getpid()}\\n')
+
+HTTPServer(
+    listeners=[UnixListener(sys.argv[1])],
+    public_key=bytes(SigningKey(b'\\x03' * 32).verify_key),
+).run()
+'''
+
+
+def _wait_until(condition):
+    deadline = time.monotonic() + 10
+
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+
+    return True
+
+
+@pytest.mark.skipif(
+    lifecycle.HANDOVER_SIGNAL is None or not hasattr(sys, 'orig_argv'),
+    reason='requires SIGUSR2 and sys.orig_argv',
+)
+def test_handover(tmp_path):
+    path = tmp_path / 'clyde.sock'
+    pids = tmp_path / 'pids'
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    process = subprocess.Popen(
+        [sys.executable, '-c', _SERVE, str(path), str(pids)], env=env)
+
+    async def _post():
+        connector = aiohttp.UnixConnector(path=str(path))
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async with session.post('http://localhost/') as resp:
+                return resp.status
+
+    replacement = None
+
+    try:
+        _wait_until(path.exists)
+        assert asyncio.run(_post()) == 401
+
+        process.send_signal(lifecycle.HANDOVER_SIGNAL)
+
+        # The replacement stops the old process once it is serving
+        assert process.wait(10) == 0
+        replacement = int(pids.read_text().split()[1])
+        assert _is_running(replacement)
+
+        assert path.exists()
+        assert asyncio.run(_post()) == 401
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+        if replacement is not None:
+            os.kill(replacement, signal.SIGTERM)
+            _wait_until(lambda: not _is_running(replacement))
@@ -0,0 +1,159 @@
+import asyncio
+import errno
+import multiprocessing
+import os
+import signal
+import socket
+import stat
+import time
+
+import aiohttp
+import pytest
+from nacl.signing import SigningKey
+
+from clyde.http.listeners import (
+    FDListener,
+    TCPListener,
+    UnixListener,
+    open_listeners,
+    systemd_listeners,
+)
+from clyde.http.server import HTTPServer
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, 'AF_UNIX'), reason='requires Unix sockets')
+
+
+def test_tcp_listener():
+    with open_listeners([TCPListener('127.0.0.1', 0)]) as (sock,):
+        host, port = sock.getsockname()
+        assert host == '127.0.0.1'
+
+        with socket.create_connection((host, port), timeout=1):
+            pass
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_tcp_listener_on_every_interface():
+    port = _free_port()
+
+    with open_listeners([TCPListener(None, port)]) as sockets:
+        families = [sock.family for sock in sockets]
+        assert socket.AF_INET in families
+        assert socket.AF_INET6 in families or not socket.has_ipv6
+        assert len(set(families)) == len(families)
+
+        for family in families:
+            host = '::1' if family == socket.AF_INET6 else '127.0.0.1'
+
+            with socket.create_connection((host, port), timeout=1):
+                pass
+
+
+def test_unix_listener(tmp_path):
+    path = tmp_path / 'clyde.sock'
+
+    # A stale socket file from a previous run is replaced
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(str(path))
+    stale.close()
+
+    listener = UnixListener(path, mode=0o600)
+
+    with open_listeners([listener]) as (sock,):
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(str(path))
+
+    assert not path.exists()
+
+
+def test_unix_listener_keeps_other_files(tmp_path):
+    path = tmp_path / 'clyde.sock'
+    path.write_text('not a socket')
+
+    with pytest.raises(FileExistsError):
+        UnixListener(path).open()
+
+
+def test_unix_listener_keeps_sockets_in_use(tmp_path):
+    path = tmp_path / 'clyde.sock'
+
+    with open_listeners([UnixListener(path)]):
+        with pytest.raises(OSError) as excinfo:
+            UnixListener(path).open()
+
+        assert excinfo.value.errno == errno.EADDRINUSE
+        assert path.exists()
+
+
+def test_fd_listener():
+    original = socket.socket()
+    original.bind(('127.0.0.1', 0))
+    original.listen()
+
+    with open_listeners([FDListener(os.dup(original.fileno()))]) as (sock,):
+        assert sock.getsockname() == original.getsockname()
+
+    original.close()
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as datagram:
+        with pytest.raises(ValueError):
+            FDListener(datagram.fileno()).open()
+
+
+def test_systemd_listeners(monkeypatch):
+    monkeypatch.setenv('LISTEN_PID', str(os.getpid()))
+    monkeypatch.setenv('LISTEN_FDS', '2')
+
+    listeners = systemd_listeners()
+    assert [listener.fd for listener in listeners] == [3, 4]
+    assert 'LISTEN_FDS' not in os.environ
+
+    monkeypatch.setenv('LISTEN_PID', str(os.getpid() + 1))
+    monkeypatch.setenv('LISTEN_FDS', '2')
+    assert systemd_listeners() == []
+
+
+def _serve(path):
+    HTTPServer(
+        listeners=[UnixListener(path)],
+        public_key=bytes(SigningKey(b'\x03' * 32).verify_key),
+    ).run(workers=2)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork()')
+def test_workers_serve_unix_socket(tmp_path):
+    path = tmp_path / 'clyde.sock'
+    process = multiprocessing.get_context('fork').Process(
+        target=_serve, args=(str(path),))
+    process.start()
+
+    async def _post():
+        connector = aiohttp.UnixConnector(path=str(path))
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async with session.post('http://localhost/') as resp:
+                return resp.status
+
+    try:
+        deadline = time.monotonic() + 10
+
+        while not path.exists():
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+        # Unsigned requests are rejected by a worker
+        assert asyncio.run(_post()) == 401
+    finally:
+        os.kill(process.pid, signal.SIGTERM)
+        process.join(10)
+
+    assert process.exitcode == 0
+    assert not path.exists()
@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from nacl.signing import SigningKey
+
+from clyde.http.middleware import PAYLOAD_KEY, validate_signature
+
+SIGNING_KEY = SigningKey(b'\x01' * 32)
+TIMESTAMP = '1664323200'
+BODY = b'{"type":1,"name":"caf\xc3\xa9"}'
+
+
+async def _handler(request: web.Request) -> web.Response:
+    return web.json_response(request[PAYLOAD_KEY])
+
+
+def _post(body: bytes, headers: dict, *, offload: bool = False) -> tuple:
+    async def _run():
+        app = web.Application(middlewares=[
+            validate_signature(SIGNING_KEY.verify_key, offload=offload),
+        ])
+        app.router.add_post('/', _handler)
+
+        async with TestClient(TestServer(app)) as client:
+            async with client.post('/', data=body, headers=headers) as resp:
+                return resp.status, await resp.read()
+
+    return asyncio.run(_run())
+
+
+def _sign(body: bytes, timestamp: str = TIMESTAMP) -> dict:
+    signed = SIGNING_KEY.sign(timestamp.encode() + body)
+
+    return {
+        'X-Signature-Ed25519': signed.signature.hex(),
+        'X-Signature-Timestamp': timestamp,
+    }
+
+
+@pytest.mark.parametrize('offload', [False, True])
+def test_valid_signature(offload):
+    status, body = _post(BODY, _sign(BODY), offload=offload)
+
+    assert status == 200
+    assert json.loads(body) == {'type': 1, 'name': 'café'}
+
+
+def test_missing_signature():
+    status, _ = _post(BODY, {'X-Signature-Timestamp': TIMESTAMP})
+    assert status == 401
+
+
+@pytest.mark.parametrize('offload', [False, True])
+def test_invalid_signature(offload):
+    headers = _sign(BODY)
+    headers['X-Signature-Timestamp'] = '1664323201'
+
+    status, _ = _post(BODY, headers, offload=offload)
+    assert status == 401
+
+
+def test_malformed_signature():
+    headers = _sign(BODY)
+    headers['X-Signature-Ed25519'] = 'not hex'
+
+    status, _ = _post(BODY, headers)
+    assert status == 401
+
+
+@pytest.mark.parametrize('offload', [False, True])
+def test_short_signature(offload):
+    headers = _sign(BODY)
+    headers['X-Signature-Ed25519'] = 'abcd'
+
+    status, _ = _post(BODY, headers, offload=offload)
+    assert status == 401
+
+
+def test_short_signature_in_batch():
+    # Unauthenticated requests must not fail the others in their batch
+    short = dict(_sign(BODY), **{'X-Signature-Ed25519': 'abcd'})
+
+    async def _run():
+        app = web.Application(middlewares=[
+            validate_signature(SIGNING_KEY.verify_key, offload=True),
+        ])
+        app.router.add_post('/', _handler)
+
+        async with TestClient(TestServer(app)) as client:
+            async def _post(headers):
+                async with client.post('/', data=BODY, headers=headers) as r:
+                    return r.status
+
+            return await asyncio.gather(
+                _post(_sign(BODY)), _post(short), _post(_sign(BODY)))
+
+    assert asyncio.run(_run()) == [200, 401, 200]
+
+
+def test_invalid_body():
+    status, _ = _post(b'{"type":', _sign(b'{"type":'))
+    assert status == 400
@@ -0,0 +1,37 @@
+import asyncio
+
+from clyde.http import profile
+from clyde.http.profile import (
+    DEFAULT_PROFILE,
+    PERFORMANCE_PROFILE,
+    ServerProfile,
+)
+
+
+async def _loop_type():
+    return type(asyncio.get_running_loop())
+
+
+def test_default_profile_runs_asyncio():
+    assert DEFAULT_PROFILE.uses_uvloop is False
+    loop_type = DEFAULT_PROFILE.run(_loop_type())
+    assert loop_type.__module__.startswith('asyncio')
+
+
+def test_falls_back_without_uvloop(monkeypatch):
+    monkeypatch.setattr(profile, 'uvloop', None)
+    assert ServerProfile(uvloop=True).uses_uvloop is False
+
+    loop_type = ServerProfile(uvloop=True).run(_loop_type())
+    assert loop_type.__module__.startswith('asyncio')
+
+
+def test_runner_kwargs():
+    assert DEFAULT_PROFILE.runner_kwargs() == {
+        'keepalive_timeout': 75.0,
+        'access_log': profile.access_logger,
+    }
+    assert PERFORMANCE_PROFILE.runner_kwargs() == {
+        'keepalive_timeout': 300.0,
+        'access_log': None,
+    }
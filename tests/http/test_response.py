@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from clyde.http.response import (
+    DEFERRED_CHANNEL_MESSAGE,
+    PONG,
+    encode_response,
+    to_response,
+)
+from clyde.models.interactions import (
+    InteractionCallbackData,
+    InteractionCallbackType,
+    InteractionResponse,
+)
+from clyde.models.messages import MessageFlags
+
+
+def test_prebuilt_bodies():
+    assert json.loads(PONG) == {'type': 1}
+    assert json.loads(DEFERRED_CHANNEL_MESSAGE) == {'type': 5}
+
+    response = InteractionResponse(type=InteractionCallbackType.PONG)
+    assert encode_response(response) is PONG
+
+
+def test_bytes_passthrough():
+    body = b'{"type":4,"data":{"content":"hi"}}'
+    assert encode_response(body) is body
+
+
+def test_encode_response():
+    response = InteractionResponse(
+        type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+        data=InteractionCallbackData(
+            content='It works!',
+            flags=MessageFlags.EPHEMERAL,
+        ),
+    )
+
+    # Unset fields are omitted, enums become their values
+    assert json.loads(encode_response(response)) == {
+        'type': 4,
+        'data': {'content': 'It works!', 'flags': 64},
+    }
+
+
+def test_to_response():
+    assert json.loads(encode_response(to_response('hi'))) == {
+        'type': 4,
+        'data': {'content': 'hi'},
+    }
+
+    data = InteractionCallbackData(flags=MessageFlags.EPHEMERAL)
+    assert to_response(data).data == data
+    assert to_response(PONG) is PONG
+
+    with pytest.raises(TypeError):
+        _ = to_response(None)
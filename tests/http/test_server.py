@@ -0,0 +1,86 @@
+import asyncio
+import json
+from pathlib import Path
+
+from aiohttp.test_utils import TestClient, TestServer
+from nacl.signing import SigningKey
+
+from clyde.http.profile import ServerProfile
+from clyde.http.server import HTTPServer
+
+SIGNING_KEY = SigningKey(b'\x03' * 32)
+TIMESTAMP = '1664323200'
+DATA_DIR = Path(__file__).parent.parent / 'models' / 'data'
+
+
+def _post(server: HTTPServer, obj: dict) -> tuple:
+    body = json.dumps(obj).encode()
+    headers = {
+        'X-Signature-Ed25519':
+            SIGNING_KEY.sign(TIMESTAMP.encode() + body).signature.hex(),
+        'X-Signature-Timestamp': TIMESTAMP,
+    }
+
+    async def _run():
+        async with TestClient(TestServer(server._app)) as client:
+            async with client.post('/', data=body, headers=headers) as resp:
+                return resp.status, await resp.read()
+
+    return asyncio.run(_run())
+
+
+def test_ping():
+    server = HTTPServer(public_key=bytes(SIGNING_KEY.verify_key))
+    obj = json.loads((DATA_DIR / 'ping_interaction.json').read_text())
+
+    status, body = _post(server, obj)
+    assert status == 200
+    assert json.loads(body) == {'type': 1}
+
+
+def test_application_command():
+    server = HTTPServer(
+        public_key=bytes(SIGNING_KEY.verify_key),
+        trusted_parsing=True,
+    )
+    obj = json.loads((DATA_DIR / 'slash_command.json').read_text())
+
+    status, body = _post(server, obj)
+    assert status == 200
+    assert json.loads(body) == {
+        'type': 4,
+        'data': {'content': 'It works!', 'flags': 64},
+    }
+
+
+def test_message_component():
+    server = HTTPServer(public_key=bytes(SIGNING_KEY.verify_key))
+    obj = json.loads((DATA_DIR / 'message_component.json').read_text())
+
+    @server.handler.components.route('click_one')
+    async def click_one(ctx):
+        return f'Clicked in {ctx.interaction.channel_id}'
+
+    status, body = _post(server, obj)
+    assert status == 200
+    assert json.loads(body)['data']['content'].startswith('Clicked in ')
+
+    # The aiohttp app can only be started once
+    other = HTTPServer(public_key=bytes(SIGNING_KEY.verify_key))
+    other.handler = server.handler
+
+    obj['data']['custom_id'] = 'click_two'
+    status, _ = _post(other, obj)
+    assert status == 400
+
+
+def test_profile_limits_body_size():
+    server = HTTPServer(
+        public_key=bytes(SIGNING_KEY.verify_key),
+        profile=ServerProfile(client_max_size=1024),
+    )
+    obj = json.loads((DATA_DIR / 'ping_interaction.json').read_text())
+    obj['padding'] = 'x' * 1024
+
+    status, _ = _post(server, obj)
+    assert status == 413
@@ -0,0 +1,74 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from nacl.signing import SigningKey
+
+from clyde.http.verifier import (
+    BatchVerifier,
+    NaClVerifier,
+    available_backends,
+    create_verifier,
+    fastest_backend,
+)
+
+SIGNING_KEY = SigningKey(b'\x02' * 32)
+PUBLIC_KEY = bytes(SIGNING_KEY.verify_key)
+MESSAGES = [b'1664323200' + bytes([i]) * 64 for i in range(10)]
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_backend(backend):
+    verifier = backend(PUBLIC_KEY)
+    signature = SIGNING_KEY.sign(MESSAGES[0]).signature
+
+    assert verifier.verify(MESSAGES[0], signature)
+    assert not verifier.verify(MESSAGES[1], signature)
+    assert not verifier.verify(MESSAGES[0], bytes(64))
+
+
+@pytest.mark.parametrize('backend', available_backends())
+@pytest.mark.parametrize('signature', [b'', bytes(32), bytes(63), bytes(65)])
+def test_wrong_length_signature(backend, signature):
+    assert backend(PUBLIC_KEY).verify(MESSAGES[0], signature) is False
+
+
+@pytest.mark.parametrize('backend', available_backends())
+@pytest.mark.parametrize('key', [b'', PUBLIC_KEY[:31], PUBLIC_KEY + b'\0'])
+def test_wrong_length_key(backend, key):
+    with pytest.raises(ValueError):
+        backend(key)
+
+
+def test_create_verifier():
+    assert isinstance(create_verifier(PUBLIC_KEY, 'pynacl'), NaClVerifier)
+    assert isinstance(create_verifier(PUBLIC_KEY), fastest_backend())
+
+    with pytest.raises(ValueError):
+        _ = create_verifier(PUBLIC_KEY, 'unknown')
+
+
+@pytest.mark.parametrize('max_batch_size', [1, 3, 64])
+def test_batch_verifier(max_batch_size):
+    signatures = [SIGNING_KEY.sign(m).signature for m in MESSAGES]
+    signatures[4] = signatures[5]  # Corrupt one of them
+
+    async def _run():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            verifier = BatchVerifier(
+                NaClVerifier(PUBLIC_KEY),
+                executor=executor,
+                max_batch_size=max_batch_size,
+            )
+
+            return await asyncio.gather(*(
+                verifier.verify(m, s) for m, s in zip(MESSAGES, signatures)
+            ))
+
+    results = asyncio.run(_run())
+    assert results == [i != 4 for i in range(len(MESSAGES))]
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        _ = BatchVerifier(NaClVerifier(PUBLIC_KEY), max_batch_size=0)
@@ -0,0 +1,125 @@
+import gc
+import os
+import signal
+import time
+
+import pytest
+
+from clyde.application import ClydeApp
+from clyde.http import workers
+from clyde.http.workers import METRICS, Worker, WorkerSupervisor
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, 'fork'), reason='requires os.fork()')
+
+
+def test_metrics_keep_totals_of_restarted_workers():
+    supervisor = WorkerSupervisor(lambda worker: None, workers=2)
+
+    Worker(0, (), supervisor._metrics).publish(
+        {'requests': 3, 'in_flight': 1})
+    Worker(1, (), supervisor._metrics).publish(
+        {'requests': 4, 'in_flight': 2, 'shed_expired': 1})
+
+    assert supervisor.metrics() == {
+        'requests': 7,
+        'in_flight': 3,
+        'backlog': 0,
+        'shed_expired': 1,
+        'shed_queue_full': 0,
+        'rate_limited': 0,
+        'rate_limit_wait_ms': 0,
+    }
+
+    # Levels of a dead worker are dropped, its totals are kept
+    supervisor._retire(1)
+    Worker(1, (), supervisor._metrics).publish({'requests': 1})
+
+    assert supervisor.metrics()['requests'] == 8
+    assert supervisor.metrics()['in_flight'] == 1
+    assert supervisor.metrics()['shed_expired'] == 1
+
+
+def test_app_metrics_match_worker_metrics():
+    assert set(ClydeApp('token').metrics()) == set(METRICS)
+
+
+def _stop_supervisor(worker):
+    worker.publish({'requests': 1})
+    os.kill(os.getppid(), signal.SIGTERM)
+    time.sleep(10)  # Until the supervisor passes on the SIGTERM
+
+
+def test_run_and_stop():
+    def target(worker):
+        worker.publish({'requests': 1})
+
+        # Every process sees the metrics of every worker
+        while supervisor.metrics()['requests'] < 2:
+            time.sleep(0.01)
+
+        if worker.slot == 0:
+            _stop_supervisor(worker)
+        else:
+            time.sleep(10)
+
+    supervisor = WorkerSupervisor(target, workers=2)
+    supervisor.run()
+
+    assert supervisor.metrics()['requests'] == 2
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+
+
+def test_restarts_crashed_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(workers, '_MIN_UPTIME', 0.0)
+    crashed = tmp_path / 'crashed'
+
+    def target(worker):
+        if not crashed.exists():
+            crashed.touch()
+            worker.publish({'requests': 5})
+            raise RuntimeError('crash')
+
+        _stop_supervisor(worker)
+
+    supervisor = WorkerSupervisor(target, workers=1)
+    supervisor.run()
+
+    assert supervisor.metrics()['requests'] == 6
+
+
+def test_stops_while_restart_is_backing_off(tmp_path):
+    crashed = tmp_path / 'crashed'
+
+    def target(worker):
+        if worker.slot == 0:
+            crashed.touch()
+            raise RuntimeError('crash')
+
+        while not crashed.exists():
+            time.sleep(0.01)
+
+        # Give the supervisor time to schedule the restart
+        time.sleep(0.2)
+        _stop_supervisor(worker)
+
+    supervisor = WorkerSupervisor(target, workers=2)
+    start = time.monotonic()
+    supervisor.run()
+
+    # Without waiting out the backoff of two seconds
+    assert time.monotonic() - start < 1.5
+    assert supervisor.metrics()['requests'] == 1
+
+
+def test_workers_collect_garbage_but_keep_it_frozen():
+    def target(worker):
+        frozen = gc.isenabled() and gc.get_freeze_count() > 0
+        worker.publish({'requests': frozen})
+        os.kill(os.getppid(), signal.SIGTERM)
+        time.sleep(10)
+
+    supervisor = WorkerSupervisor(target, workers=1)
+    supervisor.run()
+
+    assert supervisor.metrics()['requests'] == 1
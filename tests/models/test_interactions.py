@@ -1,12 +1,19 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
 from clyde.models.interactions import (
     ApplicationCommandData,
     ApplicationCommandType,
+    ComponentData,
     Interaction,
     InteractionType,
+    ModalSubmitData,
 )
 from clyde.models.permissions import Permissions
 from clyde.models.snowflake import Snowflake
-from clyde.models.users import UserFlags
+from clyde.models.users import GuildMember, UserFlags
 
 
 def test_message_command(shared_datadir):
@@ -14,7 +21,30 @@ def test_message_command(shared_datadir):
 
 
 def test_message_component(shared_datadir):
-    _ = Interaction.parse_file(shared_datadir / 'message_component.json')
+    i = Interaction.parse_file(shared_datadir / 'message_component.json')
+
+    assert isinstance(i.data, ComponentData)
+    assert i.data.custom_id == 'click_one'
+
+
+def test_modal_submit(shared_datadir):
+    i = Interaction.parse_file(shared_datadir / 'modal_submit.json')
+
+    assert i.type is InteractionType.MODAL_SUBMIT
+    assert isinstance(i.data, ModalSubmitData)
+    assert i.data.custom_id == 'feedback_modal'
+
+
+def test_data_model_follows_type(shared_datadir):
+    obj = json.loads((shared_datadir / 'slash_command.json').read_text())
+    del obj['data']['id']
+
+    # Invalid command data must not fall back to another data model
+    with pytest.raises(ValidationError):
+        _ = Interaction.parse_obj(obj)
+
+    obj['type'] = InteractionType.MESSAGE_COMPONENT
+    assert isinstance(Interaction.parse_obj(obj).data, ComponentData)
 
 
 def test_select_menu_message_component(shared_datadir):
@@ -83,3 +113,52 @@ def test_ping_interaction(shared_datadir):
     assert i.user.discriminator == '3161'
     assert i.user.id == Snowflake(211377592895406081)
     assert i.user.username == 'House'
+
+
+@pytest.mark.parametrize('filename', [
+    'message_command.json',
+    'message_component.json',
+    'modal_submit.json',
+    'ping_interaction.json',
+    'select_menu_message_component.json',
+    'slash_command.json',
+    'user_command.json',
+])
+def test_parse_lazy(shared_datadir, filename):
+    obj = json.loads((shared_datadir / filename).read_text())
+
+    strict = Interaction.parse_obj(obj)
+    lazy = Interaction.parse_lazy(obj)
+
+    assert isinstance(lazy, Interaction)
+    assert isinstance(lazy.data, type(strict.data))
+    assert lazy == strict
+    assert lazy.json() == strict.json()
+
+
+def test_parse_lazy_defers_submodels(shared_datadir):
+    obj = json.loads((shared_datadir / 'slash_command.json').read_text())
+    i = Interaction.parse_lazy(obj)
+
+    assert 'member' not in i.__dict__
+    assert 'options' not in i.data.__dict__
+    assert i.data.name == 'blep'
+
+    assert isinstance(i.member, GuildMember)
+    assert i.member.user.id == Snowflake(211377592895406081)
+    assert 'member' in i.__dict__
+
+
+def test_parse_lazy_invalid(shared_datadir):
+    obj = json.loads((shared_datadir / 'slash_command.json').read_text())
+    obj['member']['joined_at'] = 'not a date'
+    del obj['token']
+
+    with pytest.raises(ValidationError):
+        _ = Interaction.parse_lazy(obj)  # Missing token
+
+    obj['token'] = 'EXAMPLE_TOKEN'
+    i = Interaction.parse_lazy(obj)
+
+    with pytest.raises(ValidationError):
+        _ = i.member  # Invalid submodel
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 
 import pytest
+from pydantic import BaseModel
 
 from clyde.models.snowflake import Snowflake
 
@@ -71,3 +72,12 @@ def test_properties(snow):
 def test_conversions(snow):
     assert str(snow) == '175928847299117063'  # To int
     assert int(snow) == 175928847299117063  # To str
+
+
+def test_model_field():
+    class Model(BaseModel):
+        id: Snowflake
+
+    m = Model(id='175928847299117063')
+    assert type(m.id) is Snowflake
+    assert m.id == 175928847299117063
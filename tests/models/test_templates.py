@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from clyde.models.interactions import (
+    InteractionCallbackData,
+    InteractionCallbackType,
+    InteractionResponse,
+)
+from clyde.models.messages import MessageFlags
+from clyde.models.templates import ResponseTemplate, slot
+
+TEMPLATE = ResponseTemplate(InteractionCallbackData(
+    content=f'Hello, {slot("name")}!',
+    embeds=[{'title': slot('title'), 'description': 'Static'}],
+    flags=MessageFlags.EPHEMERAL,
+))
+
+
+def test_slots():
+    assert TEMPLATE.slots == ('name', 'title')
+
+
+@pytest.mark.parametrize('name,title', [
+    ('Clyde', 'Title'),
+    ('"quoted" \\ back\\slash', 'line\nbreak'),
+    ('café \U0001f600', '\x00clyde:name\x00'),
+])
+def test_render(name, title):
+    rendered = TEMPLATE.render(name=name, title=title)
+
+    expected = InteractionResponse(
+        type=InteractionCallbackType.CHANNEL_MESSAGE_WITH_SOURCE,
+        data=InteractionCallbackData(
+            content=f'Hello, {name}!',
+            embeds=[{'title': title, 'description': 'Static'}],
+            flags=MessageFlags.EPHEMERAL,
+        ),
+    )
+
+    assert json.loads(rendered) == json.loads(expected.json(
+        exclude_unset=True))
+
+
+def test_render_invalid():
+    with pytest.raises(TypeError):
+        _ = TEMPLATE.render(name='Clyde')  # Missing slot
+
+    with pytest.raises(TypeError):
+        _ = TEMPLATE.render(name='Clyde', title='T', extra='?')
+
+    with pytest.raises(TypeError):
+        _ = TEMPLATE.render(name=42, title='T')
+
+
+def test_invalid_slot_name():
+    with pytest.raises(ValueError):
+        _ = slot('not a name')
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from clyde.models.interactions import (
+    ApplicationCommandData,
+    Interaction,
+    InteractionType,
+)
+from clyde.models.snowflake import Snowflake
+from clyde.models.trusted import construct_trusted
+from clyde.models.users import GuildMember
+
+FIXTURES = [
+    'message_command.json',
+    'message_component.json',
+    'modal_submit.json',
+    'ping_interaction.json',
+    'select_menu_message_component.json',
+    'slash_command.json',
+    'user_command.json',
+]
+
+
+@pytest.mark.parametrize('filename', FIXTURES)
+def test_matches_strict(shared_datadir, filename):
+    obj = json.loads((shared_datadir / filename).read_text())
+    strict = Interaction.parse_obj(obj)
+
+    trusted = construct_trusted(Interaction, obj)
+    assert trusted == strict
+    assert trusted.json() == strict.json()
+
+    lazy = Interaction.parse_lazy(obj, trusted=True)
+    assert lazy == strict
+    assert lazy.json() == strict.json()
+
+
+def test_conversions(shared_datadir):
+    obj = json.loads((shared_datadir / 'slash_command.json').read_text())
+    i = construct_trusted(Interaction, obj)
+
+    assert type(i.id) is Snowflake
+    assert i.type is InteractionType.APPLICATION_COMMAND
+    assert isinstance(i.data, ApplicationCommandData)
+    assert isinstance(i.member, GuildMember)
+    assert i.member.joined_at.year == 2017
+    assert all(type(r) is Snowflake for r in i.member.roles)
+    assert i.member.user.id == Snowflake(211377592895406081)
+    assert i.user is None
+    assert i.__fields_set__ >= {'id', 'member', 'token'}
+    assert 'user' not in i.__fields_set__
+
+
+def test_pre_validators_run(shared_datadir):  # Normalizes `user: {}`
+    obj = json.loads((shared_datadir / 'guild_member.json').read_text())
+
+    assert construct_trusted(GuildMember, obj).user is None
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from clyde.admission import (
+    SHED_EXPIRED,
+    SHED_QUEUE_FULL,
+    AdmissionController,
+    InteractionShed,
+)
+
+
+def test_check(make_interaction):
+    controller = AdmissionController(deadline=3.0)
+    controller.check(make_interaction(age=1.0))
+
+    with pytest.raises(InteractionShed) as e:
+        controller.check(make_interaction(age=3.5))
+
+    assert e.value.reason == SHED_EXPIRED
+    assert controller.shed == {SHED_EXPIRED: 1}
+
+
+def test_concurrency_and_queue(make_interaction):
+    controller = AdmissionController(max_concurrency=2, max_queue=1)
+    order = []
+
+    async def handler(name, event):
+        async with controller.slot(make_interaction()):
+            order.append(name)
+            await event.wait()
+
+    async def _run():
+        events = [asyncio.Event() for _ in range(3)]
+        tasks = [
+            asyncio.ensure_future(handler(i, event))
+            for i, event in enumerate(events)
+        ]
+        await asyncio.sleep(0)
+
+        assert order == [0, 1]
+        assert controller.in_flight == 2
+        assert controller.backlog == 1
+
+        # The queue is full, so this one is shed right away
+        with pytest.raises(InteractionShed) as e:
+            await handler(3, asyncio.Event())
+
+        assert e.value.reason == SHED_QUEUE_FULL
+
+        events[0].set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert order == [0, 1, 2]
+        assert controller.in_flight == 2
+        assert controller.backlog == 0
+
+        for event in events:
+            event.set()
+
+        await asyncio.gather(*tasks)
+        assert controller.in_flight == 0
+
+    asyncio.run(_run())
+    assert controller.shed == {SHED_QUEUE_FULL: 1}
+
+
+def test_command_limits(make_interaction):
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    controller.limit('slow', max_concurrency=1, max_queue=0)
+
+    async def _run():
+        async with controller.slot(make_interaction(), 'slow'):
+            # Other commands use their own limits
+            async with controller.slot(make_interaction(), 'fast'):
+                assert controller.stats() == {
+                    '': {'running': 1, 'queued': 0},
+                    'slow': {'running': 1, 'queued': 0},
+                }
+
+            with pytest.raises(InteractionShed):
+                async with controller.slot(make_interaction(), 'slow'):
+                    pass
+
+    asyncio.run(_run())
+
+
+def test_expired_while_queued(make_interaction):
+    controller = AdmissionController(max_concurrency=1, deadline=3.0)
+
+    async def _run():
+        async with controller.slot(make_interaction()):
+            late = asyncio.ensure_future(
+                controller.slot(make_interaction(age=3.5)).__aenter__())
+            patient = asyncio.ensure_future(controller.slot(
+                make_interaction(age=3.5), shed_expired=False).__aenter__())
+            await asyncio.sleep(0)
+
+        with pytest.raises(InteractionShed):
+            await late
+
+        await patient
+        assert controller.in_flight == 1
+
+    asyncio.run(_run())
+
+
+def test_cancelled_while_queued(make_interaction):
+    controller = AdmissionController(max_concurrency=1)
+
+    async def _run():
+        async with controller.slot(make_interaction()):
+            waiting = asyncio.ensure_future(
+                controller.slot(make_interaction()).__aenter__())
+            await asyncio.sleep(0)
+            assert controller.backlog == 1
+
+            waiting.cancel()
+            await asyncio.sleep(0)
+            assert controller.backlog == 0
+
+        assert controller.in_flight == 0
+
+    asyncio.run(_run())
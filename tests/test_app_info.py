@@ -0,0 +1,192 @@
+import asyncio
+import json
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from clyde.app_info import ApplicationCache
+from clyde.application import ClydeApp
+from clyde.models.snowflake import Snowflake
+
+DATA = json.loads(
+    (Path(__file__).parent / 'models' / 'data' / 'application.json')
+    .read_text())
+APPLICATION_ID = Snowflake(DATA['id'])
+PUBLIC_KEY = bytes.fromhex(DATA['verify_key'])
+
+
+def test_cache_is_fresh_until_ttl(tmp_path):
+    path = tmp_path / 'cache' / 'application.json'
+    ApplicationCache(path).put('token', DATA)
+
+    # A new process reads the cache file
+    assert ApplicationCache(path).get('token').id == APPLICATION_ID
+    assert ApplicationCache(path).get('other') is None
+
+    expired = ApplicationCache(path, ttl=0)
+    assert expired.get('token') is None
+    assert expired.get('token', stale=True).id == APPLICATION_ID
+
+
+def test_cache_does_not_store_token(tmp_path):
+    path = tmp_path / 'application.json'
+    ApplicationCache(path).put('secret-token', DATA)
+
+    assert 'secret-token' not in path.read_text()
+
+
+@pytest.mark.parametrize('text', [
+    '{not json',
+    '{"version": 0}',
+    '{"version": 1}',
+    '{"version": 1, "applications": []}',
+])
+def test_unreadable_cache_is_ignored(tmp_path, text):
+    path = tmp_path / 'application.json'
+    path.write_text(text)
+
+    cache = ApplicationCache(path)
+    assert cache.get('token', stale=True) is None
+
+    cache.put('token', DATA)
+    assert cache.get('token').id == APPLICATION_ID
+
+
+@pytest.mark.parametrize('entry', [
+    None,
+    [],
+    {},
+    {'application': DATA},
+    {'fetched_at': 'yesterday', 'application': DATA},
+    {'fetched_at': 0},
+    {'fetched_at': 0, 'application': []},
+])
+def test_malformed_cache_entry_is_a_miss(tmp_path, entry):
+    path = tmp_path / 'application.json'
+    cache = ApplicationCache(path)
+    cache.put('token', DATA)
+
+    data = json.loads(path.read_text())
+    key, = data['applications']
+    data['applications'][key] = entry
+    path.write_text(json.dumps(data))
+
+    assert cache.get('token', stale=True) is None
+
+
+def test_cache_is_off_by_default():
+    assert ClydeApp('token').application_cache is None
+
+
+def _load(app, *, status=200, fetch=False):
+    async def _get(request):
+        return web.json_response(DATA, status=status)
+
+    webapp = web.Application()
+    webapp.router.add_get('/api/v9/oauth2/applications/@me', _get)
+
+    async def _run():
+        async with TestServer(webapp) as server:
+            async with aiohttp.ClientSession(
+                base_url=str(server.make_url('/')),
+                raise_for_status=True,
+            ) as app._session:
+                if fetch:
+                    await app._fetch_application_info()
+                else:
+                    await app._load_application_info()
+
+    asyncio.run(_run())
+
+
+def test_configured_info_needs_no_requests():
+    app = ClydeApp(
+        'token',
+        public_key=PUBLIC_KEY.hex(),
+        application_id=APPLICATION_ID,
+        application_cache=None,
+    )
+
+    # No session was created, so fetching would fail
+    asyncio.run(app._load_application_info())
+
+    assert app.id == APPLICATION_ID
+    assert app._revalidate
+
+    with pytest.raises(RuntimeError):
+        app.application
+
+
+def test_cached_info_is_used(tmp_path):
+    path = tmp_path / 'application.json'
+    ApplicationCache(path).put('token', DATA)
+
+    app = ClydeApp('token', application_cache=path)
+    asyncio.run(app._load_application_info())
+
+    assert app.application.id == APPLICATION_ID
+    assert app._public_key == PUBLIC_KEY
+    assert app._revalidate
+
+
+def test_fetched_info_is_cached(tmp_path):
+    path = tmp_path / 'application.json'
+    app = ClydeApp('token', application_cache=path)
+    _load(app)
+
+    assert app.id == APPLICATION_ID
+    assert not app._revalidate
+    assert ApplicationCache(path).get('token').id == APPLICATION_ID
+
+
+def test_stale_info_is_used_if_fetching_fails(tmp_path):
+    path = tmp_path / 'application.json'
+    ApplicationCache(path).put('token', DATA)
+
+    app = ClydeApp('token')
+    app.application_cache = ApplicationCache(path, ttl=0)
+    _load(app, status=500)
+    assert app.id == APPLICATION_ID
+
+    app = ClydeApp('token', application_cache=None)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        _load(app, status=500)
+
+
+def test_configured_public_key_is_kept(tmp_path):
+    path = tmp_path / 'application.json'
+    ApplicationCache(path).put('token', DATA)
+
+    app = ClydeApp(
+        'token',
+        public_key=b'\x01' * 32,
+        application_cache=path,
+    )
+    reader = app._payload_reader = object()
+
+    # Neither cached nor fetched info overrides it
+    asyncio.run(app._load_application_info())
+    assert app._public_key == b'\x01' * 32
+
+    _load(app, fetch=True)
+    assert app._payload_reader is reader
+    assert app._public_key == b'\x01' * 32
+
+
+def test_changed_public_key_is_used(tmp_path):
+    path = tmp_path / 'application.json'
+    ApplicationCache(path).put('token', {**DATA, 'verify_key': '01' * 32})
+
+    app = ClydeApp('token', application_cache=path)
+    asyncio.run(app._load_application_info())
+    assert app._public_key == b'\x01' * 32
+    reader = app._payload_reader = object()
+
+    # As revalidating does
+    _load(app, fetch=True)
+    assert app._payload_reader is not reader
+    assert app._public_key == PUBLIC_KEY
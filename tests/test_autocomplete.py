@@ -0,0 +1,230 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from clyde.application import ClydeApp
+from clyde.autocomplete import AutocompleteCache, AutocompleteEngine
+from clyde.context import Context
+
+FRUITS = ['apple', 'apricot', 'avocado', 'banana', 'blueberry', 'cherry']
+
+
+@pytest.fixture
+def keystroke(make_interaction):
+    """ Build the autocomplete interaction sent as ``value`` is typed. """
+    def _keystroke(value, *, user='211377592895406081', locale='en-US'):
+        return make_interaction(
+            4,
+            locale=locale,
+            user={'id': user, 'username': 'House', 'discriminator': '3161'},
+            data={
+                'id': '881421400454344716',
+                'name': 'fruit',
+                'type': 1,
+                'options': [{
+                    'name': 'kind',
+                    'type': 3,
+                    'value': value,
+                    'focused': True,
+                }],
+            },
+        )
+
+    return _keystroke
+
+
+def _choices(body):
+    return [c['name'] for c in json.loads(body)['data']['choices']]
+
+
+def _engine(**kwargs):
+    engine = AutocompleteEngine()
+    calls = []
+
+    @engine.route('fruit', 'kind', **kwargs)
+    async def complete(ctx, value):
+        calls.append(value)
+        return [f for f in FRUITS if f.startswith(value)]
+
+    return engine, calls
+
+
+def test_cache_and_prefix_reuse(keystroke):
+    engine, calls = _engine(reuse_prefixes=True)
+
+    async def _run():
+        assert _choices(await engine.respond(keystroke('a'))) == \
+            ['apple', 'apricot', 'avocado']
+        assert _choices(await engine.respond(keystroke('a'))) == \
+            ['apple', 'apricot', 'avocado']
+        assert _choices(await engine.respond(keystroke('ap'))) == \
+            ['apple', 'apricot']
+
+        # Locales are cached separately
+        assert _choices(await engine.respond(
+            keystroke('ap', locale='de'))) == ['apple', 'apricot']
+
+    asyncio.run(_run())
+    assert calls == ['a', 'ap']
+    assert engine.cache.hits == 2
+    assert engine.cache.misses == 2
+
+
+def test_prefix_reuse_is_opt_in(keystroke):
+    engine, calls = _engine()
+
+    async def _run():
+        await engine.respond(keystroke('a'))
+        await engine.respond(keystroke('ap'))
+
+    asyncio.run(_run())
+    assert calls == ['a', 'ap']
+
+
+def test_truncated_results_not_reused(keystroke):
+    engine = AutocompleteEngine()
+    calls = []
+
+    @engine.route('fruit', 'kind', reuse_prefixes=True)
+    async def complete(ctx, value):
+        calls.append(value)
+        return [(f'{value}{i}', i) for i in range(30)]
+
+    async def _run():
+        body = await engine.respond(keystroke('a'))
+        assert len(_choices(body)) == 25
+        assert json.loads(body)['data']['choices'][1] == \
+            {'name': 'a1', 'value': 1}
+
+        await engine.respond(keystroke('a1'))
+
+    asyncio.run(_run())
+    assert calls == ['a', 'a1']
+
+
+def test_stale_request_cancelled(keystroke):
+    engine = AutocompleteEngine()
+    cancelled = []
+
+    @engine.route('fruit', 'kind', reuse_prefixes=False)
+    async def complete(ctx, value):
+        try:
+            await asyncio.sleep(0 if value in ('ap', 'bl') else 1)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+
+        return [value]
+
+    async def _run():
+        stale = asyncio.ensure_future(engine.respond(keystroke('a')))
+        await asyncio.sleep(0.01)
+
+        fresh = await engine.respond(keystroke('ap'))
+        assert _choices(fresh) == ['ap']
+        assert _choices(await stale) == []
+
+        # Other users are not affected
+        other = asyncio.ensure_future(
+            engine.respond(keystroke('b', user='1')))
+        await asyncio.sleep(0.01)
+        await engine.respond(keystroke('bl'))
+        assert not other.done()
+
+        # Cancelling the request cancels its handler
+        other.cancel()
+        await asyncio.sleep(0)
+
+    asyncio.run(_run())
+    assert cancelled == ['a', 'b']
+
+
+def test_unknown_option(keystroke):
+    engine, calls = _engine()
+    interaction = keystroke('a')
+    interaction.data.options[0]['name'] = 'other'
+
+    assert _choices(asyncio.run(engine.respond(interaction))) == []
+    assert calls == []
+
+
+def test_cache_eviction(monkeypatch):
+    now = 0.0
+    monkeypatch.setattr('time.monotonic', lambda: now)
+
+    cache = AutocompleteCache(maxsize=2, ttl=10)
+    cache.put(('c', 'o', 'a', None), [])
+    cache.put(('c', 'o', 'b', None), [])
+    assert cache.get(('c', 'o', 'a', None)) is not None
+
+    cache.put(('c', 'o', 'c', None), [])
+    assert cache.get(('c', 'o', 'b', None)) is None  # Least recently used
+    assert len(cache) == 2
+
+    now = 10.0
+    assert cache.get(('c', 'o', 'a', None)) is None  # Expired
+
+    with pytest.raises(ValueError):
+        _ = AutocompleteCache(maxsize=0)
+
+
+def test_app_syncs_autocompleted_options():
+    app = ClydeApp(
+        'token',
+        public_key=bytes(32),
+        application_id='881397058114826261',
+    )
+
+    @app.chat_input('Pick a fruit')
+    async def fruit(ctx: Context, kind: str, ripe: bool = True):
+        pass
+
+    @app.autocomplete('fruit', 'kind')
+    async def complete(ctx, value):
+        return FRUITS
+
+    with pytest.raises(ValueError):
+        app.autocomplete('fruit', 'ripe')  # Not a string or number
+
+    with pytest.raises(ValueError):
+        app.autocomplete('fruit', 'color')
+
+    with pytest.raises(ValueError):
+        app.autocomplete('vegetable', 'kind')
+
+    synced = []
+
+    async def _put(request):
+        commands = await request.json()
+        synced.extend(commands)
+        return web.json_response([
+            dict(
+                command,
+                id='881421400454344716',
+                application_id=request.match_info['application'],
+                version='1',
+            )
+            for command in commands
+        ])
+
+    discord = web.Application()
+    discord.router.add_put(
+        '/api/v9/applications/{application}/commands', _put)
+
+    async def _run():
+        async with TestServer(discord) as server:
+            async with aiohttp.ClientSession(
+                base_url=str(server.make_url('/')),
+                raise_for_status=True,
+            ) as app._session:
+                await app._sync_commands()
+
+    asyncio.run(_run())
+
+    options = {o['name']: o for o in synced[0]['options']}
+    assert options['kind']['autocomplete'] is True
+    assert 'autocomplete' not in options['ripe']
@@ -0,0 +1,145 @@
+import inspect
+import sys
+from typing import Optional
+
+import pytest
+
+from clyde.binding import Binder
+from clyde.context import Context
+from clyde.models.channels import PartialChannel
+from clyde.models.command import ApplicationCommandOptionType
+from clyde.models.interactions import ApplicationCommandData
+from clyde.models.roles import Role
+from clyde.models.users import User
+
+if sys.version_info >= (3, 9):
+    from typing import Annotated
+else:
+    from typing_extensions import Annotated
+
+DATA = ApplicationCommandData.parse_obj({
+    'id': '100',
+    'name': 'test',
+    'type': 1,
+    'resolved': {
+        'users': {
+            '809850198683418695': {
+                'id': '809850198683418695',
+                'username': 'VoltyDemo',
+                'discriminator': '7302',
+            },
+        },
+        'roles': {
+            '387325199227420672': {
+                'id': '387325199227420672',
+                'name': 'Moderator',
+                'color': 0,
+                'hoist': False,
+                'position': 1,
+                'permissions': '8',
+                'managed': False,
+                'mentionable': True,
+            },
+        },
+        'channels': {
+            '704190879698649159': {
+                'id': '704190879698649159',
+                'type': 0,
+                'name': 'general',
+                'permissions': '2199023255551',
+            },
+        },
+    },
+})
+
+
+def _binder(func):
+    return Binder.from_signature(inspect.signature(func))
+
+
+def test_options():
+    async def handler(
+        ctx: Context,
+        name: Annotated[str, 'Your name'],
+        count: int = 1,
+        ratio: Optional[float] = None,
+        member: Optional[User] = None,
+        enabled: bool = True,
+        role: Role = None,
+        channel: PartialChannel = None,
+    ):
+        pass
+
+    options = _binder(handler).options
+
+    assert options[0] == {
+        'type': ApplicationCommandOptionType.STRING,
+        'name': 'name',
+        'description': 'Your name',
+        'required': True,
+    }
+    assert [o['type'] for o in options[1:]] == [
+        ApplicationCommandOptionType.INTEGER,
+        ApplicationCommandOptionType.NUMBER,
+        ApplicationCommandOptionType.USER,
+        ApplicationCommandOptionType.BOOLEAN,
+        ApplicationCommandOptionType.ROLE,
+        ApplicationCommandOptionType.CHANNEL,
+    ]
+    assert not any(o['required'] for o in options[1:])
+
+
+def test_required_options_first():
+    async def handler(ctx: Context, a: Optional[int], b: str):
+        pass
+
+    assert [o['name'] for o in _binder(handler).options] == ['b', 'a']
+
+
+def test_bind():
+    async def handler(
+        ctx: Context,
+        animal: str,
+        ratio: float,
+        user: User,
+        role: Role,
+        channel: PartialChannel,
+        count: int = 3,
+        enabled: Optional[bool] = None,
+    ):
+        pass
+
+    kwargs = _binder(handler).bind([
+        {'name': 'animal', 'type': 3, 'value': 'dog'},
+        {'name': 'ratio', 'type': 10, 'value': 2},
+        {'name': 'user', 'type': 6, 'value': '809850198683418695'},
+        {'name': 'role', 'type': 8, 'value': '387325199227420672'},
+        {'name': 'channel', 'type': 7, 'value': '704190879698649159'},
+        {'name': 'removed', 'type': 3, 'value': 'ignored'},
+    ], DATA)
+
+    assert kwargs.pop('user').username == 'VoltyDemo'
+    assert kwargs.pop('role').name == 'Moderator'
+    assert kwargs.pop('channel').name == 'general'
+    assert kwargs == {
+        'animal': 'dog',
+        'ratio': 2.0,
+        'count': 3,
+        'enabled': None,
+    }
+    assert isinstance(kwargs['ratio'], float)
+
+
+def test_invalid_signature():
+    async def unsupported(ctx: Context, items: list):
+        pass
+
+    async def variadic(ctx: Context, *args: str):
+        pass
+
+    async def unannotated(ctx: Context, value):
+        pass
+
+    for func in (unsupported, variadic, unannotated):
+        with pytest.raises(TypeError):
+            _ = _binder(func)
@@ -0,0 +1,86 @@
+import pytest
+
+from clyde.components import ComponentRouter
+from clyde.models.snowflake import Snowflake
+
+
+def _router(*patterns):
+    router = ComponentRouter()
+
+    for pattern in patterns:
+        router.add(pattern, pattern)  # The pattern is its own "handler"
+
+    return router
+
+
+def test_match():
+    router = _router(
+        'click_one',
+        'page:{page:int}:user:{user:snowflake}',
+        'page:last:user:{user:snowflake}',
+        'vote:{choice}',
+    )
+
+    assert router.match('click_one') == ('click_one', {})
+    assert router.match('page:42:user:123') == (
+        'page:{page:int}:user:{user:snowflake}',
+        {'page': 42, 'user': Snowflake(123)},
+    )
+    assert router.match('vote:yes') == ('vote:{choice}', {'choice': 'yes'})
+
+    # Literals win over placeholders
+    assert router.match('page:last:user:123') == (
+        'page:last:user:{user:snowflake}', {'user': Snowflake(123)})
+
+
+@pytest.mark.parametrize('custom_id', [
+    '',
+    'click_two',
+    'click_one:extra',
+    'page:42',
+    'page:forty-two:user:123',  # Not an int
+    'vote',
+])
+def test_no_match(custom_id):
+    router = _router(
+        'click_one',
+        'page:{page:int}:user:{user:snowflake}',
+        'vote:{choice}',
+    )
+
+    assert router.match(custom_id) is None
+
+
+def test_literal_fallback_to_placeholder():
+    router = _router('a:b:c', 'a:{x}:d', '{y}:b:e')
+
+    assert router.match('a:b:c') == ('a:b:c', {})
+    assert router.match('a:b:d') == ('a:{x}:d', {'x': 'b'})
+    assert router.match('a:b:e') == ('{y}:b:e', {'y': 'a'})
+    assert router.match('z:b:e') == ('{y}:b:e', {'y': 'z'})
+    assert router.match('z:b:d') is None
+
+
+def test_route_decorator():
+    router = ComponentRouter(separator='/')
+
+    @router.route('item/{id:int}')
+    async def item(ctx, id):
+        pass
+
+    assert router.match('item/7') == (item, {'id': 7})
+
+    # Adding a pattern recompiles the trie
+    router.add('item/new', 'new')
+    assert router.match('item/new') == ('new', {})
+
+
+@pytest.mark.parametrize('patterns', [
+    ['page:{page:float}'],
+    ['page:{page'],
+    ['page:x{page}'],
+    ['page:{a:int}', 'page:{b}'],
+])
+def test_invalid_patterns(patterns):
+    with pytest.raises(ValueError):
+        _router(*patterns).compile()
@@ -0,0 +1,172 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from clyde.application import ClydeApp
+from clyde.deadline import DEFAULT_BUDGET, AutoDeferrer, remaining_budget
+from clyde.http.response import (
+    DEFERRED_CHANNEL_MESSAGE,
+    DEFERRED_EPHEMERAL_MESSAGE,
+    DEFERRED_UPDATE_MESSAGE,
+)
+from clyde.models.interactions import InteractionCallbackData
+from clyde.models.messages import MessageFlags
+
+
+@pytest.mark.parametrize('elapsed,remaining', [
+    (0.0, 2.0),
+    (0.5, 1.5),
+    (3.0, 0.0),  # Already too late
+    (-1.0, 2.0),  # Clock skew
+])
+def test_remaining_budget(make_interaction, elapsed, remaining):
+    now = 1664323200.0
+    interaction = make_interaction(created=now)
+    assert remaining_budget(
+        interaction.id, 2.0, now=now + elapsed) == pytest.approx(remaining)
+
+
+def test_fast_handler(make_interaction):
+    delivered = []
+
+    async def deliver(interaction, response):
+        delivered.append(response)
+
+    async def handler():
+        return b'{"type":4,"data":{"content":"fast"}}'
+
+    async def _run():
+        deferrer = AutoDeferrer(deliver, budget=1.0)
+        response = await deferrer.run(make_interaction(), handler())
+
+        assert json.loads(response)['data']['content'] == 'fast'
+        assert not deferrer.pending
+
+    asyncio.run(_run())
+    assert delivered == []
+
+
+def test_fast_handler_error(make_interaction):
+    async def handler():
+        raise KeyError('oops')
+
+    async def _run():
+        deferrer = AutoDeferrer(None, budget=1.0)
+
+        with pytest.raises(KeyError):
+            await deferrer.run(make_interaction(), handler())
+
+    asyncio.run(_run())
+
+
+SLOW = b'{"type":4,"data":{"content":"slow"}}'
+SLOW_EPHEMERAL = b'{"type":4,"data":{"content":"slow","flags":64}}'
+
+
+@pytest.fixture
+def run_slow(make_interaction):
+    """
+    Run a handler that misses its deadline, returning the deferral and
+    the late responses delivered.
+    """
+    def _run_slow(result, type=2, ephemeral=False):
+        # Created long enough ago that only 10ms of budget is left
+        interaction = make_interaction(type, age=1.99)
+        return asyncio.run(_slow(interaction, result, ephemeral))
+
+    return _run_slow
+
+
+async def _slow(interaction, result, ephemeral):
+    delivered = []
+
+    async def deliver(interaction, response):
+        delivered.append((interaction.token, response))
+
+    async def handler():
+        await asyncio.sleep(0.05)
+        return result
+
+    deferrer = AutoDeferrer(deliver, budget=2.0)
+    deferral = await deferrer.run(interaction, handler(), ephemeral=ephemeral)
+    assert len(deferrer.pending) == 1
+
+    await asyncio.gather(*deferrer.pending)
+    assert not deferrer.pending
+    return deferral, delivered
+
+
+@pytest.mark.parametrize('type,ephemeral,deferral,result', [
+    (2, False, DEFERRED_CHANNEL_MESSAGE, SLOW),
+    (2, True, DEFERRED_EPHEMERAL_MESSAGE, SLOW_EPHEMERAL),
+    (3, False, DEFERRED_UPDATE_MESSAGE, SLOW),
+])
+def test_slow_handler(run_slow, type, ephemeral, deferral, result):
+    assert run_slow(result, type, ephemeral) == \
+        (deferral, [('EXAMPLE_TOKEN', result)])
+
+
+@pytest.mark.parametrize('result', [
+    # Would be shown to everyone
+    SLOW_EPHEMERAL,
+    # Modals can't be opened by an edit
+    b'{"type":9,"data":{"custom_id":"form","title":"Form","components":[]}}',
+])
+def test_undeliverable_late_response(run_slow, result):
+    assert run_slow(result) == (DEFERRED_CHANNEL_MESSAGE, [])
+
+
+@pytest.mark.parametrize('defer_after,budget', [
+    (None, DEFAULT_BUDGET),
+    (0.0, 0.0),  # Defer everything
+    (1.5, 1.5),
+])
+def test_app_budget(defer_after, budget):
+    app = ClydeApp('token', defer_after=defer_after)
+    assert app._deferrer.budget == budget
+
+
+@pytest.mark.parametrize('result,edit', [
+    ('slow', {'content': 'slow'}),
+    (
+        InteractionCallbackData(content='slow', flags=MessageFlags.EPHEMERAL),
+        {'content': 'slow', 'flags': 64},
+    ),
+])
+def test_app_delivers_late_models(result, edit, make_interaction):
+    ephemeral = 'flags' in edit
+    edits = []
+
+    async def _patch(request):
+        edits.append((request.match_info['token'], await request.json()))
+        return web.json_response({})
+
+    discord = web.Application()
+    discord.router.add_patch(
+        '/api/v9/webhooks/{id}/{token}/messages/@original', _patch)
+
+    async def handler():
+        await asyncio.sleep(0.05)
+        return result
+
+    async def _run():
+        app = ClydeApp('token', defer_after=0.0)
+
+        async with TestServer(discord) as server:
+            async with aiohttp.ClientSession(
+                base_url=str(server.make_url('/')),
+            ) as app._session:
+                response = await app._respond(
+                    make_interaction(), handler, ephemeral=ephemeral)
+                assert response.body == (
+                    DEFERRED_EPHEMERAL_MESSAGE if ephemeral
+                    else DEFERRED_CHANNEL_MESSAGE)
+
+                await asyncio.gather(*app._deferrer.pending)
+
+    asyncio.run(_run())
+    assert edits == [('EXAMPLE_TOKEN', edit)]
@@ -0,0 +1,122 @@
+import inspect
+
+import pytest
+
+from clyde.binding import Binder
+from clyde.command_spec import CommandSpec
+from clyde.dispatch import CommandRegistry, split_options
+from clyde.execution import ExecutionMode
+from clyde.models.command import ApplicationCommand
+from clyde.models.interactions import (
+    ApplicationCommandData,
+    ApplicationCommandType,
+)
+
+
+def _spec():
+    def handler(ctx):
+        pass
+
+    return CommandSpec(
+        handler,
+        Binder.from_signature(inspect.signature(handler)),
+        ExecutionMode.INLINE,
+        False,
+    )
+
+
+def _command(id, name, guild_id=None):
+    return ApplicationCommand.parse_obj({
+        'id': id,
+        'application_id': '881397058114826261',
+        'guild_id': guild_id,
+        'name': name,
+        'description': 'Test command',
+        'version': '1',
+    })
+
+
+def _data(id, name, options=None, guild_id=None):
+    return ApplicationCommandData.parse_obj({
+        'id': id,
+        'name': name,
+        'type': 1,
+        'options': options,
+        'guild_id': guild_id,
+    })
+
+
+SUBCOMMAND_OPTIONS = [{
+    'name': 'config',
+    'type': 2,
+    'options': [{
+        'name': 'set',
+        'type': 1,
+        'options': [{'name': 'key', 'type': 3, 'value': 'color'}],
+    }],
+}]
+
+
+@pytest.mark.parametrize('options,path,leaf', [
+    (None, (), []),
+    ([{'name': 'animal', 'type': 3, 'value': 'dog'}], (),
+     [{'name': 'animal', 'type': 3, 'value': 'dog'}]),
+    ([{'name': 'list', 'type': 1}], ('list',), []),
+    (SUBCOMMAND_OPTIONS, ('config', 'set'),
+     [{'name': 'key', 'type': 3, 'value': 'color'}]),
+])
+def test_split_options(options, path, leaf):
+    assert split_options(options) == (path, leaf)
+
+
+def test_resolve_by_id():
+    registry = CommandRegistry()
+    blep = _spec()
+    registry.add(_command('100', 'blep'), blep)
+
+    assert registry.resolve(_data('100', 'blep')) == (blep, [])
+
+    # Names are only a fallback, the ID wins
+    assert registry.resolve(_data('100', 'renamed')) == (blep, [])
+
+
+def test_resolve_by_name():
+    registry = CommandRegistry()
+    global_blep = _spec()
+    guild_blep = _spec()
+    registry.add(_command('100', 'blep'), global_blep)
+    registry.add(_command('200', 'blep', guild_id='300'), guild_blep)
+
+    assert registry.resolve(_data('999', 'blep'))[0] is global_blep
+    assert registry.resolve(
+        _data('999', 'blep', guild_id='300'))[0] is guild_blep
+    assert registry.resolve(_data('999', 'other')) is None
+
+
+def test_resolve_before_registration():
+    registry = CommandRegistry()
+    blep = _spec()
+    registry.add_name(ApplicationCommandType.CHAT_INPUT, 'blep', None, blep)
+
+    assert registry.resolve(_data('999', 'blep'))[0] is blep
+    assert registry.resolve(_data('999', 'blep', guild_id='300')) is None
+
+
+def test_resolve_subcommands():
+    registry = CommandRegistry()
+    root = _spec()
+    config_set = _spec()
+    command = _command('100', 'settings')
+    registry.add(command, root)
+    registry.add(command, config_set, ('config', 'set'))
+
+    assert registry.resolve(
+        _data('100', 'settings', SUBCOMMAND_OPTIONS),
+    ) == (config_set, [{'name': 'key', 'type': 3, 'value': 'color'}])
+
+    assert registry.resolve(
+        _data('100', 'settings', [{'name': 'list', 'type': 1}])) is None
+
+    registry.clear()
+    assert len(registry) == 0
+    assert registry.resolve(_data('100', 'settings')) is None
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from clyde.context import Context
+from clyde.execution import ExecutionMode, HandlerExecutor, check_handler
+from clyde.models.interactions import Interaction
+
+DATA_DIR = Path(__file__).parent / 'models' / 'data'
+
+
+def _context():
+    obj = json.loads((DATA_DIR / 'slash_command.json').read_text())
+    return Context(Interaction.parse_lazy(obj))
+
+
+async def inline_handler(ctx, animal):
+    return f'{animal} inline'
+
+
+def thread_handler(ctx, animal):
+    return f'{animal} in {threading.current_thread().name}'
+
+
+def process_handler(ctx, animal):
+    # Only the minimal interaction fields make it to the worker,
+    # but every required one does
+    assert ctx.interaction.token == 'EXAMPLE_TOKEN'
+    assert ctx.interaction.version == 1
+    assert ctx.interaction.data is None
+
+    return f'{animal} for {ctx.interaction.member.user.username} ' \
+        f'in {os.getpid()}'
+
+
+def test_check_handler():
+    check_handler(inline_handler, ExecutionMode.INLINE)
+    check_handler(thread_handler, ExecutionMode.THREAD)
+    check_handler(process_handler, ExecutionMode.PROCESS)
+
+    with pytest.raises(TypeError):
+        check_handler(thread_handler, ExecutionMode.INLINE)
+
+    with pytest.raises(TypeError):
+        check_handler(inline_handler, ExecutionMode.PROCESS)
+
+
+def test_run():
+    executor = HandlerExecutor(max_threads=1, max_processes=1)
+    kwargs = {'animal': 'dog'}
+
+    async def _run():
+        executor.start([ExecutionMode.THREAD, ExecutionMode.PROCESS])
+
+        try:
+            assert await executor.run(
+                ExecutionMode.INLINE, inline_handler, _context(), kwargs,
+            ) == 'dog inline'
+
+            result = await executor.run(
+                ExecutionMode.THREAD, thread_handler, _context(), kwargs)
+            assert result.startswith('dog in clyde-handler')
+
+            # Process handlers send back the serialized response
+            body = await executor.run(
+                ExecutionMode.PROCESS, process_handler, _context(), kwargs)
+            content = json.loads(body)['data']['content']
+            assert content.startswith('dog for House in ')
+            assert content != f'dog for House in {os.getpid()}'
+        finally:
+            await executor.shutdown()
+
+    asyncio.run(_run())
+
+
+def test_run_not_started():
+    executor = HandlerExecutor()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(executor.run(
+            ExecutionMode.THREAD, thread_handler, _context(), {}))
@@ -0,0 +1,223 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from clyde.ratelimit import Priority, RateLimiter, route_key
+
+
+@pytest.mark.parametrize('method, url, route, major', [
+    (
+        'put', '/api/v9/applications/1/guilds/2/commands',
+        'PUT /api/v9/applications/{id}/guilds/{guild_id}/commands', '2',
+    ),
+    (
+        'PATCH', '/api/v9/webhooks/1/secret/messages/@original',
+        'PATCH /api/v9/webhooks/{webhook_id}/{token}/messages/@original',
+        '1/secret',
+    ),
+    (
+        'POST', '/api/v9/interactions/1/secret/callback',
+        'POST /api/v9/interactions/{id}/{token}/callback', '',
+    ),
+    (
+        'GET', '/api/v9/channels/1/messages/2?limit=5',
+        'GET /api/v9/channels/{channel_id}/messages/{id}', '1',
+    ),
+])
+def test_route_key(method, url, route, major):
+    assert route_key(method, url) == (route, major)
+
+
+class MockBucket:
+    """
+    Enforces a rate limit of ``limit`` requests per ``period`` for each
+    major parameter.
+    """
+
+    def __init__(self, *, limit=2, period=0.1, name='abcd'):
+        self.limit = limit
+        self.period = period
+        self.name = name
+        self.received = []
+        self.rate_limited = 0
+        self._windows = {}  # major -> (reset at, count)
+
+    def create_app(self):
+        app = web.Application()
+        app.router.add_post('/{route}/{major}', self._post)
+        return app
+
+    async def _post(self, request):
+        now = time.monotonic()
+        major = request.match_info['major']
+        reset_at, count = self._windows.get(major, (0.0, 0))
+
+        if now >= reset_at:
+            reset_at, count = now + self.period, 0
+
+        reset_after = f'{reset_at - now:.3f}'
+
+        if count >= self.limit:
+            self.rate_limited += 1
+            return web.json_response(
+                {'retry_after': float(reset_after)},
+                status=429,
+                headers={'Retry-After': reset_after},
+            )
+
+        count += 1
+        self._windows[major] = reset_at, count
+        self.received.append((await request.json())['id'])
+
+        return web.json_response({}, headers={
+            'X-RateLimit-Bucket': self.name,
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.limit - count),
+            'X-RateLimit-Reset-After': reset_after,
+        })
+
+
+def _run(discord, main):
+    async def _main():
+        async with TestServer(discord.create_app()) as server:
+            async with aiohttp.ClientSession(
+                base_url=str(server.make_url('/')),
+            ) as session:
+                return await main(session)
+
+    return asyncio.run(_main())
+
+
+def _send(limiter, session, id, url='/channels/1', **kwargs):
+    async def _request():
+        async with limiter.request(
+            session, 'POST', url, json={'id': id}, **kwargs,
+        ) as response:
+            return response.status
+
+    return asyncio.ensure_future(_request())
+
+
+def test_requests_wait_for_the_bucket():
+    discord = MockBucket(limit=2)
+    limiter = RateLimiter()
+
+    async def _main(session):
+        return await asyncio.gather(
+            *(_send(limiter, session, i) for i in range(6)))
+
+    assert _run(discord, _main) == [200] * 6
+    assert discord.received == list(range(6))
+    assert discord.rate_limited == 0
+
+    stats = limiter.stats()['abcd']
+    assert stats.requests == 6
+    assert stats.waited == 5  # Only the first probed the unknown bucket
+    assert stats.wait_time >= 2 * discord.period
+    assert stats.rate_limited == 0
+
+
+def test_major_parameters_are_limited_separately():
+    discord = MockBucket(limit=1, period=10.0)
+    limiter = RateLimiter()
+
+    async def _main(session):
+        await _send(limiter, session, 1, '/channels/1')
+        await _send(limiter, session, 2, '/channels/2')
+
+    _run(discord, _main)
+    assert discord.received == [1, 2]
+    assert discord.rate_limited == 0
+
+
+def test_rate_limited_requests_are_sent_again():
+    discord = MockBucket(limit=1)
+    limiter = RateLimiter()
+
+    async def _main(session):
+        # Another client used up the bucket
+        await session.post('/channels/1', json={'id': 0})
+        return await _send(limiter, session, 1)
+
+    assert _run(discord, _main) == 200
+    assert discord.received == [0, 1]
+    assert discord.rate_limited == 1
+    assert limiter.totals().rate_limited == 1
+
+    # The limiter can be used on another event loop
+    assert _run(discord, lambda s: _send(limiter, s, 2)) == 200
+
+
+def test_rate_limited_requests_give_up():
+    discord = MockBucket(limit=0, period=0.01)
+    limiter = RateLimiter(max_retries=2)
+
+    with pytest.raises(aiohttp.ClientResponseError) as excinfo:
+        _run(discord, lambda s: _send(limiter, s, 1))
+
+    assert excinfo.value.status == 429
+    assert discord.rate_limited == 3
+
+    with pytest.raises(ValueError):
+        RateLimiter(max_retries=-1)
+
+
+def test_followups_go_first():
+    discord = MockBucket(limit=1, period=0.05)
+    limiter = RateLimiter()
+
+    async def _main(session):
+        first = _send(limiter, session, 'probe')
+        await asyncio.sleep(0)
+
+        background = [_send(limiter, session, i) for i in range(3)]
+        await asyncio.sleep(0)
+
+        followup = _send(
+            limiter, session, 'followup', priority=Priority.INTERACTION)
+
+        await asyncio.gather(first, followup, *background)
+
+    _run(discord, _main)
+    assert discord.received == ['probe', 'followup', 0, 1, 2]
+
+
+def test_cancelled_requests_give_their_turn_back():
+    discord = MockBucket(limit=1, period=0.05)
+    limiter = RateLimiter()
+
+    async def _main(session):
+        first = _send(limiter, session, 'first')
+        await asyncio.sleep(0)
+
+        cancelled = _send(limiter, session, 'cancelled')
+        last = _send(limiter, session, 'last')
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        await asyncio.gather(first, last)
+
+    _run(discord, _main)
+    assert discord.received == ['first', 'last']
+
+
+def test_global_limit():
+    discord = MockBucket(limit=100)
+    limiter = RateLimiter(global_limit=2)
+
+    async def _main(session):
+        start = time.monotonic()
+        await asyncio.gather(
+            *(_send(limiter, session, i, f'/channels/{i}') for i in range(3)))
+        return time.monotonic() - start
+
+    # The third request waits for the next second
+    assert _run(discord, _main) >= 0.9
+    assert limiter.totals().max_wait >= 0.9
+
+    with pytest.raises(ValueError):
+        RateLimiter(global_limit=0)
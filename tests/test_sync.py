@@ -0,0 +1,270 @@
+import asyncio
+import itertools
+import json
+import os
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from clyde.models.snowflake import Snowflake
+from clyde.sync import (
+    CommandSync,
+    SyncCache,
+    SyncProgress,
+    SyncState,
+    fingerprint,
+)
+
+APPLICATION_ID = Snowflake('881397058114826261')
+GUILD_ID = Snowflake('881207955029110855')
+
+
+def _command(name, description='Test command'):
+    return {
+        'name': name,
+        'description': description,
+        'options': [],
+        'type': 1,
+    }
+
+
+class MockDiscord:
+    """ Answers bulk overwrites like Discord, recording them. """
+
+    def __init__(self, *, latency=0.0, statuses=None, rate_limited=()):
+        self.requests = []
+        self.latency = latency
+        self.statuses = statuses or {}
+        self.rate_limited = set(rate_limited)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._ids = itertools.count(1000)
+
+    def create_app(self):
+        app = web.Application()
+        app.router.add_put(
+            '/api/v9/applications/{application}/commands', self._put)
+        app.router.add_put(
+            '/api/v9/applications/{application}/guilds/{guild}/commands',
+            self._put)
+        return app
+
+    async def _put(self, request):
+        commands = await request.json()
+        guild = request.match_info.get('guild')
+
+        if guild in self.rate_limited:
+            self.rate_limited.remove(guild)
+            return web.json_response(
+                {'message': 'You are being rate limited.', 'retry_after': 0.1},
+                status=429,
+                headers={'Retry-After': '0.1'},
+            )
+
+        if guild in self.statuses:
+            return web.json_response({}, status=self.statuses[guild])
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+        self.requests.append((guild, [c['name'] for c in commands]))
+
+        return web.json_response([
+            dict(
+                command,
+                id=str(next(self._ids)),
+                application_id=request.match_info['application'],
+                guild_id=guild,
+                version='1',
+            )
+            for command in commands
+        ])
+
+
+def _sync(discord, cache, manifest, **kwargs):
+    async def _run():
+        async with TestServer(discord.create_app()) as server:
+            async with aiohttp.ClientSession(
+                base_url=str(server.make_url('/')),
+                raise_for_status=True,
+            ) as session:
+                sync = CommandSync(session, APPLICATION_ID, cache, **kwargs)
+                return await sync.sync(manifest)
+
+    return asyncio.run(_run())
+
+
+def test_fingerprint_is_canonical():
+    a = {'name': 'a', 'description': 'A', 'type': 1}
+    b = {'type': 1, 'name': 'b', 'description': 'B'}
+    reordered = {'description': 'A', 'type': 1, 'name': 'a'}
+
+    assert fingerprint([a, b]) == fingerprint([b, reordered])
+    assert fingerprint([a]) != fingerprint([a, b])
+
+
+def test_one_request_per_scope(tmp_path):
+    discord = MockDiscord()
+    synced = _sync(discord, SyncCache(tmp_path / 'commands.json'), {
+        None: [_command('ping'), _command('echo')],
+        GUILD_ID: [_command('admin')],
+    })
+
+    assert discord.requests == [
+        (None, ['ping', 'echo']),
+        (str(GUILD_ID), ['admin']),
+    ]
+    assert [c.name for c in synced[None]] == ['ping', 'echo']
+    assert [c.guild_id for c in synced[GUILD_ID]] == [GUILD_ID]
+
+
+def test_unchanged_manifest_skips_requests(tmp_path):
+    path = tmp_path / 'cache' / 'commands.json'
+    manifest = {None: [_command('ping')], GUILD_ID: [_command('admin')]}
+
+    first = _sync(MockDiscord(), SyncCache(path), manifest)
+
+    # A new process reads the cache file
+    discord = MockDiscord()
+    second = _sync(discord, SyncCache(path), manifest)
+
+    assert discord.requests == []
+    assert second == first
+
+    # Only the changed scope is sent again
+    manifest[GUILD_ID] = [_command('admin', 'Changed')]
+    _sync(discord, SyncCache(path), manifest)
+    assert discord.requests == [(str(GUILD_ID), ['admin'])]
+
+
+def test_removed_scope_is_cleared(tmp_path):
+    path = tmp_path / 'commands.json'
+    _sync(MockDiscord(), SyncCache(path), {GUILD_ID: [_command('admin')]})
+
+    discord = MockDiscord()
+    _sync(discord, SyncCache(path), {})
+    assert discord.requests == [(str(GUILD_ID), [])]
+
+    # The cleared scope is forgotten
+    _sync(discord, SyncCache(path), {})
+    assert len(discord.requests) == 1
+
+
+@pytest.mark.parametrize('text', ['{not json', '{"version": 1}'])
+def test_unreadable_cache_is_ignored(tmp_path, text):
+    path = tmp_path / 'commands.json'
+    path.write_text(text)
+
+    discord = MockDiscord()
+    _sync(discord, SyncCache(path), {None: [_command('ping')]})
+
+    assert discord.requests == [(None, ['ping'])]
+    assert json.loads(path.read_text())['version'] == 1
+
+
+def test_without_cache():
+    discord = MockDiscord()
+    manifest = {None: [_command('ping')]}
+
+    _sync(discord, None, manifest)
+    _sync(discord, None, manifest)
+    assert discord.requests == [(None, ['ping'])] * 2
+
+
+def _guilds(count):
+    return [Snowflake(881207955029110855 + i) for i in range(count)]
+
+
+def test_guilds_are_synced_concurrently(tmp_path):
+    discord = MockDiscord(latency=0.02)
+    manifest = {guild: [_command('admin')] for guild in _guilds(20)}
+    reports = []
+
+    synced = _sync(
+        discord, SyncCache(tmp_path / 'commands.json'), manifest,
+        concurrency=4, progress=lambda p: reports.append(p.done))
+
+    assert set(synced) == set(manifest) | {None}
+    assert len(discord.requests) == 21
+    assert discord.max_in_flight == 4
+    assert reports == list(range(1, 22))
+
+
+def test_rate_limits_are_retried():
+    guild, = _guilds(1)
+    discord = MockDiscord(rate_limited=[str(guild)])
+
+    synced = _sync(discord, None, {guild: [_command('admin')]})
+    assert [c.name for c in synced[guild]] == ['admin']
+    assert discord.requests == [(None, []), (str(guild), ['admin'])]
+
+
+def test_guilds_left_are_skipped(tmp_path):
+    left, joined = _guilds(2)
+    path = tmp_path / 'commands.json'
+    discord = MockDiscord(statuses={str(left): 403})
+    progress = []
+
+    synced = _sync(
+        discord, SyncCache(path),
+        {left: [_command('admin')], joined: [_command('admin')]},
+        progress=progress.append)
+
+    assert set(synced) == {None, joined}
+    assert progress[-1] == SyncProgress(3, sent=2, failed=1)
+
+
+def test_restart_resumes(tmp_path):
+    guilds = _guilds(10)
+    path = tmp_path / 'commands.json'
+    manifest = {guild: [_command('admin')] for guild in guilds}
+
+    # The sync fails partway through
+    discord = MockDiscord(statuses={str(guilds[5]): 500})
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        _sync(discord, SyncCache(path), manifest, concurrency=1)
+
+    # Only the guilds not synced yet are sent after a restart
+    discord = MockDiscord()
+    _sync(discord, SyncCache(path), manifest, concurrency=1)
+
+    assert discord.requests == [
+        (str(guild), ['admin']) for guild in guilds[5:]]
+
+
+def test_sync_state_wait():
+    async def _run():
+        state = SyncState()
+        assert not await state.wait(timeout=0.01)
+        assert state.pending
+
+        async def _finish():
+            await asyncio.sleep(0.05)
+            state.state = SyncState.SYNCED
+
+        asyncio.ensure_future(_finish())
+        assert await state.wait(timeout=1)
+
+    asyncio.run(_run())
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork()')
+def test_sync_state_is_shared_with_forks():
+    state = SyncState()
+    pid = os.fork()
+
+    if pid == 0:  # pragma: no cover (runs in the child)
+        state.state = SyncState.FAILED
+        os._exit(0)
+
+    os.waitpid(pid, 0)
+    assert state.state == SyncState.FAILED
+    assert not asyncio.run(state.wait())